@@ -0,0 +1,161 @@
+"""Baseline: schema as created by Base.metadata.create_all
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+Databases that were created by the application's create_all call before
+migrations existed already have this schema; mark them with
+``alembic stamp 0001_baseline`` instead of running it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROMPT_TABLES = {
+    "prompts_would_you_rather": "would_you_rather_themes",
+    "prompts_truth_or_dare": "truth_or_dare_themes",
+    "prompts_sixty_seconds": "sixty_seconds_themes",
+    "prompts_hot_seat": "hot_seat_themes",
+    "prompts_draw_guess": "draw_guess_themes",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_paid", sa.Boolean()),
+        sa.Column("paid_until", sa.DateTime()),
+        sa.Column("role", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "themes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("label", sa.String(), nullable=False, unique=True),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_themes_id", "themes", ["id"])
+
+    op.create_table(
+        "payments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("payment_type", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_payments_id", "payments", ["id"])
+    op.create_index("ix_payments_order_id", "payments", ["order_id"], unique=True)
+
+    op.create_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("host_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("game_slug", sa.String(), nullable=False),
+        sa.Column("invite_code", sa.String(), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("game_state", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_rooms_id", "rooms", ["id"])
+    op.create_index("ix_rooms_invite_code", "rooms", ["invite_code"], unique=True)
+
+    op.create_table(
+        "room_participants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("guest_name", sa.String()),
+        sa.Column("is_guest", sa.Boolean()),
+        sa.Column("is_approved", sa.Boolean()),
+        sa.Column("joined_at", sa.DateTime()),
+    )
+    op.create_index("ix_room_participants_id", "room_participants", ["id"])
+
+    op.create_table(
+        "sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False, unique=True),
+        sa.Column("game_state", sa.JSON()),
+        sa.Column("current_round", sa.Integer()),
+        sa.Column("used_prompt_ids", sa.JSON()),
+        sa.Column("last_updated", sa.DateTime()),
+    )
+    op.create_index("ix_sessions_id", "sessions", ["id"])
+
+    op.create_table(
+        "prompts_would_you_rather",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("option_a", sa.Text(), nullable=False),
+        sa.Column("option_b", sa.Text(), nullable=False),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "prompts_truth_or_dare",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("prompt_type", sa.String(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "prompts_sixty_seconds",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("category", sa.Text(), nullable=False),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "prompts_hot_seat",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("question", sa.Text(), nullable=False),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "prompts_draw_guess",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("word", sa.String(), nullable=False),
+        sa.Column("difficulty", sa.String()),
+        sa.Column("is_safe", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    for prompt_table, association in PROMPT_TABLES.items():
+        op.create_index(f"ix_{prompt_table}_id", prompt_table, ["id"])
+        op.create_table(
+            association,
+            sa.Column("prompt_id", sa.Integer(), sa.ForeignKey(f"{prompt_table}.id")),
+            sa.Column("theme_id", sa.Integer(), sa.ForeignKey("themes.id")),
+        )
+
+
+def downgrade() -> None:
+    for prompt_table, association in PROMPT_TABLES.items():
+        op.drop_table(association)
+        op.drop_table(prompt_table)
+    for table in ("sessions", "room_participants", "rooms", "payments", "themes", "users"):
+        op.drop_table(table)
@@ -0,0 +1,53 @@
+"""Denormalised room participant count and (room_id, user_id) index
+
+Revision ID: 0002_room_participant_count
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_room_participant_count"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rooms",
+        sa.Column("participant_count", sa.Integer(), nullable=False, server_default="0")
+    )
+
+    # Duplicate joins were possible before the unique index existed
+    op.execute("""
+        DELETE FROM room_participants a
+        USING room_participants b
+        WHERE a.room_id = b.room_id
+          AND a.user_id = b.user_id
+          AND a.id > b.id
+    """)
+    op.create_index(
+        "ix_room_participants_room_user",
+        "room_participants",
+        ["room_id", "user_id"],
+        unique=True
+    )
+
+    op.execute("""
+        UPDATE rooms SET participant_count = counts.n
+        FROM (
+            SELECT room_id, count(*) AS n FROM room_participants GROUP BY room_id
+        ) AS counts
+        WHERE counts.room_id = rooms.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_room_participants_room_user", table_name="room_participants")
+    op.drop_column("rooms", "participant_count")
@@ -0,0 +1,63 @@
+"""Primary keys and indexes for prompt/theme association tables
+
+Revision ID: 0003_prompt_theme_indexes
+Revises: 0002_room_participant_count
+Create Date: 2026-10-18 09:10:00
+
+Each association table gets a (prompt_id, theme_id) primary key and a
+reverse (theme_id, prompt_id) index, so theme-filtered prompt selection
+is an index scan instead of a hash join over full scans. Each prompt table
+gets a partial index of safe prompt ids.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_prompt_theme_indexes"
+down_revision: Union[str, None] = "0002_room_participant_count"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROMPT_TABLES = {
+    "prompts_would_you_rather": "would_you_rather_themes",
+    "prompts_truth_or_dare": "truth_or_dare_themes",
+    "prompts_sixty_seconds": "sixty_seconds_themes",
+    "prompts_hot_seat": "hot_seat_themes",
+    "prompts_draw_guess": "draw_guess_themes",
+}
+
+
+def upgrade() -> None:
+    for prompt_table, association in PROMPT_TABLES.items():
+        # Without a key, seeding twice could leave duplicate links
+        op.execute(f"DELETE FROM {association} WHERE prompt_id IS NULL OR theme_id IS NULL")
+        op.execute(f"""
+            DELETE FROM {association} a
+            USING {association} b
+            WHERE a.prompt_id = b.prompt_id
+              AND a.theme_id = b.theme_id
+              AND a.ctid > b.ctid
+        """)
+        op.alter_column(association, "prompt_id", existing_type=sa.Integer(), nullable=False)
+        op.alter_column(association, "theme_id", existing_type=sa.Integer(), nullable=False)
+        op.create_primary_key(f"{association}_pkey", association, ["prompt_id", "theme_id"])
+        op.create_index(f"ix_{association}_theme_prompt", association, ["theme_id", "prompt_id"])
+
+        op.create_index(
+            f"ix_{prompt_table}_safe",
+            prompt_table,
+            ["id"],
+            postgresql_where=sa.text("is_safe = true")
+        )
+
+
+def downgrade() -> None:
+    for prompt_table, association in PROMPT_TABLES.items():
+        op.drop_index(f"ix_{prompt_table}_safe", table_name=prompt_table)
+        op.drop_index(f"ix_{association}_theme_prompt", table_name=association)
+        op.drop_constraint(f"{association}_pkey", association, type_="primary")
+        op.alter_column(association, "theme_id", existing_type=sa.Integer(), nullable=True)
+        op.alter_column(association, "prompt_id", existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,110 @@
+"""Unified prompts table with data copied from the per-game tables
+
+Revision ID: 0004_unified_prompts
+Revises: 0003_prompt_theme_indexes
+Create Date: 2026-10-18 11:30:00
+
+Creates ``prompts`` (game_slug, payload JSONB, difficulty, is_safe) and
+``prompt_themes``, then copies every prompt and theme link from the five
+per-game tables. Prompts get new ids; a temporary legacy_id column maps
+the old links across and is dropped afterwards. The old tables are left
+in place so a downgrade loses only prompts added after the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_unified_prompts"
+down_revision: Union[str, None] = "0003_prompt_theme_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# game_slug -> (prompt table, association table, payload, difficulty)
+LEGACY_TABLES = {
+    "would_you_rather": (
+        "prompts_would_you_rather", "would_you_rather_themes",
+        "jsonb_build_object('option_a', option_a, 'option_b', option_b)", "NULL"
+    ),
+    "truth_or_dare": (
+        "prompts_truth_or_dare", "truth_or_dare_themes",
+        "jsonb_build_object('type', prompt_type, 'text', text)", "NULL"
+    ),
+    "sixty_seconds": (
+        "prompts_sixty_seconds", "sixty_seconds_themes",
+        "jsonb_build_object('category', category)", "NULL"
+    ),
+    "hot_seat": (
+        "prompts_hot_seat", "hot_seat_themes",
+        "jsonb_build_object('question', question)", "NULL"
+    ),
+    "draw_guess": (
+        "prompts_draw_guess", "draw_guess_themes",
+        "jsonb_build_object('word', word, 'difficulty', difficulty)", "difficulty"
+    ),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "prompts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_slug", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("difficulty", sa.String(), nullable=True),
+        sa.Column("is_safe", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("legacy_id", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_prompts_id"), "prompts", ["id"])
+    op.create_table(
+        "prompt_themes",
+        sa.Column("prompt_id", sa.Integer(), nullable=False),
+        sa.Column("theme_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["prompt_id"], ["prompts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["theme_id"], ["themes.id"]),
+        sa.PrimaryKeyConstraint("prompt_id", "theme_id"),
+    )
+
+    for game_slug, (prompt_table, association, payload, difficulty) in LEGACY_TABLES.items():
+        op.execute(f"""
+            INSERT INTO prompts (game_slug, payload, difficulty, is_safe, created_at, legacy_id)
+            SELECT '{game_slug}', {payload}, {difficulty}, is_safe, created_at, id
+            FROM {prompt_table}
+            ORDER BY id
+        """)
+
+    # Index the mapping only once, after the bulk copy
+    op.create_index("ix_prompts_legacy", "prompts", ["game_slug", "legacy_id"])
+    for game_slug, (prompt_table, association, payload, difficulty) in LEGACY_TABLES.items():
+        op.execute(f"""
+            INSERT INTO prompt_themes (prompt_id, theme_id)
+            SELECT p.id, a.theme_id
+            FROM {association} a
+            JOIN prompts p ON p.game_slug = '{game_slug}' AND p.legacy_id = a.prompt_id
+            ON CONFLICT DO NOTHING
+        """)
+    op.drop_index("ix_prompts_legacy", table_name="prompts")
+    op.drop_column("prompts", "legacy_id")
+
+    op.create_index("ix_prompt_themes_theme_prompt", "prompt_themes", ["theme_id", "prompt_id"])
+    op.create_index(
+        "ix_prompts_game_safe",
+        "prompts",
+        ["game_slug", "id"],
+        postgresql_where=sa.text("is_safe = true")
+    )
+    op.execute("ANALYZE prompts")
+    op.execute("ANALYZE prompt_themes")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prompts_game_safe", table_name="prompts")
+    op.drop_index("ix_prompt_themes_theme_prompt", table_name="prompt_themes")
+    op.drop_table("prompt_themes")
+    op.drop_index(op.f("ix_prompts_id"), table_name="prompts")
+    op.drop_table("prompts")
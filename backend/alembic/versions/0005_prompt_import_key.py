@@ -0,0 +1,33 @@
+"""Import key on prompts for idempotent bulk imports
+
+Revision ID: 0005_prompt_import_key
+Revises: 0004_unified_prompts
+Create Date: 2026-10-18 12:40:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_prompt_import_key"
+down_revision: Union[str, None] = "0004_unified_prompts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("prompts", sa.Column("import_key", sa.String(), nullable=True))
+    op.create_index(
+        "ix_prompts_game_import_key",
+        "prompts",
+        ["game_slug", "import_key"],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prompts_game_import_key", table_name="prompts")
+    op.drop_column("prompts", "import_key")
@@ -0,0 +1,28 @@
+"""Room state checkpoint on sessions
+
+Revision ID: 0006_session_checkpoint
+Revises: 0005_prompt_import_key
+Create Date: 2026-10-18 15:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_session_checkpoint"
+down_revision: Union[str, None] = "0005_prompt_import_key"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("sessions", sa.Column("checkpoint", sa.Text(), nullable=True))
+    op.add_column("sessions", sa.Column("checkpoint_version", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("sessions", "checkpoint_version")
+    op.drop_column("sessions", "checkpoint")
@@ -2,11 +2,13 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, inspect
 
+from app.core.config import settings
 from app.core.security import decode_token
 from app.db.base import get_db
 from app.models import User
+from app.services.principal_cache import principal_cache
 
 security = HTTPBearer()
 
@@ -25,14 +27,32 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    user_id = payload.get("sub")
+    if user_id is None or not str(user_id).isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if settings.AUTH_TOKEN_CLAIMS and "role" in payload:
+        # Authorise from the token alone; denials are re-checked in _recheck
+        return User(
+            id=int(user_id),
+            is_paid=payload.get("is_paid", False),
+            role=payload["role"],
+            is_active=payload.get("is_active", True)
+        )
+    
+    return await _load_user(int(user_id), db)
+
+
+async def _load_user(user_id: int, db: AsyncSession, use_cache: bool = True) -> User:
+    if use_cache and settings.PRINCIPAL_CACHE_ENABLED:
+        user = await principal_cache.get(user_id)
+        if user is not None:
+            return user
+    
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     
@@ -42,20 +62,40 @@ async def get_current_user(
             detail="User not found"
         )
     
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        await principal_cache.put(user)
+    
+    return user
+
+
+async def _recheck(user: User, db: AsyncSession) -> User:
+    """Reload a user from the database before denying access.
+    
+    Token claims and cached principals can predate a payment or role
+    change, so they are only trusted to grant access.
+    """
+    if inspect(user).transient:
+        return await _load_user(user.id, db, use_cache=False)
     return user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ) -> User:
+    if not current_user.is_active:
+        current_user = await _recheck(current_user, db)
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
 async def get_current_paid_user(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ) -> User:
+    if not current_user.is_paid:
+        current_user = await _recheck(current_user, db)
     if not current_user.is_paid:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -65,8 +105,11 @@ async def get_current_paid_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ) -> User:
+    if current_user.role != "admin":
+        current_user = await _recheck(current_user, db)
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
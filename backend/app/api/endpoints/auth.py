@@ -5,8 +5,9 @@ from sqlalchemy import select
 
 from app.api.deps import get_db, get_optional_current_user
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    PasswordHasherBusy,
+    password_hasher,
+    access_token_claims,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -18,6 +19,14 @@ from app.schemas.auth import UserCreate, UserLogin, TokenResponse, UserResponse
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many sign-in attempts, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 @router.post("/register", response_model=TokenResponse)
 async def register(
     user_data: UserCreate,
@@ -33,7 +42,10 @@ async def register(
         )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password
@@ -43,7 +55,7 @@ async def register(
     await db.refresh(db_user)
     
     # Create tokens
-    access_token = create_access_token(data={"sub": str(db_user.id)})
+    access_token = create_access_token(data=access_token_claims(db_user))
     refresh_token = create_refresh_token(data={"sub": str(db_user.id)})
     
     # Set refresh token as httpOnly cookie
@@ -72,14 +84,32 @@ async def login(
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    try:
+        verified, new_hash = await password_hasher.verify_and_update(
+            user_data.password, user.hashed_password
+        )
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    if new_hash:
+        # Stored hash used outdated cost parameters
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=access_token_claims(user))
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     # Set refresh token as httpOnly cookie
@@ -110,7 +140,7 @@ async def refresh_token(
         )
     
     # Create new tokens
-    access_token = create_access_token(data={"sub": str(current_user.id)})
+    access_token = create_access_token(data=access_token_claims(current_user))
     new_refresh_token = create_refresh_token(data={"sub": str(current_user.id)})
     
     # Update refresh token cookie
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_active_user
+from app.core.config import settings
 from app.models import User, Room, GameSession
 from app.services.game_logic import game_logic_service
+from app.services.invite_cache import invite_cache
+from app.services.room_cleanup import end_room
+from app.services.room_state import room_state_store
+from app.services.seen_prompts import seen_prompts
 from app.schemas.room import GameStateUpdate
+from app.websocket.socketio_app import vote_broadcaster, stroke_batcher
 
 router = APIRouter()
 
 
+async def _get_session(db: AsyncSession, room_id: int):
+    result = await db.execute(
+        select(GameSession).where(GameSession.room_id == room_id)
+    )
+    return result.scalar_one_or_none()
+
+
 @router.post("/rooms/{room_id}/start")
 async def start_game(
     room_id: int,
@@ -31,7 +45,7 @@ async def start_game(
         )
     
     # Get game session
-    session = await db.get(GameSession, {"room_id": room_id})
+    session = await _get_session(db, room_id)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,7 +55,7 @@ async def start_game(
     # Load prompts for the session
     theme_ids = session.game_state.get("themes", [])
     prompt_ids = await game_logic_service.load_prompts_for_session(
-        db, room.game_slug, theme_ids, room_id
+        db, room.game_slug, theme_ids, room_id, room.host_id
     )
     
     if not prompt_ids:
@@ -52,10 +66,27 @@ async def start_game(
     
     # Update room status
     room.status = "active"
-    session.game_state["status"] = "active"
-    session.game_state["prompt_count"] = len(prompt_ids)
+    session.game_state = {
+        **session.game_state,
+        "status": "active",
+        "prompt_count": len(prompt_ids)
+    }
     
     await db.commit()
+    await invite_cache.invalidate(room.invite_code)
+    
+    # Timer expiry handlers and queue refills look up the game here
+    await room_state_store.update(
+        room_id,
+        {
+            "status": "active",
+            "game_slug": room.game_slug,
+            "current_round": 0,
+            "host_id": room.host_id,
+            "theme_ids": ",".join(str(t) for t in theme_ids)
+        },
+        reopen=True
+    )
     
     return {
         "success": True,
@@ -67,10 +98,15 @@ async def start_game(
 @router.get("/rooms/{room_id}/next-prompt")
 async def get_next_prompt(
     room_id: int,
+    lookahead: int = Query(0, ge=0, le=settings.PROMPT_LOOKAHEAD_MAX),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get the next prompt for the game"""
+    """Get the next prompt for the game.
+
+    With ``lookahead=K`` the following K queued prompts are returned too, so
+    clients can render them without another request.
+    """
     # Get room
     room = await db.get(Room, room_id)
     if not room:
@@ -81,17 +117,39 @@ async def get_next_prompt(
     
     # Get next prompt
     prompt = await game_logic_service.get_next_prompt(
-        db, room_id, room.game_slug
+        db, room_id, room.game_slug, room.host_id
     )
     
     if not prompt:
         return {"success": False, "message": "No more prompts available"}
     
-    return {
+    response = {
         "success": True,
         "prompt": prompt,
         "game_slug": room.game_slug
     }
+    if lookahead:
+        response["upcoming"] = await game_logic_service.peek_prompts(
+            db, room_id, room.game_slug, lookahead
+        )
+    
+    return response
+
+
+@router.get("/rooms/{room_id}/state")
+async def get_room_state(
+    room_id: int,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Snapshot of the room's game state, for clients resuming a game"""
+    snapshot = await room_state_store.snapshot(room_id, current_user.id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Room state not found"
+        )
+    
+    return snapshot
 
 
 @router.post("/rooms/{room_id}/action")
@@ -128,6 +186,17 @@ async def process_game_action(
             detail=result["error"]
         )
     
+    if action_data.action == "clear_canvas":
+        # Don't let strokes still being batched land on the cleared canvas
+        stroke_batcher.discard(room_id)
+    
+    if "vote_counts" in result:
+        await vote_broadcaster.publish(room_id, {
+            "prompt_id": data.get("prompt_id"),
+            "vote_counts": result["vote_counts"],
+            "total_votes": result["total_votes"]
+        })
+    
     return result
 
 
@@ -156,10 +225,16 @@ async def end_game(
     room.status = "closed"
     
     # Get session and update
-    session = await db.get(GameSession, {"room_id": room_id})
+    used_prompt_ids = await seen_prompts.room_ids(room_id)
+    session = await _get_session(db, room_id)
     if session:
-        session.game_state["status"] = "ended"
+        session.game_state = {**session.game_state, "status": "ended"}
+        # Keep the room's shown prompts; the host's stay in Redis for later games
+        session.used_prompt_ids = used_prompt_ids
     
     await db.commit()
+    await invite_cache.invalidate(room.invite_code)
+    
+    await end_room(room_id, used_prompt_ids)
     
     return {"success": True, "message": "Game ended"}
\ No newline at end of file
@@ -7,6 +7,7 @@ from app.api.deps import get_db, get_current_active_user
 from app.models import User, Payment
 from app.schemas.payment import PaymentCreate, PaymentResponse
 from app.services.paypal import paypal_service
+from app.services.principal_cache import principal_cache
 from app.core.config import settings
 
 router = APIRouter()
@@ -55,13 +56,15 @@ async def verify_payment(
     )
     db.add(db_payment)
     
-    # Update user's paid status
-    current_user.is_paid = True
-    current_user.paid_until = expires_at
-    current_user.role = "paid"
+    # Update user's paid status (current_user may be a cached principal)
+    user = await db.get(User, current_user.id)
+    user.is_paid = True
+    user.paid_until = expires_at
+    user.role = "paid"
     
     await db.commit()
     await db.refresh(db_payment)
+    await principal_cache.invalidate(user.id)
     
     return PaymentResponse.from_orm(db_payment)
 
@@ -1,17 +1,39 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update
 
 from app.api.deps import get_db, get_current_active_user, get_current_paid_user
 from app.models import Room, RoomParticipant, User, GameSession
 from app.schemas.room import RoomCreate, RoomResponse, RoomJoin, ParticipantResponse
-from app.core.redis_client import redis_client
+from app.services.invite_cache import invite_cache
+from app.services.room_state import room_state_store
 
 router = APIRouter()
 
 
+async def _add_participant(db: AsyncSession, participant: RoomParticipant):
+    """Insert a participant and bump the room's counter in one transaction"""
+    db.add(participant)
+    await db.execute(
+        update(Room)
+        .where(Room.id == participant.room_id)
+        .values(participant_count=Room.participant_count + 1)
+    )
+    await db.commit()
+    await db.refresh(participant)
+
+
+async def _find_participant(db: AsyncSession, room_id: int, user_id: int):
+    result = await db.execute(
+        select(RoomParticipant)
+        .where(RoomParticipant.room_id == room_id)
+        .where(RoomParticipant.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
 @router.post("/", response_model=RoomResponse)
 async def create_room(
     room_data: RoomCreate,
@@ -29,7 +51,8 @@ async def create_room(
     # Create room
     db_room = Room(
         host_id=current_user.id,
-        game_slug=room_data.game_slug
+        game_slug=room_data.game_slug,
+        participant_count=1
     )
     db.add(db_room)
     await db.commit()
@@ -53,16 +76,9 @@ async def create_room(
     await db.commit()
     
     # Initialize room in Redis
-    await redis_client.hset(
-        f"room:{db_room.id}",
-        "status",
-        "waiting"
-    )
+    await room_state_store.update(db_room.id, {"status": "waiting"}, create=True)
     
-    return RoomResponse(
-        **db_room.__dict__,
-        participant_count=1
-    )
+    return RoomResponse.from_orm(db_room)
 
 
 @router.get("/{room_id}", response_model=RoomResponse)
@@ -70,12 +86,7 @@ async def get_room(
     room_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(Room)
-        .where(Room.id == room_id)
-        .options(selectinload(Room.participants))
-    )
-    room = result.scalar_one_or_none()
+    room = await db.get(Room, room_id)
     
     if not room:
         raise HTTPException(
@@ -83,10 +94,7 @@ async def get_room(
             detail="Room not found"
         )
     
-    return RoomResponse(
-        **room.__dict__,
-        participant_count=len(room.participants)
-    )
+    return RoomResponse.from_orm(room)
 
 
 @router.get("/invite/{invite_code}", response_model=RoomResponse)
@@ -94,18 +102,21 @@ async def get_room_by_invite(
     invite_code: str,
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(Room)
-        .where(Room.invite_code == invite_code)
-        .options(selectinload(Room.participants))
-    )
-    room = result.scalar_one_or_none()
-    
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Invalid invite code"
-        )
+    cached = await invite_cache.get(invite_code)
+    if cached:
+        room = RoomResponse(**cached)
+    else:
+        result = await db.execute(select(Room).where(Room.invite_code == invite_code))
+        db_room = result.scalar_one_or_none()
+        
+        if not db_room:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invalid invite code"
+            )
+        
+        room = RoomResponse.from_orm(db_room)
+        await invite_cache.put(invite_code, room.dict())
     
     if room.status == "closed":
         raise HTTPException(
@@ -113,10 +124,7 @@ async def get_room_by_invite(
             detail="This room is closed"
         )
     
-    return RoomResponse(
-        **room.__dict__,
-        participant_count=len(room.participants)
-    )
+    return room
 
 
 @router.post("/{room_id}/join", response_model=ParticipantResponse)
@@ -127,12 +135,7 @@ async def join_room(
     db: AsyncSession = Depends(get_db)
 ):
     # Get room
-    result = await db.execute(
-        select(Room)
-        .where(Room.id == room_id)
-        .options(selectinload(Room.participants))
-    )
-    room = result.scalar_one_or_none()
+    room = await db.get(Room, room_id)
     
     if not room:
         raise HTTPException(
@@ -141,10 +144,7 @@ async def join_room(
         )
     
     # Check if user already in room
-    existing = next(
-        (p for p in room.participants if p.user_id == current_user.id),
-        None
-    )
+    existing = await _find_participant(db, room_id, current_user.id)
     if existing:
         return ParticipantResponse.from_orm(existing)
     
@@ -154,9 +154,12 @@ async def join_room(
         user_id=current_user.id,
         is_approved=room.host_id == current_user.id  # Auto-approve host
     )
-    db.add(db_participant)
-    await db.commit()
-    await db.refresh(db_participant)
+    try:
+        await _add_participant(db, db_participant)
+    except IntegrityError:
+        # A concurrent request from the same user joined first
+        await db.rollback()
+        db_participant = await _find_participant(db, room_id, current_user.id)
     
     return ParticipantResponse.from_orm(db_participant)
 
@@ -200,9 +203,7 @@ async def join_room_as_guest(
         is_guest=True,
         is_approved=False  # Guests need host approval
     )
-    db.add(db_participant)
-    await db.commit()
-    await db.refresh(db_participant)
+    await _add_participant(db, db_participant)
     
     return ParticipantResponse.from_orm(db_participant)
 
@@ -6,6 +6,15 @@ from pydantic import Field
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    DB_POOL_SIZE: int = Field(default=10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    # Set to 0 behind PgBouncer in transaction pooling mode
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=500, env="DB_STATEMENT_CACHE_SIZE")
+    # Skip create_all at startup and only check the alembic revision
+    FAST_BOOT: bool = Field(default=False, env="FAST_BOOT")
     
     # Redis
     REDIS_URL: str = Field(..., env="REDIS_URL")
@@ -15,16 +24,97 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field(default="HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=15, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    # Embed is_paid/role/is_active in access tokens so authorisation skips the
+    # database. Claims may lag a deactivation by up to ACCESS_TOKEN_EXPIRE_MINUTES
+    AUTH_TOKEN_CLAIMS: bool = Field(default=False, env="AUTH_TOKEN_CLAIMS")
+    
+    # Password hashing (bcrypt runs in a bounded thread pool)
+    BCRYPT_ROUNDS: int = Field(default=12, env="BCRYPT_ROUNDS")
+    PASSWORD_HASH_WORKERS: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=64, env="PASSWORD_HASH_MAX_QUEUE")  # Beyond this: 429
+    
+    # User principal cache (get_current_user)
+    PRINCIPAL_CACHE_ENABLED: bool = Field(default=True, env="PRINCIPAL_CACHE_ENABLED")
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10000, env="PRINCIPAL_CACHE_MAX_ENTRIES")
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = Field(default=5.0, env="PRINCIPAL_CACHE_LOCAL_TTL_SECONDS")
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = Field(default=300, env="PRINCIPAL_CACHE_REDIS_TTL_SECONDS")
     
     # PayPal
     PAYPAL_CLIENT_ID: str = Field(..., env="PAYPAL_CLIENT_ID")
     PAYPAL_CLIENT_SECRET: str = Field(..., env="PAYPAL_CLIENT_SECRET")
     PAYPAL_MODE: str = Field(default="sandbox", env="PAYPAL_MODE")
+    PAYPAL_API_BASE: str = Field(default="", env="PAYPAL_API_BASE")  # Overrides PAYPAL_MODE, e.g. a local stub
+    PAYPAL_TIMEOUT_SECONDS: float = Field(default=10.0, env="PAYPAL_TIMEOUT_SECONDS")
+    PAYPAL_MAX_RETRIES: int = Field(default=2, env="PAYPAL_MAX_RETRIES")
+    PAYPAL_ORDER_CACHE_TTL_SECONDS: int = Field(default=86400, env="PAYPAL_ORDER_CACHE_TTL_SECONDS")
     
     # App
     CORS_ORIGINS: List[str] = Field(default=["http://localhost:5173"], env="CORS_ORIGINS")
     SENTRY_DSN: str = Field(default="", env="SENTRY_DSN")
     
+    # Rooms
+    ROOM_INVITE_CACHE_TTL_SECONDS: int = Field(default=5, env="ROOM_INVITE_CACHE_TTL_SECONDS")
+    # Room keys in Redis expire this long after the room's last write
+    ROOM_KEY_TTL_SECONDS: int = Field(default=86400, env="ROOM_KEY_TTL_SECONDS")
+    # MEMORY USAGE sampling of room keys for /metrics (keys per step, one step per interval)
+    REDIS_MEMORY_SAMPLE_INTERVAL_SECONDS: float = Field(default=5.0, env="REDIS_MEMORY_SAMPLE_INTERVAL_SECONDS")
+    REDIS_MEMORY_SAMPLE_KEYS: int = Field(default=1000, env="REDIS_MEMORY_SAMPLE_KEYS")
+    
+    # Prompt cache
+    PROMPT_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024, env="PROMPT_CACHE_MAX_BYTES")
+    PROMPT_CACHE_TTL_SECONDS: int = Field(default=3600, env="PROMPT_CACHE_TTL_SECONDS")
+    
+    # Socket.IO
+    SOCKET_SESSION_TTL_SECONDS: int = Field(default=86400, env="SOCKET_SESSION_TTL_SECONDS")
+    # Multi-node mode relays broadcasts between workers over Redis pub/sub
+    SOCKETIO_MULTI_NODE: bool = Field(default=False, env="SOCKETIO_MULTI_NODE")
+    SOCKETIO_MESSAGE_QUEUE: str = Field(default="", env="SOCKETIO_MESSAGE_QUEUE")  # Defaults to REDIS_URL
+    SOCKETIO_CHANNEL: str = Field(default="socketio", env="SOCKETIO_CHANNEL")
+    # Without sticky sessions at the load balancer only WebSocket transport works
+    SOCKETIO_STICKY_SESSIONS: bool = Field(default=True, env="SOCKETIO_STICKY_SESSIONS")
+    
+    # Game broadcasts
+    VOTE_BROADCAST_MAX_HZ: float = Field(default=4.0, env="VOTE_BROADCAST_MAX_HZ")
+    STROKE_TICK_HZ: float = Field(default=30.0, env="STROKE_TICK_HZ")
+    STROKE_LOG_TTL_SECONDS: int = Field(default=3600, env="STROKE_LOG_TTL_SECONDS")
+    CANVAS_COMPACT_AFTER_FRAMES: int = Field(default=120, env="CANVAS_COMPACT_AFTER_FRAMES")
+    CANVAS_SNAPSHOT_MAX_BYTES: int = Field(default=256 * 1024, env="CANVAS_SNAPSHOT_MAX_BYTES")
+    
+    # Game action fan-out: updates within a tick share one frame, rooms and sockets are rate limited
+    OUTBOUND_TICK_HZ: float = Field(default=30.0, env="OUTBOUND_TICK_HZ")
+    OUTBOUND_ROOM_RATE: float = Field(default=100.0, env="OUTBOUND_ROOM_RATE")  # Updates/second per room
+    OUTBOUND_ROOM_BURST: int = Field(default=200, env="OUTBOUND_ROOM_BURST")
+    OUTBOUND_MAX_PENDING: int = Field(default=500, env="OUTBOUND_MAX_PENDING")  # Queued updates per room
+    OUTBOUND_MAX_BATCH: int = Field(default=50, env="OUTBOUND_MAX_BATCH")  # Updates per frame
+    # Action types where only the latest per sender matters
+    OUTBOUND_LOW_PRIORITY_TYPES: str = Field(default="typing,cursor,reaction", env="OUTBOUND_LOW_PRIORITY_TYPES")
+    SOCKET_EVENT_RATE: float = Field(default=20.0, env="SOCKET_EVENT_RATE")  # game_action calls/second per socket
+    SOCKET_EVENT_BURST: int = Field(default=40, env="SOCKET_EVENT_BURST")
+    
+    # Room action journal (Redis Streams, written behind the broadcast)
+    ACTION_JOURNAL_ENABLED: bool = Field(default=True, env="ACTION_JOURNAL_ENABLED")
+    ACTION_JOURNAL_BATCH_SIZE: int = Field(default=256, env="ACTION_JOURNAL_BATCH_SIZE")
+    ACTION_JOURNAL_FLUSH_MS: int = Field(default=50, env="ACTION_JOURNAL_FLUSH_MS")
+    ACTION_JOURNAL_MAXLEN: int = Field(default=1000, env="ACTION_JOURNAL_MAXLEN")
+    ACTION_JOURNAL_TTL_SECONDS: int = Field(default=86400, env="ACTION_JOURNAL_TTL_SECONDS")
+    
+    # Room timers (fired by one worker elected through a Redis lease)
+    TIMER_SWEEP_MS: int = Field(default=100, env="TIMER_SWEEP_MS")
+    TIMER_LEADER_LEASE_SECONDS: float = Field(default=5.0, env="TIMER_LEADER_LEASE_SECONDS")
+    
+    # Room state (live in Redis, checkpointed to Postgres for resume)
+    ROOM_CHECKPOINT_INTERVAL_SECONDS: float = Field(default=5.0, env="ROOM_CHECKPOINT_INTERVAL_SECONDS")
+    ROOM_CHECKPOINT_BATCH_SIZE: int = Field(default=500, env="ROOM_CHECKPOINT_BATCH_SIZE")
+    
+    # Seen-prompt tracking (prompts shown to a host or room are skipped for a while)
+    SEEN_PROMPTS_WINDOW_DAYS: float = Field(default=28.0, env="SEEN_PROMPTS_WINDOW_DAYS")
+    SEEN_PROMPTS_GENERATIONS: int = Field(default=4, env="SEEN_PROMPTS_GENERATIONS")
+    # Top up a room's prompt queue in the background below this many prompts
+    PROMPT_REFILL_THRESHOLD: int = Field(default=10, env="PROMPT_REFILL_THRESHOLD")
+    PROMPT_REFILL_INTERVAL_MS: int = Field(default=250, env="PROMPT_REFILL_INTERVAL_MS")
+    PROMPT_REFILL_BATCH_SIZE: int = Field(default=100, env="PROMPT_REFILL_BATCH_SIZE")  # Rooms per batch
+    PROMPT_LOOKAHEAD_MAX: int = Field(default=10, env="PROMPT_LOOKAHEAD_MAX")  # Upper bound for ?lookahead=
+    
     # Admin
     ADMIN_EMAIL: str = Field(default="admin@gamesnight.com", env="ADMIN_EMAIL")
     ADMIN_PASSWORD: str = Field(default="changeme", env="ADMIN_PASSWORD")
@@ -1,13 +1,36 @@
 import redis.asyncio as redis
-from typing import Optional
+from redis.exceptions import NoScriptError
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Sequence
 import json
 
 from app.core.config import settings
 
 
+class RedisPipeline:
+    """Thin wrapper around a redis-py pipeline.
+
+    Commands are queued synchronously (no await) and sent in a single round
+    trip when the ``RedisClient.pipeline()`` block exits; their replies are
+    then available, in order, on ``results``.
+    """
+    
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self.results: list = []
+    
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+
 class RedisClient:
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
+        # Separate connection for binary payloads (packed arrays, etc.)
+        self.raw: Optional[redis.Redis] = None
+        # Lua scripts by name, and the SHA1 they are cached under in Redis
+        self._scripts: Dict[str, str] = {}
+        self._script_shas: Dict[str, str] = {}
     
     async def connect(self):
         self.redis = await redis.from_url(
@@ -15,16 +38,63 @@ class RedisClient:
             encoding="utf-8",
             decode_responses=True
         )
+        self.raw = await redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=False
+        )
+        await self.load_scripts()
     
     async def disconnect(self):
         if self.redis:
             await self.redis.close()
+        if self.raw:
+            await self.raw.close()
+    
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False, raw: bool = False):
+        """Batch commands into one round trip, optionally wrapped in MULTI/EXEC
+        
+        With raw=True the pipeline runs on the binary connection.
+        
+        Usage:
+            async with redis_client.pipeline() as pipe:
+                pipe.hset(key, "field", "value")
+                pipe.expire(key, 300)
+            pipe.results  # replies, in order
+        """
+        connection = self.raw if raw else self.redis
+        pipe = RedisPipeline(connection.pipeline(transaction=transaction))
+        try:
+            yield pipe
+            pipe.results = await pipe._pipe.execute()
+        finally:
+            await pipe._pipe.reset()
+    
+    def register_script(self, name: str, source: str):
+        """Register a Lua script to be preloaded and invoked by SHA"""
+        self._scripts[name] = source
+        self._script_shas.pop(name, None)
+    
+    async def load_scripts(self):
+        for name, source in self._scripts.items():
+            self._script_shas[name] = await self.redis.script_load(source)
+    
+    async def run_script(self, name: str, keys: Sequence[str] = (), args: Sequence = ()):
+        """Run a registered script with EVALSHA, reloading it if Redis lost it"""
+        sha = self._script_shas.get(name)
+        if sha is None:
+            sha = self._script_shas[name] = await self.redis.script_load(self._scripts[name])
+        try:
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            sha = self._script_shas[name] = await self.redis.script_load(self._scripts[name])
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
     
     async def get(self, key: str) -> Optional[str]:
         return await self.redis.get(key)
     
-    async def set(self, key: str, value: str, ex: Optional[int] = None):
-        await self.redis.set(key, value, ex=ex)
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(await self.redis.set(key, value, ex=ex, nx=nx))
     
     async def delete(self, key: str):
         await self.redis.delete(key)
@@ -41,12 +111,24 @@ class RedisClient:
     async def hset(self, name: str, key: str, value: str):
         await self.redis.hset(name, key, value)
     
+    async def hset_many(self, name: str, mapping: dict):
+        await self.redis.hset(name, mapping=mapping)
+    
     async def hgetall(self, name: str) -> dict:
         return await self.redis.hgetall(name)
     
     async def hdel(self, name: str, *keys):
         await self.redis.hdel(name, *keys)
     
+    async def hgetall_bytes(self, name: str) -> dict:
+        return await self.raw.hgetall(name)
+    
+    async def hset_bytes(self, name: str, mapping: dict):
+        await self.raw.hset(name, mapping=mapping)
+    
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(key)
+    
     async def publish(self, channel: str, message: dict):
         await self.redis.publish(channel, json.dumps(message))
     
@@ -58,6 +140,9 @@ class RedisClient:
     async def lpush(self, key: str, *values):
         await self.redis.lpush(key, *values)
     
+    async def lpop(self, key: str) -> Optional[str]:
+        return await self.redis.lpop(key)
+    
     async def lrange(self, key: str, start: int, end: int) -> list:
         return await self.redis.lrange(key, start, end)
     
@@ -0,0 +1,109 @@
+"""Names and lifetimes of every per-room Redis key.
+
+All room data lives under ``room:{id}`` so a room can be accounted for and
+removed as a unit. Every key gets a TTL when it is written: long-lived keys
+expire ROOM_KEY_TTL_SECONDS after the room's last write, per-prompt keys
+shortly after the prompt is over.
+"""
+from typing import Iterable, List, Optional
+
+from app.core.config import settings
+
+# State hash, prompt queue and anything else kept for the life of the room
+ROOM_TTL_SECONDS = settings.ROOM_KEY_TTL_SECONDS
+VOTE_TTL_SECONDS = 300  # 5 minutes
+ANSWER_TTL_SECONDS = 300  # 5 minutes
+HOT_SEAT_QUESTION_TTL_SECONDS = 600  # 10 minutes
+TOD_RESULT_TTL_SECONDS = 3600  # 1 hour
+CANVAS_TTL_SECONDS = settings.STROKE_LOG_TTL_SECONDS
+JOURNAL_TTL_SECONDS = settings.ACTION_JOURNAL_TTL_SECONDS
+
+ROOM_PREFIX = "room:"
+
+
+def room_state(room_id) -> str:
+    return f"room:{room_id}"
+
+
+def room_prompts(room_id) -> str:
+    return f"room:{room_id}:prompts"
+
+
+def room_prompts_lock(room_id) -> str:
+    return f"room:{room_id}:prompts:lock"
+
+
+def room_votes(room_id, prompt_id) -> str:
+    return f"room:{room_id}:votes:{prompt_id}"
+
+
+def room_vote_counts(room_id, prompt_id="") -> str:
+    """Vote counter hash; without a prompt id, the prefix for all of them"""
+    return f"room:{room_id}:vote_counts:{prompt_id}"
+
+
+def room_answers(room_id, prompt_id) -> str:
+    return f"room:{room_id}:answers:{prompt_id}"
+
+
+def room_tod_results(room_id) -> str:
+    return f"room:{room_id}:tod_results"
+
+
+def room_hot_seat_questions(room_id) -> str:
+    return f"room:{room_id}:hot_seat_questions"
+
+
+def room_strokes(room_id) -> str:
+    return f"room:{room_id}:strokes"
+
+
+def room_canvas(room_id) -> str:
+    return f"room:{room_id}:canvas"
+
+
+def room_canvas_lock(room_id) -> str:
+    return f"room:{room_id}:canvas:lock"
+
+
+def room_journal(room_id) -> str:
+    return f"room:{room_id}:journal"
+
+
+def room_sids(room_id) -> str:
+    """Socket ids in the room, across workers"""
+    return f"room:{room_id}:sids"
+
+
+def all_room_keys(room_id, prompt_ids: Iterable = ()) -> List[str]:
+    """Every key a room may own; per-prompt keys for the given prompts"""
+    keys = [
+        room_state(room_id),
+        room_prompts(room_id),
+        room_prompts_lock(room_id),
+        room_tod_results(room_id),
+        room_hot_seat_questions(room_id),
+        room_strokes(room_id),
+        room_canvas(room_id),
+        room_canvas_lock(room_id),
+        room_journal(room_id),
+        room_sids(room_id)
+    ]
+    for prompt_id in prompt_ids:
+        keys += [
+            room_votes(room_id, prompt_id),
+            room_vote_counts(room_id, prompt_id),
+            room_answers(room_id, prompt_id)
+        ]
+    return keys
+
+
+def parse_room_key(key: str) -> Optional[tuple]:
+    """(room_id, key_type) for a room key, None for anything else"""
+    if not key.startswith(ROOM_PREFIX):
+        return None
+    parts = key.split(":")
+    if not parts[1].isdigit():
+        # e.g. room:invite:{code}
+        return None
+    return parts[1], parts[2] if len(parts) > 2 else "state"
@@ -1,16 +1,39 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hash_in_flight = Gauge(
+    "password_hash_in_flight",
+    "Password hash/verify calls running or queued"
+)
+password_hash_rejected = Counter(
+    "password_hash_rejected_total",
+    "Password hash/verify calls rejected because the pool was saturated"
+)
 
 ALGORITHM = settings.ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
 
 
+@lru_cache(maxsize=None)
+def pwd_context():
+    """The passlib context, imported and built on first use to keep startup cheap"""
+    from passlib.context import CryptContext
+
+    # Hashes with other rounds (or schemes) are flagged for rehash on login
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -22,6 +45,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def access_token_claims(user) -> dict:
+    """Claims for a user's access token"""
+    claims = {"sub": str(user.id)}
+    if settings.AUTH_TOKEN_CLAIMS:
+        claims.update({
+            "is_paid": bool(user.is_paid),
+            "role": user.role or "free",
+            "is_active": bool(user.is_active)
+        })
+    return claims
+
+
 def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -31,11 +66,55 @@ def create_refresh_token(data: dict):
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full"""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    At most ``workers`` calls run at once and ``max_queue`` more may wait;
+    beyond that calls fail fast with PasswordHasherBusy.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.capacity = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context().hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash if the stored one is outdated"""
+        return await self._run(pwd_context().verify_and_update, password, hashed_password)
+
+    async def _run(self, func, *args):
+        if self._pending >= self.capacity:
+            password_hash_rejected.inc()
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        password_hash_in_flight.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            password_hash_in_flight.dec()
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
 
 
 def decode_token(token: str) -> Optional[dict]:
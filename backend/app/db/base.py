@@ -1,20 +1,76 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+db_pool_wait_seconds = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent obtaining a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total",
+    "Connection checkouts that gave up after DB_POOL_TIMEOUT seconds"
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    # Prepared statements cached per connection by the asyncpg dialect
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+)
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
 Base = declarative_base()
 
+Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out"
+).set_function(lambda: engine.pool.checkedout())
+Gauge(
+    "db_pool_overflow",
+    "Connections open beyond DB_POOL_SIZE"
+).set_function(lambda: max(engine.pool.overflow(), 0))
+Gauge(
+    "db_pool_size",
+    "Configured database pool size"
+).set_function(lambda: engine.pool.size())
+
 
 async def get_db():
+    # A session only checks out a connection on its first query, so
+    # endpoints that return early never touch the pool
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,60 @@
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from app.db.base import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# Alembic head this code expects. Bump it with every new migration.
+SCHEMA_VERSION = "0006_session_checkpoint"
+
+
+class SchemaNotMigrated(RuntimeError):
+    pass
+
+
+async def create_all():
+    """Create missing tables from the models (development, tests).
+
+    A database that was empty is then at the head revision, so it is
+    stamped with SCHEMA_VERSION for later migrations and FAST_BOOT.
+    """
+    async with engine.begin() as conn:
+        existing = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        await conn.run_sync(Base.metadata.create_all)
+        if not existing:
+            # Same table alembic creates on its first upgrade
+            await conn.execute(text(
+                "CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL, "
+                "CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+            ))
+            await conn.execute(
+                text("INSERT INTO alembic_version (version_num) VALUES (:version)"),
+                {"version": SCHEMA_VERSION}
+            )
+
+
+async def check_schema_version():
+    """Fast-boot startup check: one SELECT instead of reflecting every table.
+
+    Fails when the database was never migrated. A different revision only
+    logs a warning, because during a rolling deploy the database may
+    already be one migration ahead of the workers still running.
+    """
+    async with engine.connect() as conn:
+        try:
+            version = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            version = None
+
+    if version is None:
+        raise SchemaNotMigrated(
+            "Database has no alembic revision; run `alembic upgrade head` "
+            "or start without FAST_BOOT"
+        )
+    if version != SCHEMA_VERSION:
+        logger.warning(
+            "Database schema is at %s but this build expects %s", version, SCHEMA_VERSION
+        )
@@ -2,15 +2,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import sentry_sdk
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 from prometheus_client import make_asgi_app
 
 from app.core.config import settings
 from app.core.redis_client import redis_client
 from app.api.endpoints import auth, rooms, payments, games
-from app.db.base import engine, Base
-from app.websocket.socketio_app import create_socketio_app
+from app.db.base import engine
+from app.db.schema import check_schema_version, create_all
+from app.websocket.socketio_app import create_socketio_app, timer_scheduler
+from app.websocket.journal import action_journal
+from app.services.paypal import paypal_service
+from app.services.room_state import room_checkpointer
+from app.services.prompt_refill import prompt_refiller
+from app.services.redis_memory import redis_memory_sampler
 
 
 @asynccontextmanager
@@ -21,20 +25,46 @@ async def lifespan(app: FastAPI):
     # Connect to Redis
     await redis_client.connect()
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Migrations own the schema in fast-boot mode; just check the revision
+    if settings.FAST_BOOT:
+        await check_schema_version()
+    else:
+        await create_all()
+    
+    # Flush game actions to Redis in the background
+    action_journal.start()
+    
+    # Fire room timers (only the elected worker does)
+    timer_scheduler.start()
+    
+    # Checkpoint changed room states to Postgres every few seconds
+    room_checkpointer.start()
+    
+    # Top up room prompt queues that are running low
+    prompt_refiller.start()
+    
+    # Per-room Redis memory for /metrics
+    redis_memory_sampler.start()
     
     yield
     
     # Shutdown
     print("Shutting down...")
+    await timer_scheduler.stop()
+    await action_journal.stop()
+    await redis_memory_sampler.stop()
+    await prompt_refiller.stop()
+    await room_checkpointer.stop()
+    await paypal_service.close()
     await redis_client.disconnect()
     await engine.dispose()
 
 
-# Initialize Sentry if DSN is provided
+# Initialize Sentry if DSN is provided (sentry_sdk is only imported then)
 if settings.SENTRY_DSN:
+    import sentry_sdk
+    from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+    
     sentry_sdk.init(
         dsn=settings.SENTRY_DSN,
         traces_sample_rate=0.1,
@@ -3,6 +3,7 @@ from app.models.payment import Payment
 from app.models.room import Room, RoomParticipant
 from app.models.game import GameSession, Theme
 from app.models.prompts import (
+    Prompt,
     WouldYouRatherPrompt,
     TruthOrDarePrompt,
     SixtySecondsPrompt,
@@ -17,6 +18,7 @@ __all__ = [
     "RoomParticipant",
     "GameSession",
     "Theme",
+    "Prompt",
     "WouldYouRatherPrompt",
     "TruthOrDarePrompt",
     "SixtySecondsPrompt",
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, JSON
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -12,7 +12,10 @@ class GameSession(Base):
     room_id = Column(Integer, ForeignKey("rooms.id"), unique=True, nullable=False)
     game_state = Column(JSON, default={})
     current_round = Column(Integer, default=0)
-    used_prompt_ids = Column(JSON, default=[])
+    used_prompt_ids = Column(JSON, default=[])  # Prompts shown in the room, written at game end
+    # Last room state written by the checkpointer (see services/room_state.py)
+    checkpoint = Column(Text, nullable=True)
+    checkpoint_version = Column(Integer, nullable=True)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
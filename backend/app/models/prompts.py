@@ -1,48 +1,98 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Table, ForeignKey, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
-# Association tables for many-to-many relationships
+# Links for the unified prompt table, keyed like the per-game tables below
+prompt_themes = Table(
+    'prompt_themes',
+    Base.metadata,
+    Column('prompt_id', Integer, ForeignKey('prompts.id', ondelete='CASCADE'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_prompt_themes_theme_prompt', 'theme_id', 'prompt_id')
+)
+
+
+class Prompt(Base):
+    """A prompt for any game.
+
+    ``payload`` holds the game-specific fields exactly as the API returns
+    them (e.g. option_a/option_b for Would You Rather), so formatting a
+    prompt is just adding its id. ``import_key`` identifies imported
+    prompts so re-running an import never duplicates them.
+    """
+    __tablename__ = "prompts"
+    __table_args__ = (
+        Index("ix_prompts_game_safe", "game_slug", "id", postgresql_where=text("is_safe = true")),
+        Index("ix_prompts_game_import_key", "game_slug", "import_key", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    game_slug = Column(String, nullable=False)
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    difficulty = Column(String)
+    is_safe = Column(Boolean, default=True)
+    import_key = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    themes = relationship("Theme", secondary=prompt_themes)
+
+
+# Legacy per-game prompt tables. Prompts are served from the unified table
+# above; these stay mapped for the 0004 data migration and for comparison
+# benchmarks until the old tables are dropped.
+#
+# Association tables for many-to-many relationships. The primary key serves
+# prompt -> themes lookups, the reverse index theme -> prompts.
 would_you_rather_themes = Table(
     'would_you_rather_themes',
     Base.metadata,
-    Column('prompt_id', Integer, ForeignKey('prompts_would_you_rather.id')),
-    Column('theme_id', Integer, ForeignKey('themes.id'))
+    Column('prompt_id', Integer, ForeignKey('prompts_would_you_rather.id'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_would_you_rather_themes_theme_prompt', 'theme_id', 'prompt_id')
 )
 
 truth_or_dare_themes = Table(
     'truth_or_dare_themes',
     Base.metadata,
-    Column('prompt_id', Integer, ForeignKey('prompts_truth_or_dare.id')),
-    Column('theme_id', Integer, ForeignKey('themes.id'))
+    Column('prompt_id', Integer, ForeignKey('prompts_truth_or_dare.id'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_truth_or_dare_themes_theme_prompt', 'theme_id', 'prompt_id')
 )
 
 sixty_seconds_themes = Table(
     'sixty_seconds_themes',
     Base.metadata,
-    Column('prompt_id', Integer, ForeignKey('prompts_sixty_seconds.id')),
-    Column('theme_id', Integer, ForeignKey('themes.id'))
+    Column('prompt_id', Integer, ForeignKey('prompts_sixty_seconds.id'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_sixty_seconds_themes_theme_prompt', 'theme_id', 'prompt_id')
 )
 
 hot_seat_themes = Table(
     'hot_seat_themes',
     Base.metadata,
-    Column('prompt_id', Integer, ForeignKey('prompts_hot_seat.id')),
-    Column('theme_id', Integer, ForeignKey('themes.id'))
+    Column('prompt_id', Integer, ForeignKey('prompts_hot_seat.id'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_hot_seat_themes_theme_prompt', 'theme_id', 'prompt_id')
 )
 
 draw_guess_themes = Table(
     'draw_guess_themes',
     Base.metadata,
-    Column('prompt_id', Integer, ForeignKey('prompts_draw_guess.id')),
-    Column('theme_id', Integer, ForeignKey('themes.id'))
+    Column('prompt_id', Integer, ForeignKey('prompts_draw_guess.id'), primary_key=True),
+    Column('theme_id', Integer, ForeignKey('themes.id'), primary_key=True),
+    Index('ix_draw_guess_themes_theme_prompt', 'theme_id', 'prompt_id')
 )
 
 
 class WouldYouRatherPrompt(Base):
     __tablename__ = "prompts_would_you_rather"
+    __table_args__ = (
+        Index("ix_prompts_would_you_rather_safe", "id", postgresql_where=text("is_safe = true")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     option_a = Column(Text, nullable=False)
@@ -56,6 +106,9 @@ class WouldYouRatherPrompt(Base):
 
 class TruthOrDarePrompt(Base):
     __tablename__ = "prompts_truth_or_dare"
+    __table_args__ = (
+        Index("ix_prompts_truth_or_dare_safe", "id", postgresql_where=text("is_safe = true")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     prompt_type = Column(String, nullable=False)  # truth or dare
@@ -69,6 +122,9 @@ class TruthOrDarePrompt(Base):
 
 class SixtySecondsPrompt(Base):
     __tablename__ = "prompts_sixty_seconds"
+    __table_args__ = (
+        Index("ix_prompts_sixty_seconds_safe", "id", postgresql_where=text("is_safe = true")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     category = Column(Text, nullable=False)
@@ -81,6 +137,9 @@ class SixtySecondsPrompt(Base):
 
 class HotSeatPrompt(Base):
     __tablename__ = "prompts_hot_seat"
+    __table_args__ = (
+        Index("ix_prompts_hot_seat_safe", "id", postgresql_where=text("is_safe = true")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     question = Column(Text, nullable=False)
@@ -93,6 +152,9 @@ class HotSeatPrompt(Base):
 
 class DrawGuessPrompt(Base):
     __tablename__ = "prompts_draw_guess"
+    __table_args__ = (
+        Index("ix_prompts_draw_guess_safe", "id", postgresql_where=text("is_safe = true")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     word = Column(String, nullable=False)
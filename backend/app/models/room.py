@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 import secrets
 
@@ -15,6 +15,8 @@ class Room(Base):
     invite_code = Column(String, unique=True, index=True, nullable=False)
     status = Column(String, default="open")  # open, locked, active, closed
     game_state = Column(JSON, default={})
+    # Denormalised; incremented in the same transaction as each participant insert
+    participant_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -35,6 +37,10 @@ class Room(Base):
 
 class RoomParticipant(Base):
     __tablename__ = "room_participants"
+    __table_args__ = (
+        # Membership checks; guests (NULL user_id) never conflict
+        Index("ix_room_participants_room_user", "room_id", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
@@ -0,0 +1,73 @@
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def _singular(word: str) -> str:
+    """Cheap English plural folding; only needs to map both forms to one key"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if len(word) < 3:
+        return word
+    # "movie(s)", "city"/"cities" and "pie(s)" all end up on "i"
+    if word.endswith("ie"):
+        return word[:-1]
+    if word.endswith("y"):
+        return word[:-1] + "i"
+    if word.endswith("e"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def normalize_answer(answer: str) -> str:
+    """Reduce an answer to a comparison key.
+
+    Strips accents, case, punctuation, repeated whitespace and simple
+    plurals, so "Crème Brûlée!" and "creme brulees" compare equal.
+    """
+    text = answer
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _NON_WORD.sub(" ", text.casefold())
+    return " ".join(_singular(word) for word in text.split())
+
+
+def score_answers(
+    answers_by_player: Dict[str, Iterable[str]]
+) -> Tuple[Dict[str, int], int]:
+    """Score a round of 60 Seconds.
+
+    A player scores one point for every answer (after normalisation) that no
+    other player gave. Returns (scores, total number of distinct answers).
+    """
+    keys_by_player: Dict[str, set] = {}
+    for player, answers in answers_by_player.items():
+        keys = {normalize_answer(answer) for answer in answers}
+        keys.discard("")
+        keys_by_player[player] = keys
+
+    occurrences = Counter(key for keys in keys_by_player.values() for key in keys)
+
+    scores = {
+        player: sum(1 for key in keys if occurrences[key] == 1)
+        for player, keys in keys_by_player.items()
+    }
+    return scores, len(occurrences)
+
+
+def unique_answers(answers: List[str]) -> List[str]:
+    """Drop answers that normalise to one already given, keeping order"""
+    seen = set()
+    result = []
+    for answer in answers:
+        key = normalize_answer(answer)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(answer)
+    return result
@@ -1,19 +1,79 @@
+import asyncio
+import json
 import random
-from typing import List, Dict, Any, Optional
+import uuid
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
+from prometheus_client import Counter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from sqlalchemy.sql.expression import func
 
-from app.models import (
-    WouldYouRatherPrompt,
-    TruthOrDarePrompt,
-    SixtySecondsPrompt,
-    HotSeatPrompt,
-    DrawGuessPrompt,
-    Theme
-)
+from app.core import redis_keys
+from app.core.config import settings
 from app.core.redis_client import redis_client
+from app.services.prompt_pool import prompt_pool_index
+from app.services.prompt_repository import prompt_repository, GAME_SLUGS
+from app.services.prompt_cache import prompt_cache
+from app.services.room_state import room_state_store, DIRTY_KEY
+from app.services.seen_prompts import seen_prompts
+from app.services.vote_engine import vote_engine, VOTE_OPTIONS
+from app.services.answer_scoring import score_answers, unique_answers
+from app.websocket.canvas import canvas_store
+
+prompt_refills = Counter(
+    "prompt_queue_refills_total",
+    "Room prompt queues topped up"
+)
+prompt_queue_empty = Counter(
+    "prompt_queue_empty_total",
+    "Next-prompt requests that found the room queue empty and refilled inline"
+)
+
+# Number of prompts queued for a room when a session starts (and per top-up)
+SESSION_PROMPT_COUNT = 50
+
+# Rooms whose prompt queue fell below PROMPT_REFILL_THRESHOLD
+LOW_QUEUES_KEY = "prompt_queues:low"
+
+# Per-room refill lock, so two refills never read the same queue and both append
+REFILL_LOCK_MS = 10_000
+# How long a next-prompt call with an empty queue waits for another refill
+INLINE_REFILL_WAIT_SECONDS = 1.0
+
+# Release the refill locks (KEYS) still held with this token (ARGV[1])
+RELEASE_REFILL_LOCKS_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+# Compare a normalised guess with the current word and record the winner
+# (bumping the room state version like RoomStateStore.update).
+# Returns -1 when there is no active drawing, 1 for a correct guess, else 0.
+DRAW_GUESS_CHECK_SCRIPT = """
+local word = redis.call('HGET', KEYS[1], 'current_word_normalized')
+if not word then
+    local raw = redis.call('HGET', KEYS[1], 'current_word')
+    if not raw then
+        return -1
+    end
+    word = string.lower(raw):match('^%s*(.-)%s*$')
+end
+if ARGV[1] ~= '' and ARGV[1] == word then
+    redis.call('HSET', KEYS[1], 'round_winner', ARGV[2])
+    redis.call('HINCRBY', KEYS[1], 'state_version', 1)
+    redis.call('SADD', KEYS[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+redis_client.register_script("draw_guess_check", DRAW_GUESS_CHECK_SCRIPT)
+redis_client.register_script("prompt_refill_unlock", RELEASE_REFILL_LOCKS_SCRIPT)
 
 
 class GameLogicService:
@@ -25,115 +85,217 @@ class GameLogicService:
             "hot_seat": self._handle_hot_seat,
             "draw_guess": self._handle_draw_guess
         }
+        # Run when a room's server-side timer expires
+        self.round_end_handlers = {
+            "sixty_seconds": self._end_sixty_seconds_round
+        }
     
     async def load_prompts_for_session(
         self,
         db: AsyncSession,
-        game_slug: str,
+        game_slug: Union[str, List[str]],
         theme_ids: List[int],
-        room_id: int
+        room_id: int,
+        host_id: Optional[int] = None
     ) -> List[int]:
-        """Load 50 random prompt IDs for a session"""
-        prompt_model = self._get_prompt_model(game_slug)
-        if not prompt_model:
+        """Load 50 random prompt IDs for a session.
+
+        ``game_slug`` may be a list for rooms that mix games; the prompts are
+        then sampled across all of them. Prompts the host or room has seen
+        recently are skipped while there are unseen ones left.
+        """
+        game_slugs = [game_slug] if isinstance(game_slug, str) else list(game_slug)
+        game_slugs = [slug for slug in game_slugs if slug in GAME_SLUGS]
+        if not game_slugs:
             return []
         
-        # Build query with theme filter
-        query = select(prompt_model.id).where(prompt_model.is_safe == True)
-        
-        if theme_ids:
-            # Join with themes
-            query = query.join(prompt_model.themes).where(Theme.id.in_(theme_ids))
-        
-        # Order randomly and limit to 50
-        query = query.order_by(func.random()).limit(50)
+        # Sample from the in-memory pools instead of ORDER BY random()
+        await prompt_pool_index.ensure_loaded(db, game_slugs)
+        seen = await seen_prompts.load(host_id, room_id)
+        prompt_ids = prompt_pool_index.sample(
+            game_slugs, theme_ids, SESSION_PROMPT_COUNT, exclude=seen
+        )
         
-        result = await db.execute(query)
-        prompt_ids = [row[0] for row in result.fetchall()]
+        # Warm the prompt cache so next-prompt never hits the database
+        await self.preload_prompts(db, prompt_ids)
         
         # Store in Redis
-        key = f"room:{room_id}:prompts"
+        key = redis_keys.room_prompts(room_id)
         if prompt_ids:
-            await redis_client.delete(key)  # Clear existing
-            await redis_client.lpush(key, *[str(id) for id in prompt_ids])
-            await redis_client.expire(key, 86400)  # 24 hours
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)  # Clear existing
+                pipe.lpush(key, *[str(id) for id in prompt_ids])
+                pipe.expire(key, redis_keys.ROOM_TTL_SECONDS)
         
         return prompt_ids
     
+    async def refill_rooms(self, db: AsyncSession, room_ids: List[int]) -> int:
+        """Top up the prompt queues of several rooms in one batch.
+
+        Uses the game, themes and host recorded in the room state at game
+        start. Rooms whose queue is back above the low-water mark, or that
+        another refill holds the lock of, are skipped. The new prompts are
+        preloaded with one query and appended with one pipeline. Returns the
+        number of prompts added.
+        """
+        token = uuid.uuid4().hex
+        async with redis_client.pipeline() as pipe:
+            for room_id in room_ids:
+                pipe.set(redis_keys.room_prompts_lock(room_id), token, px=REFILL_LOCK_MS, nx=True)
+        room_ids = [room_id for room_id, locked in zip(room_ids, pipe.results) if locked]
+        if not room_ids:
+            return 0
+        
+        try:
+            return await self._refill_locked(db, room_ids)
+        finally:
+            await redis_client.run_script(
+                "prompt_refill_unlock",
+                keys=[redis_keys.room_prompts_lock(room_id) for room_id in room_ids],
+                args=[token]
+            )
+    
+    async def _refill_locked(self, db: AsyncSession, room_ids: List[int]) -> int:
+        async with redis_client.pipeline() as pipe:
+            for room_id in room_ids:
+                pipe.hgetall(redis_keys.room_state(room_id))
+                pipe.lrange(redis_keys.room_prompts(room_id), 0, -1)
+        
+        additions = {}
+        for room_id, room_state, queued in zip(room_ids, pipe.results[::2], pipe.results[1::2]):
+            game_slug = room_state.get("game_slug")
+            if not game_slug or len(queued) >= settings.PROMPT_REFILL_THRESHOLD:
+                continue
+            theme_ids = [int(t) for t in room_state.get("theme_ids", "").split(",") if t]
+            
+            await prompt_pool_index.ensure_loaded(db, game_slug)
+            queued = {int(id) for id in queued}
+            seen = await seen_prompts.load(room_state.get("host_id") or None, room_id, extra=queued)
+            # Cycling back may return seen prompts, but never ones still queued
+            prompt_ids = [
+                prompt_id for prompt_id in prompt_pool_index.sample(
+                    game_slug, theme_ids, SESSION_PROMPT_COUNT, exclude=seen
+                )
+                if prompt_id not in queued
+            ]
+            if prompt_ids:
+                additions[room_id] = prompt_ids
+        if not additions:
+            return 0
+        
+        await self.preload_prompts(db, [id for ids in additions.values() for id in ids])
+        async with redis_client.pipeline() as pipe:
+            for room_id, prompt_ids in additions.items():
+                key = redis_keys.room_prompts(room_id)
+                pipe.rpush(key, *[str(id) for id in prompt_ids])
+                pipe.expire(key, redis_keys.ROOM_TTL_SECONDS)
+        
+        prompt_refills.inc(len(additions))
+        return sum(len(ids) for ids in additions.values())
+    
     async def get_next_prompt(
         self,
         db: AsyncSession,
         room_id: int,
-        game_slug: str
+        game_slug: str,
+        host_id: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
-        """Get the next prompt for a room"""
-        key = f"room:{room_id}:prompts"
+        """Get the next prompt for a room.
+
+        Queues that drop below the low-water mark are flagged for the
+        background refiller; a queue that is already empty is refilled
+        inline.
+        """
+        key = redis_keys.room_prompts(room_id)
         
         # Pop a prompt ID from the list
-        prompt_id_str = await redis_client.lpop(key)
+        async with redis_client.pipeline() as pipe:
+            pipe.lpop(key)
+            pipe.llen(key)
+        prompt_id_str, remaining = pipe.results
+        
         if not prompt_id_str:
-            return None
+            # Ran dry before a background top-up landed
+            prompt_queue_empty.inc()
+            prompt_id_str = await self._refill_and_pop(db, room_id)
+            if not prompt_id_str:
+                return None
+        elif remaining < settings.PROMPT_REFILL_THRESHOLD:
+            await redis_client.sadd(LOW_QUEUES_KEY, str(room_id))
         
         prompt_id = int(prompt_id_str)
+        await room_state_store.update(
+            room_id, {"current_prompt_id": prompt_id}, round_delta=1
+        )
+        await seen_prompts.mark([prompt_id], host_id=host_id, room_id=room_id)
         
-        # Get the prompt from database
-        prompt_model = self._get_prompt_model(game_slug)
-        if not prompt_model:
-            return None
+        return await self._formatted_prompt(db, game_slug, prompt_id)
+    
+    async def _refill_and_pop(self, db: AsyncSession, room_id: int) -> Optional[str]:
+        """Refill an empty queue inline, or wait for the refill already running"""
+        key = redis_keys.room_prompts(room_id)
+        await redis_client.srem(LOW_QUEUES_KEY, str(room_id))
+        deadline = asyncio.get_running_loop().time() + INLINE_REFILL_WAIT_SECONDS
+        while True:
+            await self.refill_rooms(db, [room_id])
+            prompt_id_str = await redis_client.lpop(key)
+            if prompt_id_str:
+                return prompt_id_str
+            # Nothing to add, unless another refill holds the lock
+            if not await redis_client.exists(redis_keys.room_prompts_lock(room_id)):
+                return None
+            if asyncio.get_running_loop().time() >= deadline:
+                return None
+            await asyncio.sleep(0.05)
+    
+    async def peek_prompts(
+        self,
+        db: AsyncSession,
+        room_id: int,
+        game_slug: str,
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """The next k queued prompts, without taking them off the queue"""
+        if k <= 0:
+            return []
         
-        result = await db.execute(
-            select(prompt_model).where(prompt_model.id == prompt_id)
-        )
-        prompt = result.scalar_one_or_none()
+        prompt_ids = [int(id) for id in await redis_client.lrange(redis_keys.room_prompts(room_id), 0, k - 1)]
+        await self.preload_prompts(db, prompt_ids)
+        prompts = [await self._formatted_prompt(db, game_slug, prompt_id) for prompt_id in prompt_ids]
+        return [prompt for prompt in prompts if prompt is not None]
+    
+    async def _formatted_prompt(
+        self,
+        db: AsyncSession,
+        game_slug: str,
+        prompt_id: int
+    ) -> Optional[Dict[str, Any]]:
+        prompt = prompt_cache.get(game_slug, prompt_id)
+        if prompt is not None:
+            return prompt
         
-        if not prompt:
+        # Cache miss (expired, evicted or from another game), fall back to the database
+        found = await prompt_repository.get(db, prompt_id)
+        if not found:
             return None
         
-        # Format prompt based on game type
-        return self._format_prompt(game_slug, prompt)
-    
-    def _get_prompt_model(self, game_slug: str):
-        """Get the appropriate prompt model for a game"""
-        models = {
-            "would_you_rather": WouldYouRatherPrompt,
-            "truth_or_dare": TruthOrDarePrompt,
-            "sixty_seconds": SixtySecondsPrompt,
-            "hot_seat": HotSeatPrompt,
-            "draw_guess": DrawGuessPrompt
-        }
-        return models.get(game_slug)
+        prompt_game, formatted = found
+        prompt_cache.put(prompt_game, prompt_id, formatted)
+        return formatted
     
-    def _format_prompt(self, game_slug: str, prompt) -> Dict[str, Any]:
-        """Format a prompt for API response"""
-        if game_slug == "would_you_rather":
-            return {
-                "id": prompt.id,
-                "option_a": prompt.option_a,
-                "option_b": prompt.option_b
-            }
-        elif game_slug == "truth_or_dare":
-            return {
-                "id": prompt.id,
-                "type": prompt.prompt_type,
-                "text": prompt.text
-            }
-        elif game_slug == "sixty_seconds":
-            return {
-                "id": prompt.id,
-                "category": prompt.category
-            }
-        elif game_slug == "hot_seat":
-            return {
-                "id": prompt.id,
-                "question": prompt.question
-            }
-        elif game_slug == "draw_guess":
-            return {
-                "id": prompt.id,
-                "word": prompt.word,
-                "difficulty": prompt.difficulty
-            }
-        return {}
+    async def preload_prompts(
+        self,
+        db: AsyncSession,
+        prompt_ids: List[int]
+    ):
+        """Fetch and format all uncached prompts in a single IN (...) query"""
+        missing = prompt_cache.missing_any(prompt_ids)
+        if not missing:
+            return
+        
+        prompts = await prompt_repository.fetch(db, missing)
+        for prompt_id, (prompt_game, formatted) in prompts.items():
+            prompt_cache.put(prompt_game, prompt_id, formatted)
     
     async def process_game_action(
         self,
@@ -149,6 +311,35 @@ class GameLogicService:
         
         return await handler(room_id, action, data)
     
+    async def end_round(
+        self,
+        room_id: int,
+        game_slug: str,
+        room_state: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """Round-end logic for an expired timer; None if the game has none"""
+        handler = self.round_end_handlers.get(game_slug)
+        if not handler:
+            return None
+        
+        return await handler(room_id, room_state)
+    
+    async def _end_sixty_seconds_round(
+        self,
+        room_id: int,
+        room_state: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """Score the answers submitted for the timed prompt"""
+        prompt_id = room_state.get("timer_prompt_id")
+        if not prompt_id:
+            return None
+        
+        result = await self._handle_sixty_seconds(
+            room_id, "calculate_scores", {"prompt_id": prompt_id}
+        )
+        result["prompt_id"] = int(prompt_id)
+        return result
+    
     async def _handle_would_you_rather(
         self,
         room_id: int,
@@ -164,22 +355,18 @@ class GameLogicService:
             if not all([user_id, choice, prompt_id]):
                 return {"error": "Missing required data"}
             
-            # Store vote in Redis
-            vote_key = f"room:{room_id}:votes:{prompt_id}"
-            await redis_client.hset(vote_key, str(user_id), choice)
-            await redis_client.expire(vote_key, 300)  # 5 minutes
+            if choice not in VOTE_OPTIONS:
+                return {"error": "Invalid choice"}
             
-            # Get current vote counts
-            all_votes = await redis_client.hgetall(vote_key)
-            vote_counts = {"a": 0, "b": 0}
-            for vote in all_votes.values():
-                if vote in vote_counts:
-                    vote_counts[vote] += 1
+            # Record the vote and read the running counters atomically
+            vote_counts, total_votes = await vote_engine.cast_vote(
+                room_id, prompt_id, user_id, choice
+            )
             
             return {
                 "success": True,
                 "vote_counts": vote_counts,
-                "total_votes": len(all_votes)
+                "total_votes": total_votes
             }
         
         return {"error": "Unknown action"}
@@ -197,13 +384,10 @@ class GameLogicService:
             result = data.get("result")  # "completed" or "skipped"
             
             # Store result
-            result_key = f"room:{room_id}:tod_results"
-            await redis_client.hset(
-                result_key,
-                f"{user_id}:{prompt_id}",
-                result
-            )
-            await redis_client.expire(result_key, 3600)  # 1 hour
+            result_key = redis_keys.room_tod_results(room_id)
+            async with redis_client.pipeline() as pipe:
+                pipe.hset(result_key, f"{user_id}:{prompt_id}", result)
+                pipe.expire(result_key, redis_keys.TOD_RESULT_TTL_SECONDS)
             
             return {"success": True, "result": result}
         
@@ -212,15 +396,9 @@ class GameLogicService:
             prompt_type = data.get("type")  # "truth" or "dare"
             
             # Store current player
-            await redis_client.hset(
-                f"room:{room_id}",
-                "current_player",
-                str(player_id)
-            )
-            await redis_client.hset(
-                f"room:{room_id}",
-                "current_type",
-                prompt_type
+            await room_state_store.update(
+                room_id,
+                {"current_player": player_id, "current_type": prompt_type}
             )
             
             return {"success": True, "player_id": player_id, "type": prompt_type}
@@ -236,46 +414,42 @@ class GameLogicService:
         """Handle 60 Seconds game logic"""
         if action == "submit_answers":
             user_id = data.get("user_id")
-            answers = data.get("answers", [])
+            answers = unique_answers(data.get("answers", []))
             prompt_id = data.get("prompt_id")
             
-            # Store answers
-            answer_key = f"room:{room_id}:answers:{prompt_id}:{user_id}"
-            await redis_client.delete(answer_key)
-            if answers:
-                await redis_client.lpush(answer_key, *answers)
-            await redis_client.expire(answer_key, 300)  # 5 minutes
+            # Store answers in a single per-prompt hash (user -> answers)
+            answer_key = redis_keys.room_answers(room_id, prompt_id)
+            async with redis_client.pipeline() as pipe:
+                pipe.hset(answer_key, str(user_id), json.dumps(answers))
+                pipe.expire(answer_key, redis_keys.ANSWER_TTL_SECONDS)
             
             return {"success": True, "answer_count": len(answers)}
         
         elif action == "calculate_scores":
             prompt_id = data.get("prompt_id")
             
-            # Get all answers for this prompt
-            pattern = f"room:{room_id}:answers:{prompt_id}:*"
-            all_answers = {}
-            unique_answers = set()
-            
-            # This is a simplified version - in production you'd use SCAN
-            # For now, we'll assume we know the user IDs
-            user_ids = data.get("user_ids", [])
+            # Get all answers for this prompt in one fetch
+            stored = await redis_client.hgetall(redis_keys.room_answers(room_id, prompt_id))
+            all_answers = {
+                user_id: json.loads(answers) for user_id, answers in stored.items()
+            }
             
-            for user_id in user_ids:
-                key = f"room:{room_id}:answers:{prompt_id}:{user_id}"
-                user_answers = await redis_client.lrange(key, 0, -1)
-                all_answers[user_id] = user_answers
-                unique_answers.update(answer.lower() for answer in user_answers)
+            # Optionally restrict scoring to the given players
+            user_ids = data.get("user_ids")
+            if user_ids:
+                wanted = {str(user_id) for user_id in user_ids}
+                all_answers = {
+                    user_id: answers for user_id, answers in all_answers.items()
+                    if user_id in wanted
+                }
             
-            # Calculate scores based on unique answers
-            scores = {}
-            for user_id, answers in all_answers.items():
-                unique_count = len(set(answer.lower() for answer in answers))
-                scores[user_id] = unique_count
+            # Score answers that are unique across players
+            scores, total_unique = score_answers(all_answers)
             
             return {
                 "success": True,
                 "scores": scores,
-                "total_unique": len(unique_answers)
+                "total_unique": total_unique
             }
         
         return {"error": "Unknown action"}
@@ -291,11 +465,7 @@ class GameLogicService:
             player_id = data.get("player_id")
             
             # Store current hot seat player
-            await redis_client.hset(
-                f"room:{room_id}",
-                "hot_seat_player",
-                str(player_id)
-            )
+            await room_state_store.update(room_id, {"hot_seat_player": player_id})
             
             return {"success": True, "player_id": player_id}
         
@@ -304,12 +474,10 @@ class GameLogicService:
             question = data.get("question")
             
             # Store question
-            question_key = f"room:{room_id}:hot_seat_questions"
-            await redis_client.lpush(
-                question_key,
-                f"{user_id}:{question}"
-            )
-            await redis_client.expire(question_key, 600)  # 10 minutes
+            question_key = redis_keys.room_hot_seat_questions(room_id)
+            async with redis_client.pipeline() as pipe:
+                pipe.lpush(question_key, f"{user_id}:{question}")
+                pipe.expire(question_key, redis_keys.HOT_SEAT_QUESTION_TTL_SECONDS)
             
             return {"success": True}
         
@@ -325,17 +493,18 @@ class GameLogicService:
         if action == "set_drawer":
             drawer_id = data.get("drawer_id")
             word = data.get("word")
+            if not isinstance(word, str) or not word.strip():
+                return {"error": "Missing required data"}
             
-            # Store drawer and word
-            await redis_client.hset(
-                f"room:{room_id}",
-                "drawer_id",
-                str(drawer_id)
-            )
-            await redis_client.hset(
-                f"room:{room_id}",
-                "current_word",
-                word
+            # Store drawer and word (plus its normalised form for guessing)
+            await room_state_store.update(
+                room_id,
+                {
+                    "drawer_id": drawer_id,
+                    "current_word": word,
+                    "current_word_normalized": word.lower().strip(),
+                    "round_winner": None
+                }
             )
             
             return {"success": True, "drawer_id": drawer_id}
@@ -344,30 +513,24 @@ class GameLogicService:
             user_id = data.get("user_id")
             guess = data.get("guess")
             
-            # Get current word
-            current_word = await redis_client.hget(f"room:{room_id}", "current_word")
+            # Check the guess and record the winner in one round trip
+            outcome = await redis_client.run_script(
+                "draw_guess_check",
+                keys=[redis_keys.room_state(room_id), DIRTY_KEY],
+                args=[(guess or "").lower().strip(), str(user_id), str(room_id)]
+            )
             
-            if not current_word:
+            if outcome < 0:
                 return {"error": "No active drawing"}
             
-            # Check if guess is correct
-            is_correct = guess and guess.lower().strip() == current_word.lower().strip()
-            
-            if is_correct:
-                # Store winner
-                await redis_client.hset(
-                    f"room:{room_id}",
-                    "round_winner",
-                    str(user_id)
-                )
-                
+            if outcome == 1:
                 return {"success": True, "correct": True, "winner_id": user_id}
             
             return {"success": True, "correct": False}
         
         elif action == "clear_canvas":
-            # Clear drawing data
-            await redis_client.delete(f"room:{room_id}:strokes")
+            # Clear drawing data (stroke log and snapshot)
+            await canvas_store.clear(room_id)
             return {"success": True}
         
         return {"error": "Unknown action"}
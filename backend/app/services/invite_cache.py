@@ -0,0 +1,33 @@
+import json
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+class InviteCache:
+    """Short-lived cache of the public room lookup by invite code.
+
+    Frontends poll ``GET /rooms/invite/{code}`` while waiting to join, so the
+    serialised response is kept in Redis for a few seconds. Anything that
+    changes a room's status should call ``invalidate``.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, invite_code: str) -> str:
+        return f"room:invite:{invite_code}"
+
+    async def get(self, invite_code: str) -> Optional[Dict[str, Any]]:
+        cached = await redis_client.get(self._key(invite_code))
+        return json.loads(cached) if cached else None
+
+    async def put(self, invite_code: str, room: Dict[str, Any]):
+        await redis_client.set(self._key(invite_code), json.dumps(room, default=str), ex=self.ttl_seconds)
+
+    async def invalidate(self, invite_code: str):
+        await redis_client.delete(self._key(invite_code))
+
+
+invite_cache = InviteCache(settings.ROOM_INVITE_CACHE_TTL_SECONDS)
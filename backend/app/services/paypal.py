@@ -1,62 +1,184 @@
+import asyncio
+import json
+import time
 from datetime import datetime, timedelta
-from paypalcheckoutsdk.core import PayPalHttpClient, SandboxEnvironment, LiveEnvironment
-from paypalcheckoutsdk.orders import OrdersGetRequest
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import quote
 import logging
 
 from app.core.config import settings
+from app.core.redis_client import redis_client
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+API_BASES = {
+    "sandbox": "https://api-m.sandbox.paypal.com",
+    "live": "https://api-m.paypal.com"
+}
+
+# Refresh the access token this long before PayPal says it expires
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PayPalError(Exception):
+    pass
+
 
 class PayPalService:
+    """Async PayPal Orders client.
+
+    One pooled httpx client is shared by all requests, the OAuth token is
+    reused until shortly before it expires, and transient failures are
+    retried with backoff. Completed orders never change, so successful
+    verifications are cached in Redis by order ID and concurrent
+    verifications of the same order share one request. httpx is imported
+    and the client built on the first PayPal call, not at startup.
+    """
+
     def __init__(self):
-        if settings.PAYPAL_MODE == "sandbox":
-            environment = SandboxEnvironment(
-                client_id=settings.PAYPAL_CLIENT_ID,
-                client_secret=settings.PAYPAL_CLIENT_SECRET
-            )
-        else:
-            environment = LiveEnvironment(
-                client_id=settings.PAYPAL_CLIENT_ID,
-                client_secret=settings.PAYPAL_CLIENT_SECRET
+        self.base_url = settings.PAYPAL_API_BASE or API_BASES.get(settings.PAYPAL_MODE, API_BASES["live"])
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+            
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.PAYPAL_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
             )
-        
-        self.client = PayPalHttpClient(environment)
+        return self._client
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _order_key(self, order_id: str) -> str:
+        return f"paypal:order:{order_id}"
     
     async def verify_order(self, order_id: str) -> dict:
         """Verify a PayPal order and return its details"""
+        cached = await redis_client.get(self._order_key(order_id))
+        if cached:
+            return json.loads(cached)
+        
+        # Share one PayPal round trip between concurrent verifications
+        future = self._in_flight.get(order_id)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[order_id] = future
         try:
-            request = OrdersGetRequest(order_id)
-            response = self.client.execute(request)
-            
-            order = response.result
+            result = await self._verify_order(order_id)
+            future.set_result(result)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[order_id]
+        
+        return result
+    
+    async def _verify_order(self, order_id: str) -> dict:
+        try:
+            order = await self._request("GET", f"/v2/checkout/orders/{quote(order_id, safe='')}")
             
             # Check if order is completed
-            if order.status != 'COMPLETED':
+            if order.get('status') != 'COMPLETED':
                 return {
                     'success': False,
                     'error': 'Order not completed'
                 }
             
             # Extract payment info
-            amount = float(order.purchase_units[0].amount.value)
-            currency = order.purchase_units[0].amount.currency_code
+            amount = order['purchase_units'][0]['amount']
             
-            return {
+            result = {
                 'success': True,
-                'order_id': order.id,
-                'status': order.status,
-                'amount': amount,
-                'currency': currency,
-                'payer_email': order.payer.email_address if hasattr(order.payer, 'email_address') else None
+                'order_id': order['id'],
+                'status': order['status'],
+                'amount': float(amount['value']),
+                'currency': amount['currency_code'],
+                'payer_email': order.get('payer', {}).get('email_address')
             }
-            
+        
         except Exception as e:
             logger.error(f"PayPal order verification failed: {str(e)}")
             return {
                 'success': False,
                 'error': str(e)
             }
+        
+        await redis_client.set(
+            self._order_key(order_id),
+            json.dumps(result),
+            ex=settings.PAYPAL_ORDER_CACHE_TTL_SECONDS
+        )
+        return result
+    
+    async def _request(self, method: str, path: str) -> dict:
+        import httpx
+        
+        for attempt in range(settings.PAYPAL_MAX_RETRIES + 1):
+            try:
+                response = await self.client.request(
+                    method,
+                    path,
+                    headers={"Authorization": f"Bearer {await self._access_token()}"}
+                )
+            except httpx.TransportError as e:
+                if attempt == settings.PAYPAL_MAX_RETRIES:
+                    raise PayPalError(f"PayPal unreachable ({type(e).__name__})") from e
+            else:
+                if response.status_code == 401:
+                    # Token revoked or expired early: fetch a new one and retry
+                    self._token = None
+                elif response.status_code not in RETRY_STATUSES:
+                    if response.is_error:
+                        raise PayPalError(f"PayPal returned {response.status_code}: {response.text}")
+                    return response.json()
+                if attempt == settings.PAYPAL_MAX_RETRIES:
+                    raise PayPalError(f"PayPal returned {response.status_code}")
+            
+            await asyncio.sleep(0.2 * 2 ** attempt)
+    
+    async def _access_token(self) -> str:
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+        
+        async with self._token_lock:
+            # Another request may have refreshed it while we waited
+            if self._token and time.monotonic() < self._token_expires_at:
+                return self._token
+            
+            response = await self.client.post(
+                "/v1/oauth2/token",
+                data={"grant_type": "client_credentials"},
+                auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_CLIENT_SECRET)
+            )
+            if response.is_error:
+                raise PayPalError(f"PayPal token request failed: {response.status_code}")
+            
+            token = response.json()
+            self._token = token["access_token"]
+            self._token_expires_at = (
+                time.monotonic()
+                + max(int(token.get("expires_in", 0)) - TOKEN_REFRESH_MARGIN_SECONDS, 0)
+            )
+            return self._token
     
     def calculate_expiry_date(self, payment_type: str) -> datetime:
         """Calculate the expiry date based on payment type"""
@@ -70,4 +192,4 @@ class PayPalService:
             raise ValueError(f"Invalid payment type: {payment_type}")
 
 
-paypal_service = PayPalService()
\ No newline at end of file
+paypal_service = PayPalService()
@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.models import User
+
+principal_cache_hits = Counter(
+    "principal_cache_hits_total",
+    "User principal cache hits",
+    ["tier"]
+)
+principal_cache_misses = Counter(
+    "principal_cache_misses_total",
+    "User principal cache misses (loaded from the database)"
+)
+
+
+def principal_mapping(user: User) -> Dict[str, str]:
+    """The fields of a user needed to authorise requests, as strings"""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "is_paid": "1" if user.is_paid else "0",
+        "paid_until": user.paid_until.isoformat() if user.paid_until else "",
+        "role": user.role or "free",
+        "is_active": "1" if user.is_active else "0",
+        "created_at": user.created_at.isoformat() if user.created_at else ""
+    }
+
+
+def principal_user(mapping: Dict[str, str]) -> User:
+    """Build a transient (session-less) User from a cached mapping"""
+    return User(
+        id=int(mapping["id"]),
+        email=mapping["email"],
+        is_paid=mapping["is_paid"] == "1",
+        paid_until=datetime.fromisoformat(mapping["paid_until"]) if mapping["paid_until"] else None,
+        role=mapping["role"],
+        is_active=mapping["is_active"] == "1",
+        created_at=datetime.fromisoformat(mapping["created_at"]) if mapping["created_at"] else None
+    )
+
+
+class PrincipalCache:
+    """Two-tier cache of the user fields checked on every request.
+
+    A small in-process LRU with a short TTL sits in front of a
+    ``user:{id}:principal`` hash in Redis shared by all workers. Writes that
+    change a user's access (payment, role, deactivation) must call
+    ``invalidate``; other workers' local copies age out within
+    ``local_ttl_seconds``.
+    """
+
+    def __init__(self, max_entries: int, local_ttl_seconds: float, redis_ttl_seconds: int):
+        self.max_entries = max_entries
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._local: "OrderedDict[int, Tuple[float, Dict[str, str]]]" = OrderedDict()
+
+    def _key(self, user_id: int) -> str:
+        return f"user:{user_id}:principal"
+
+    async def get(self, user_id: int) -> Optional[User]:
+        entry = self._local.get(user_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._local.move_to_end(user_id)
+            principal_cache_hits.labels("local").inc()
+            return principal_user(entry[1])
+
+        mapping = await redis_client.hgetall(self._key(user_id))
+        if not mapping:
+            self._local.pop(user_id, None)
+            principal_cache_misses.inc()
+            return None
+
+        self._remember(user_id, mapping)
+        principal_cache_hits.labels("redis").inc()
+        return principal_user(mapping)
+
+    async def put(self, user: User):
+        mapping = principal_mapping(user)
+        self._remember(user.id, mapping)
+        async with redis_client.pipeline() as pipe:
+            pipe.hset(self._key(user.id), mapping=mapping)
+            pipe.expire(self._key(user.id), self.redis_ttl_seconds)
+
+    async def invalidate(self, user_id: int):
+        self._local.pop(user_id, None)
+        await redis_client.delete(self._key(user_id))
+
+    def _remember(self, user_id: int, mapping: Dict[str, str]):
+        self._local[user_id] = (time.monotonic() + self.local_ttl_seconds, mapping)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    local_ttl_seconds=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl_seconds=settings.PRINCIPAL_CACHE_REDIS_TTL_SECONDS
+)
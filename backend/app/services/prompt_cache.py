@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import Counter
+
+from app.core.config import settings
+
+prompt_cache_hits = Counter(
+    "prompt_cache_hits_total",
+    "Formatted prompt cache hits",
+    ["game_slug"]
+)
+prompt_cache_misses = Counter(
+    "prompt_cache_misses_total",
+    "Formatted prompt cache misses",
+    ["game_slug"]
+)
+prompt_cache_evictions = Counter(
+    "prompt_cache_evictions_total",
+    "Formatted prompt cache evictions",
+    ["game_slug"]
+)
+
+# Rough per-entry overhead of the dict, key and bookkeeping tuple
+ENTRY_OVERHEAD_BYTES = 240
+
+
+def _entry_size(prompt: Dict[str, Any]) -> int:
+    return ENTRY_OVERHEAD_BYTES + sum(
+        len(value) if isinstance(value, str) else 8 for value in prompt.values()
+    )
+
+
+class PromptCache:
+    """Shared LRU/TTL cache of formatted prompt dicts.
+
+    Prompts are immutable once seeded, so entries only leave the cache when
+    they expire or when a game's approximate memory budget is exceeded.
+    """
+
+    def __init__(self, max_bytes_per_game: int, ttl_seconds: int):
+        self.max_bytes_per_game = max_bytes_per_game
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, "OrderedDict[int, Tuple[float, int, Dict[str, Any]]]"] = {}
+        self._sizes: Dict[str, int] = {}
+
+    def get(self, game_slug: str, prompt_id: int) -> Optional[Dict[str, Any]]:
+        entries = self._entries.get(game_slug)
+        entry = entries.get(prompt_id) if entries else None
+
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._discard(game_slug, prompt_id)
+            prompt_cache_misses.labels(game_slug).inc()
+            return None
+
+        entries.move_to_end(prompt_id)
+        prompt_cache_hits.labels(game_slug).inc()
+        return entry[2]
+
+    def missing(self, game_slug: str, prompt_ids: Iterable[int]) -> list:
+        """Return the IDs that are not currently cached"""
+        entries = self._entries.get(game_slug, {})
+        now = time.monotonic()
+        return [
+            prompt_id for prompt_id in prompt_ids
+            if prompt_id not in entries or entries[prompt_id][0] < now
+        ]
+
+    def missing_any(self, prompt_ids: Iterable[int]) -> list:
+        """Return the IDs not cached under any game (prompt IDs are global)"""
+        now = time.monotonic()
+        return [
+            prompt_id for prompt_id in prompt_ids
+            if not any(
+                prompt_id in entries and entries[prompt_id][0] >= now
+                for entries in self._entries.values()
+            )
+        ]
+
+    def put(self, game_slug: str, prompt_id: int, prompt: Dict[str, Any]):
+        entries = self._entries.setdefault(game_slug, OrderedDict())
+        if prompt_id in entries:
+            self._discard(game_slug, prompt_id)
+
+        size = _entry_size(prompt)
+        entries[prompt_id] = (time.monotonic() + self.ttl_seconds, size, prompt)
+        self._sizes[game_slug] = self._sizes.get(game_slug, 0) + size
+
+        while self._sizes[game_slug] > self.max_bytes_per_game and len(entries) > 1:
+            oldest_id = next(iter(entries))
+            self._discard(game_slug, oldest_id)
+            prompt_cache_evictions.labels(game_slug).inc()
+
+    def clear(self, game_slug: Optional[str] = None):
+        if game_slug is None:
+            self._entries.clear()
+            self._sizes.clear()
+        else:
+            self._entries.pop(game_slug, None)
+            self._sizes.pop(game_slug, None)
+
+    def _discard(self, game_slug: str, prompt_id: int):
+        _, size, _ = self._entries[game_slug].pop(prompt_id)
+        self._sizes[game_slug] -= size
+
+
+prompt_cache = PromptCache(
+    max_bytes_per_game=settings.PROMPT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.PROMPT_CACHE_TTL_SECONDS
+)
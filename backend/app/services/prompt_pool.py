@@ -0,0 +1,269 @@
+import random
+from array import array
+from typing import Callable, Container, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis_client import redis_client
+from app.services.prompt_repository import prompt_repository
+
+# Pseudo theme id for the pool of every safe prompt of a game
+ALL_THEMES = 0
+
+# Typecode for the packed prompt id arrays (unsigned 32-bit)
+ID_TYPECODE = "I"
+
+
+# A game slug or a list of them (multi-game rooms)
+GameSlugs = Union[str, Sequence[str]]
+
+
+# Pools hold ids from the unified prompts table. The earlier prompt_pool:*
+# keys held per-game table ids and must not be read back.
+def _pool_key(game_slug: str) -> str:
+    return f"prompt_pools:{game_slug}"
+
+
+def _version_key(game_slug: str) -> str:
+    return f"prompt_pools:{game_slug}:version"
+
+
+# Replace a game's packed pools and bump its version in one step, so readers
+# never see a half-written hash. With an expected version (ARGV[1] not
+# empty) nothing is written if another worker published in the meantime.
+PUBLISH_POOLS_SCRIPT = """
+if ARGV[1] ~= '' and redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return false
+end
+redis.call('DEL', KEYS[1])
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return redis.call('INCR', KEYS[2])
+"""
+
+redis_client.register_script("prompt_pools_publish", PUBLISH_POOLS_SCRIPT)
+
+
+def _as_list(game_slugs: GameSlugs) -> List[str]:
+    return [game_slugs] if isinstance(game_slugs, str) else list(game_slugs)
+
+
+class PromptPoolIndex:
+    """Per-(game_slug, theme_id) index of eligible prompt IDs.
+
+    Each pool is a sorted compact integer array. Pools are built from the
+    database once, shared between workers through a Redis hash of packed
+    arrays, and reloaded whenever the shared version counter changes.
+    Imports patch the shared pools in place (``add_prompts``) instead of
+    forcing a rebuild.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Tuple[str, int], array] = {}
+        self._versions: Dict[str, int] = {}
+
+    async def ensure_loaded(self, db: AsyncSession, game_slugs: GameSlugs):
+        """Make sure the local pools for the given games match the shared copy"""
+        stale = []
+        for game_slug in _as_list(game_slugs):
+            remote_version = await redis_client.get(_version_key(game_slug))
+            if remote_version is not None:
+                if int(remote_version) == self._versions.get(game_slug):
+                    continue
+                if await self._load_from_redis(game_slug, int(remote_version)):
+                    continue
+            stale.append(game_slug)
+
+        if stale:
+            await self.rebuild(db, stale)
+
+    async def rebuild(self, db: AsyncSession, game_slugs: GameSlugs):
+        """Rebuild all pools for the given games from the database"""
+        game_slugs = _as_list(game_slugs)
+        pools: Dict[Tuple[str, int], List[int]] = {
+            (game_slug, ALL_THEMES): [] for game_slug in game_slugs
+        }
+
+        for game_slug, prompt_id in await prompt_repository.safe_ids(db, game_slugs):
+            pools[(game_slug, ALL_THEMES)].append(prompt_id)
+        for game_slug, theme_id, prompt_id in await prompt_repository.safe_theme_links(db, game_slugs):
+            pools.setdefault((game_slug, theme_id), []).append(prompt_id)
+
+        for game_slug in game_slugs:
+            game_pools = {
+                theme_id: array(ID_TYPECODE, sorted(set(ids)))
+                for (slug, theme_id), ids in pools.items() if slug == game_slug
+            }
+            self._replace_pools(game_slug, game_pools)
+            await self._publish(game_slug, game_pools)
+
+    async def add_prompts(self, game_slug: str, prompts: Dict[int, Iterable[int]]):
+        """Add newly created (or newly safe) prompts, by id with their theme ids"""
+        additions: Dict[int, set] = {ALL_THEMES: set(prompts)}
+        for prompt_id, theme_ids in prompts.items():
+            for theme_id in theme_ids:
+                additions.setdefault(theme_id, set()).add(prompt_id)
+
+        def apply(pools: Dict[int, array]):
+            for theme_id, ids in additions.items():
+                pools[theme_id] = array(ID_TYPECODE, sorted(ids.union(pools.get(theme_id, ()))))
+
+        await self._update_shared(game_slug, apply)
+
+    async def remove_prompts(self, game_slug: str, prompt_ids: Iterable[int]):
+        """Remove deleted (or no longer safe) prompts from every pool"""
+        removed = set(prompt_ids)
+
+        def apply(pools: Dict[int, array]):
+            for theme_id, pool in pools.items():
+                pools[theme_id] = array(ID_TYPECODE, (id for id in pool if id not in removed))
+
+        await self._update_shared(game_slug, apply)
+
+    async def invalidate(self, game_slug: str):
+        """Drop the shared pools so the next session start rebuilds them"""
+        await redis_client.delete(_pool_key(game_slug))
+        await redis_client.delete(_version_key(game_slug))
+        self._versions.pop(game_slug, None)
+
+    def sample(
+        self,
+        game_slugs: GameSlugs,
+        theme_ids: List[int],
+        k: int,
+        exclude: Optional[Container[int]] = None
+    ) -> List[int]:
+        """Sample up to k distinct prompt IDs across the union of themes.
+
+        Draws uniformly over the concatenated pools and rejects repeats and
+        excluded ids, so the cost is O(k / unseen fraction) regardless of
+        pool size. Prompts tagged with several of the selected themes are
+        proportionally more likely to be drawn. Prompt IDs are unique across
+        games, so several games can be sampled together. When fewer than k
+        prompts are left after ``exclude``, the rest are drawn from the
+        excluded ones so a group that has seen everything cycles back.
+        """
+        keys = theme_ids or [ALL_THEMES]
+        pools = [
+            pool for pool in (
+                self._pools.get((game_slug, t))
+                for game_slug in _as_list(game_slugs) for t in set(keys)
+            )
+            if pool
+        ]
+        total = sum(len(pool) for pool in pools)
+        if total == 0:
+            return []
+        exclude = exclude or ()
+
+        if total <= k * 2:
+            # Small union: sampling exhaustively is cheaper than rejecting
+            return self._sample_union(pools, k, exclude)
+
+        # Expected draws grow with the excluded share of the pools
+        unseen = total - min(len(exclude), total)
+        max_attempts = min(k * 10 * total // max(unseen, 1), total * 2)
+
+        chosen = {}
+        attempts = 0
+        while len(chosen) < k and attempts < max_attempts:
+            attempts += 1
+            offset = random.randrange(total)
+            for pool in pools:
+                if offset < len(pool):
+                    if pool[offset] not in exclude:
+                        chosen[pool[offset]] = None
+                    break
+                offset -= len(pool)
+
+        if len(chosen) < k:
+            # Heavily overlapping themes or nearly all seen; use the exact union
+            return self._sample_union(pools, k, exclude)
+
+        return list(chosen)
+
+    def _sample_union(self, pools: List[array], k: int, exclude: Container[int]) -> List[int]:
+        union = set().union(*pools)
+        fresh = [prompt_id for prompt_id in union if prompt_id not in exclude]
+        if len(fresh) >= k:
+            return random.sample(fresh, k)
+
+        seen = list(union.difference(fresh))
+        return random.sample(fresh, len(fresh)) + random.sample(seen, min(k - len(fresh), len(seen)))
+
+    def pool_size(self, game_slug: str, theme_id: int = ALL_THEMES) -> int:
+        return len(self._pools.get((game_slug, theme_id), ()))
+
+    async def _update_shared(self, game_slug: str, apply: Callable[[Dict[int, array]], None]):
+        """Apply a change on top of the latest shared pools of a game.
+
+        Starts again from the shared copy if another worker publishes first.
+        """
+        while True:
+            version = await redis_client.get(_version_key(game_slug))
+            if version is None:
+                # Not built yet: the next session start builds from the database
+                self._versions.pop(game_slug, None)
+                return
+            if int(version) != self._versions.get(game_slug):
+                if not await self._load_from_redis(game_slug, int(version)):
+                    await self.invalidate(game_slug)
+                    return
+
+            pools = {
+                theme_id: array(ID_TYPECODE, pool)
+                for (slug, theme_id), pool in self._pools.items()
+                if slug == game_slug
+            }
+            apply(pools)
+            if await self._publish(game_slug, pools, expected_version=int(version)):
+                self._replace_pools(game_slug, pools)
+                return
+
+    def _replace_pools(self, game_slug: str, pools: Dict[int, array]):
+        for key in [key for key in self._pools if key[0] == game_slug]:
+            del self._pools[key]
+        for theme_id, pool in pools.items():
+            self._pools[(game_slug, theme_id)] = pool
+
+    async def _load_from_redis(self, game_slug: str, version: int) -> bool:
+        packed = await redis_client.hgetall_bytes(_pool_key(game_slug))
+        if not packed:
+            return False
+
+        pools = {}
+        for theme_id, data in packed.items():
+            pool = array(ID_TYPECODE)
+            pool.frombytes(data)
+            pools[int(theme_id)] = pool
+
+        self._replace_pools(game_slug, pools)
+        self._versions[game_slug] = version
+        return True
+
+    async def _publish(
+        self,
+        game_slug: str,
+        pools: Dict[int, array],
+        expected_version: Optional[int] = None
+    ) -> bool:
+        """Write a game's pools to Redis and bump its version.
+
+        False if ``expected_version`` is given and no longer current.
+        """
+        args = ["" if expected_version is None else str(expected_version)]
+        for theme_id, pool in pools.items():
+            args += [str(theme_id), pool.tobytes()]
+        version = await redis_client.run_script(
+            "prompt_pools_publish",
+            keys=[_pool_key(game_slug), _version_key(game_slug)],
+            args=args
+        )
+        if version is None:
+            return False
+        self._versions[game_slug] = version
+        return True
+
+
+prompt_pool_index = PromptPoolIndex()
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.db.base import AsyncSessionLocal
+from app.services.game_logic import game_logic_service, LOW_QUEUES_KEY
+
+
+class PromptQueueRefiller:
+    """Background top-up of room prompt queues.
+
+    ``get_next_prompt`` flags a room in a shared Redis set when its queue
+    drops below the low-water mark. Every ``interval`` seconds the set is
+    drained in batches of ``batch_size`` rooms and each batch is refilled
+    with one database session, one prompt preload query and one Redis
+    pipeline. SPOP hands each flagged room to a single worker.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refill(self) -> int:
+        """Drain the flagged rooms; returns the number of prompts added"""
+        added = 0
+        while True:
+            room_ids = await redis_client.redis.spop(LOW_QUEUES_KEY, self.batch_size)
+            if not room_ids:
+                return added
+            try:
+                async with AsyncSessionLocal() as db:
+                    added += await game_logic_service.refill_rooms(db, [int(id) for id in room_ids])
+            except Exception as e:
+                # Flag them again; an empty queue still refills inline meanwhile
+                await redis_client.sadd(LOW_QUEUES_KEY, *room_ids)
+                print(f"Prompt queue refill failed: {e}")
+                return added
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis hiccup: keep the loop alive and retry next interval
+                print(f"Prompt queue refiller error: {e}")
+
+
+prompt_refiller = PromptQueueRefiller(
+    interval=settings.PROMPT_REFILL_INTERVAL_MS / 1000,
+    batch_size=settings.PROMPT_REFILL_BATCH_SIZE
+)
@@ -0,0 +1,88 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.prompts import Prompt, prompt_themes
+
+# Games with prompts in the unified table
+GAME_SLUGS = ("would_you_rather", "truth_or_dare", "sixty_seconds", "hot_seat", "draw_guess")
+
+# Payload fields each game's prompts must have
+PAYLOAD_FIELDS = {
+    "would_you_rather": ("option_a", "option_b"),
+    "truth_or_dare": ("type", "text"),
+    "sixty_seconds": ("category",),
+    "hot_seat": ("question",),
+    "draw_guess": ("word", "difficulty"),
+}
+
+
+def format_prompt(prompt_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a prompt for API response"""
+    return {"id": prompt_id, **payload}
+
+
+class PromptRepository:
+    """Data access for the unified prompts table.
+
+    Every game goes through the same queries. Only the columns needed are
+    selected (no ORM objects), and queries take a list of game slugs so a
+    multi-game room is served by one query rather than one per game.
+    """
+
+    async def safe_ids(
+        self,
+        db: AsyncSession,
+        game_slugs: Sequence[str]
+    ) -> List[Tuple[str, int]]:
+        """(game_slug, prompt_id) for every safe prompt of the given games"""
+        result = await db.execute(
+            select(Prompt.game_slug, Prompt.id)
+            .where(Prompt.game_slug.in_(game_slugs))
+            .where(Prompt.is_safe == True)
+        )
+        return result.all()
+
+    async def safe_theme_links(
+        self,
+        db: AsyncSession,
+        game_slugs: Sequence[str]
+    ) -> List[Tuple[str, int, int]]:
+        """(game_slug, theme_id, prompt_id) for every safe prompt's themes"""
+        result = await db.execute(
+            select(Prompt.game_slug, prompt_themes.c.theme_id, prompt_themes.c.prompt_id)
+            .join(Prompt, Prompt.id == prompt_themes.c.prompt_id)
+            .where(Prompt.game_slug.in_(game_slugs))
+            .where(Prompt.is_safe == True)
+        )
+        return result.all()
+
+    async def fetch(
+        self,
+        db: AsyncSession,
+        prompt_ids: Iterable[int]
+    ) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        """Formatted prompts by id, with their game, in a single IN (...) query"""
+        prompt_ids = list(prompt_ids)
+        if not prompt_ids:
+            return {}
+
+        result = await db.execute(
+            select(Prompt.id, Prompt.game_slug, Prompt.payload)
+            .where(Prompt.id.in_(prompt_ids))
+        )
+        return {
+            prompt_id: (game_slug, format_prompt(prompt_id, payload))
+            for prompt_id, game_slug, payload in result
+        }
+
+    async def get(
+        self,
+        db: AsyncSession,
+        prompt_id: int
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        return (await self.fetch(db, [prompt_id])).get(prompt_id)
+
+
+prompt_repository = PromptRepository()
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import Dict, Optional
+
+from prometheus_client import Gauge
+
+from app.core import redis_keys
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+room_key_bytes = Gauge(
+    "redis_room_key_bytes",
+    "MEMORY USAGE of room keys at the last full scan, by key type",
+    ["key_type"]
+)
+room_key_count = Gauge(
+    "redis_room_keys",
+    "Room keys at the last full scan, by key type",
+    ["key_type"]
+)
+room_bytes = Gauge(
+    "redis_room_bytes",
+    "Per-room memory at the last full scan",
+    ["stat"]
+)
+rooms_in_redis = Gauge(
+    "redis_rooms",
+    "Rooms with at least one key at the last full scan"
+)
+
+# Totals of the last completed scan, shared by all workers
+STATS_KEY = "redis_memory:rooms"
+LEASE_KEY = "redis_memory:sampler"
+
+
+class RedisMemorySampler:
+    """Per-room and per-key-type Redis memory, reported to /metrics.
+
+    One worker at a time (holding a short lease) walks the ``room:*`` keys
+    with SCAN, ``sample_keys`` keys per step and one step per ``interval``,
+    and measures each with MEMORY USAGE in a single pipeline. When a scan
+    completes its totals are stored in Redis; every worker publishes the
+    stored totals as gauges, so any of them can be scraped.
+    """
+
+    def __init__(self, interval: float, sample_keys: int):
+        self.interval = interval
+        self.sample_keys = sample_keys
+        self.node_id = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._published_types = set()
+        self._reset_scan()
+
+    def _reset_scan(self):
+        self._cursor = 0
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._keys: Dict[str, int] = defaultdict(int)
+        self._rooms: Dict[str, int] = defaultdict(int)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def step(self) -> bool:
+        """Measure the next batch of keys; True when a scan completed"""
+        self._cursor, keys = await redis_client.redis.scan(
+            self._cursor, match=f"{redis_keys.ROOM_PREFIX}*", count=self.sample_keys
+        )
+        rooms = [(key, redis_keys.parse_room_key(key)) for key in keys]
+        rooms = [(key, parsed) for key, parsed in rooms if parsed]
+        if rooms:
+            async with redis_client.pipeline() as pipe:
+                for key, _ in rooms:
+                    pipe.memory_usage(key)
+            for (key, (room_id, key_type)), size in zip(rooms, pipe.results):
+                # None: expired between SCAN and MEMORY USAGE
+                if size is None:
+                    continue
+                self._bytes[key_type] += size
+                self._keys[key_type] += 1
+                self._rooms[room_id] += size
+
+        if self._cursor != 0:
+            return False
+
+        per_room = sorted(self._rooms.values())
+        stats = {
+            "bytes": self._bytes,
+            "keys": self._keys,
+            "rooms": len(per_room),
+            "room_mean": sum(per_room) / len(per_room) if per_room else 0,
+            "room_p99": per_room[min(int(len(per_room) * 0.99), len(per_room) - 1)] if per_room else 0,
+            "room_max": per_room[-1] if per_room else 0
+        }
+        await redis_client.set(STATS_KEY, json.dumps(stats))
+        self._reset_scan()
+        return True
+
+    async def publish(self):
+        """Set the gauges from the last completed scan"""
+        data = await redis_client.get(STATS_KEY)
+        if not data:
+            return
+        stats = json.loads(data)
+
+        # Key types that disappeared since the last scan drop to zero
+        key_types = self._published_types | set(stats["bytes"])
+        for key_type in key_types:
+            room_key_bytes.labels(key_type).set(stats["bytes"].get(key_type, 0))
+            room_key_count.labels(key_type).set(stats["keys"].get(key_type, 0))
+        self._published_types = key_types
+        rooms_in_redis.set(stats["rooms"])
+        for stat in ("mean", "p99", "max"):
+            room_bytes.labels(stat).set(stats[f"room_{stat}"])
+
+    async def _sample(self):
+        lease_ms = int(self.interval * 3000)
+        owner = await redis_client.redis.set(LEASE_KEY, self.node_id, px=lease_ms, nx=True)
+        if not owner:
+            if await redis_client.get(LEASE_KEY) != self.node_id:
+                # Another worker is scanning; start over if we take over later
+                self._reset_scan()
+                return
+            await redis_client.redis.pexpire(LEASE_KEY, lease_ms)
+        await self.step()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._sample()
+                await self.publish()
+            except Exception as e:
+                print(f"Redis memory sampling failed: {e}")
+
+
+redis_memory_sampler = RedisMemorySampler(
+    interval=settings.REDIS_MEMORY_SAMPLE_INTERVAL_SECONDS,
+    sample_keys=settings.REDIS_MEMORY_SAMPLE_KEYS
+)
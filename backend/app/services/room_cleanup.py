@@ -0,0 +1,47 @@
+from typing import Iterable
+
+from app.core import redis_keys
+from app.core.redis_client import redis_client
+from app.services.game_logic import LOW_QUEUES_KEY
+from app.services.room_state import DIRTY_KEY, room_checkpointer, room_state_store
+from app.services.seen_prompts import seen_prompts
+from app.websocket.journal import action_journal
+from app.websocket.socketio_app import (
+    outbound_scheduler,
+    stroke_batcher,
+    timer_scheduler,
+    vote_broadcaster
+)
+
+
+async def end_room(room_id, prompt_ids: Iterable = ()):
+    """Tear down a room whose game has ended.
+
+    Drops what this worker still buffers for the room (throttled votes,
+    queued updates, strokes, journal entries), cancels its timer, writes
+    the final state to Postgres and then purges its Redis keys.
+    """
+    vote_broadcaster.forget(room_id)
+    outbound_scheduler.forget(room_id)
+    stroke_batcher.discard(room_id)
+    action_journal.discard(room_id)
+    await timer_scheduler.cancel(room_id)
+
+    # Persist the final state, then free everything the room held in Redis
+    await room_state_store.update(room_id, {"status": "ended"})
+    await room_checkpointer.checkpoint_rooms([room_id])
+    await purge_room(room_id, prompt_ids)
+
+
+async def purge_room(room_id, prompt_ids: Iterable = ()):
+    """Remove every Redis key of a finished room.
+
+    ``prompt_ids`` are the prompts the room was shown, whose vote and
+    answer keys are removed too. Anything missed expires with its TTL.
+    The host's seen prompts are kept for their next games.
+    """
+    async with redis_client.pipeline() as pipe:
+        pipe.delete(*redis_keys.all_room_keys(room_id, prompt_ids))
+        pipe.srem(DIRTY_KEY, str(room_id))
+        pipe.srem(LOW_QUEUES_KEY, str(room_id))
+    await seen_prompts.forget(room_id=room_id)
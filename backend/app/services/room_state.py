@@ -0,0 +1,405 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import bindparam, or_, select, update
+
+from app.core import redis_keys
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.db.base import AsyncSessionLocal
+from app.models import GameSession
+
+room_checkpoints = Counter(
+    "room_state_checkpoints_total",
+    "Room states written to Postgres by the checkpointer"
+)
+room_checkpoint_failures = Counter(
+    "room_state_checkpoint_failures_total",
+    "Checkpoint batches that failed and were requeued"
+)
+room_checkpoint_seconds = Histogram(
+    "room_state_checkpoint_seconds",
+    "Time to write one checkpoint batch"
+)
+
+# Layout of the serialised checkpoint; bump when it changes
+STATE_FORMAT = 1
+
+# Rooms changed since their last checkpoint
+DIRTY_KEY = "rooms:dirty"
+
+# Game state fields of the room hash
+STATE_FIELDS = (
+    "status", "game_slug", "current_round", "current_prompt_id",
+    "current_player", "current_type", "hot_seat_player",
+    "drawer_id", "current_word", "current_word_normalized", "round_winner",
+    "timer_start", "timer_duration", "timer_prompt_id", "host_id", "theme_ids"
+)
+
+# Only the drawer may see these in a snapshot
+SECRET_FIELDS = ("current_word", "current_word_normalized")
+
+# Set fields on the room hash, optionally advance the round, bump the state
+# version, refresh the TTL and mark the room dirty. Returns the new version,
+# or -1 without writing if the hash is missing and ARGV[4] is not '1'
+# (Redis lost the room: a partial hash would hide the last checkpoint).
+UPDATE_STATE_SCRIPT = """
+if ARGV[4] ~= '1' and redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+for i = 5, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+if tonumber(ARGV[2]) ~= 0 then
+    redis.call('HINCRBY', KEYS[1], 'current_round', ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[1])
+return redis.call('HINCRBY', KEYS[1], 'state_version', 1)
+"""
+
+# Everything a reconnecting client needs in one call: the room hash, the
+# queued prompt ids and the vote counts for the current prompt
+SNAPSHOT_SCRIPT = """
+local state = redis.call('HGETALL', KEYS[1])
+local queue = redis.call('LRANGE', KEYS[2], 0, -1)
+local votes = {}
+local prompt_id = redis.call('HGET', KEYS[1], 'current_prompt_id')
+if prompt_id and prompt_id ~= '' then
+    votes = redis.call('HGETALL', ARGV[1] .. prompt_id)
+end
+return {state, queue, votes}
+"""
+
+# Put a checkpoint back unless the room hash exists again (another worker
+# restored it first). ARGV: ttl, number of hash fields, the field/value
+# pairs, then the prompt queue. Returns 1 if restored.
+RESTORE_STATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local fields_end = 2 + ARGV[2] * 2
+redis.call('DEL', KEYS[2])
+for i = 3, fields_end, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if #ARGV > fields_end then
+    redis.call('RPUSH', KEYS[2], unpack(ARGV, fields_end + 1))
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+return 1
+"""
+
+redis_client.register_script("room_state_update", UPDATE_STATE_SCRIPT)
+redis_client.register_script("room_state_restore", RESTORE_STATE_SCRIPT)
+redis_client.register_script("room_state_snapshot", SNAPSHOT_SCRIPT)
+
+
+def _pairs(flat: list) -> Dict[str, str]:
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+class RoomState:
+    """The game state of one room, as stored across its Redis keys"""
+
+    __slots__ = ("room_id", "version", "fields", "prompt_queue", "vote_counts")
+
+    def __init__(
+        self,
+        room_id: int,
+        version: int,
+        fields: Dict[str, str],
+        prompt_queue: List[str],
+        vote_counts: Optional[Dict[str, int]] = None
+    ):
+        self.room_id = room_id
+        self.version = version
+        self.fields = fields
+        self.prompt_queue = prompt_queue
+        self.vote_counts = vote_counts or {}
+
+    @property
+    def current_round(self) -> int:
+        return int(self.fields.get("current_round") or 0)
+
+    @property
+    def ended(self) -> bool:
+        return self.fields.get("status") == "ended"
+
+    def to_snapshot(self, viewer_id=None) -> Dict[str, Any]:
+        """Client view of the state; the word is only shown to the drawer"""
+        is_drawer = viewer_id is not None and str(viewer_id) == self.fields.get("drawer_id")
+        return {
+            "room_id": self.room_id,
+            "version": self.version,
+            "state": {
+                field: value for field, value in self.fields.items()
+                if is_drawer or field not in SECRET_FIELDS
+            },
+            "prompts_remaining": len(self.prompt_queue),
+            "vote_counts": self.vote_counts
+        }
+
+    def encode(self) -> str:
+        """Compact checkpoint form"""
+        return json.dumps(
+            {"f": STATE_FORMAT, "v": self.version, "s": self.fields, "q": self.prompt_queue},
+            separators=(",", ":")
+        )
+
+    @classmethod
+    def decode(cls, room_id: int, data: str) -> Optional["RoomState"]:
+        checkpoint = json.loads(data)
+        if checkpoint.get("f") != STATE_FORMAT:
+            return None
+        return cls(room_id, checkpoint["v"], checkpoint["s"], checkpoint["q"])
+
+
+class RoomStateStore:
+    """Reads and writes of per-room game state.
+
+    The live state stays in the room hash (plus the prompt queue and vote
+    counters). Every write goes through ``update``, which bumps a version
+    and marks the room dirty for the checkpointer. ``snapshot`` reads it
+    all in one round trip, falling back to the last Postgres checkpoint
+    when Redis has lost the room.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    def _state_key(self, room_id) -> str:
+        return redis_keys.room_state(room_id)
+
+    def _queue_key(self, room_id) -> str:
+        return redis_keys.room_prompts(room_id)
+
+    async def update(
+        self,
+        room_id,
+        fields: Dict[str, Any],
+        round_delta: int = 0,
+        create: bool = False,
+        reopen: bool = False
+    ) -> int:
+        """Set state fields and return the new state version.
+
+        Only ``create`` (a new room) may start a state from nothing. If Redis
+        has lost an existing room, its last checkpoint is restored first. A
+        room that has ended stays gone: a late write to it is dropped unless
+        ``reopen`` (a new game) starts it again.
+        """
+        version = await self._write(room_id, fields, round_delta, create)
+        if version < 0:
+            checkpoint = await self._load_checkpoint(room_id)
+            if checkpoint is not None and checkpoint.ended:
+                if not reopen:
+                    return checkpoint.version
+                # Carry the version on, or the new game's checkpoints are refused
+                fields = {**fields, "state_version": checkpoint.version}
+                return await self._write(room_id, fields, round_delta, create=True)
+            restored = await self._restore(room_id, checkpoint) if checkpoint else None
+            # Never checkpointed: nothing better to start from
+            version = await self._write(room_id, fields, round_delta, create=restored is None)
+        return version
+
+    async def _write(self, room_id, fields: Dict[str, Any], round_delta: int, create: bool) -> int:
+        args = [str(room_id), round_delta, redis_keys.ROOM_TTL_SECONDS, "1" if create else "0"]
+        for field, value in fields.items():
+            args += [field, "" if value is None else str(value)]
+        return await redis_client.run_script(
+            "room_state_update",
+            keys=[self._state_key(room_id), DIRTY_KEY],
+            args=args
+        )
+
+    async def load(self, room_id) -> Optional[RoomState]:
+        state, queue, votes = await redis_client.run_script(
+            "room_state_snapshot",
+            keys=[self._state_key(room_id), self._queue_key(room_id)],
+            args=[redis_keys.room_vote_counts(room_id)]
+        )
+        if not state:
+            return None
+
+        fields = _pairs(state)
+        version = int(fields.pop("state_version", 0))
+        return RoomState(
+            int(room_id),
+            version,
+            {field: value for field, value in fields.items() if field in STATE_FIELDS},
+            queue,
+            {option: int(count) for option, count in _pairs(votes).items()}
+        )
+
+    async def get(self, room_id) -> Optional[RoomState]:
+        """Live state, restored from the last checkpoint if Redis lost it"""
+        state = await self.load(room_id)
+        if state is None:
+            state = await self.restore(room_id)
+        return state
+
+    async def snapshot(self, room_id, viewer_id=None) -> Optional[Dict[str, Any]]:
+        state = await self.get(room_id)
+        return state.to_snapshot(viewer_id) if state else None
+
+    async def restore(self, room_id) -> Optional[RoomState]:
+        """Rebuild a room's Redis state from its last checkpoint.
+
+        None if there is no checkpoint or the room has ended: end_game
+        purges a room's keys on purpose, so it must not come back.
+        """
+        state = await self._load_checkpoint(room_id)
+        if state is None or state.ended:
+            return None
+        return await self._restore(room_id, state)
+
+    async def _load_checkpoint(self, room_id) -> Optional[RoomState]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(GameSession.checkpoint).where(GameSession.room_id == int(room_id))
+            )
+            data = result.scalar_one_or_none()
+        return RoomState.decode(int(room_id), data) if data else None
+
+    async def _restore(self, room_id, state: RoomState) -> Optional[RoomState]:
+        fields = {**state.fields, "state_version": str(state.version)}
+        args = [redis_keys.ROOM_TTL_SECONDS, len(fields)]
+        for field, value in fields.items():
+            args += [field, value]
+        restored = await redis_client.run_script(
+            "room_state_restore",
+            keys=[self._state_key(room_id), self._queue_key(room_id)],
+            args=args + state.prompt_queue
+        )
+        if not restored:
+            # Another worker got there first
+            return await self.load(room_id)
+        return state
+
+
+class RoomCheckpointer:
+    """Write dirty room states to Postgres in batches.
+
+    Every ``interval`` seconds the dirty set is drained in batches of
+    ``batch_size`` rooms; each batch is read in one Redis pipeline and
+    written with a single executemany UPDATE. Any worker may run it: SPOP
+    hands each dirty room to exactly one of them. A checkpoint never
+    overwrites a newer one.
+    """
+
+    def __init__(self, store: RoomStateStore, interval: float, batch_size: int):
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and write out the rooms still dirty"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.checkpoint()
+        except Exception as e:
+            print(f"Final room state checkpoint failed: {e}")
+
+    async def checkpoint(self) -> int:
+        """Drain the dirty set; returns the number of rooms written"""
+        written = 0
+        while True:
+            room_ids = await redis_client.redis.spop(DIRTY_KEY, self.batch_size)
+            if not room_ids:
+                return written
+            try:
+                with room_checkpoint_seconds.time():
+                    written += await self._write_batch(room_ids)
+            except Exception as e:
+                room_checkpoint_failures.inc()
+                await redis_client.sadd(DIRTY_KEY, *room_ids)
+                print(f"Room state checkpoint failed: {e}")
+                return written
+
+    async def checkpoint_rooms(self, room_ids: List) -> int:
+        """Write the given rooms now, e.g. before their keys are removed"""
+        room_ids = [str(room_id) for room_id in room_ids]
+        await redis_client.srem(DIRTY_KEY, *room_ids)
+        return await self._write_batch(room_ids)
+
+    async def _write_batch(self, room_ids: List[str]) -> int:
+        async with redis_client.pipeline() as pipe:
+            for room_id in room_ids:
+                pipe.hgetall(self.store._state_key(room_id))
+                pipe.lrange(self.store._queue_key(room_id), 0, -1)
+
+        rows = []
+        for room_id, state, queue in zip(room_ids, pipe.results[::2], pipe.results[1::2]):
+            if not state:
+                continue
+            version = int(state.pop("state_version", 0))
+            room_state = RoomState(
+                int(room_id),
+                version,
+                {field: value for field, value in state.items() if field in STATE_FIELDS},
+                queue
+            )
+            rows.append({
+                "b_room_id": room_state.room_id,
+                "b_checkpoint": room_state.encode(),
+                "b_version": version,
+                "b_round": room_state.current_round
+            })
+        if not rows:
+            return 0
+
+        sessions = GameSession.__table__
+        statement = (
+            update(sessions)
+            .where(sessions.c.room_id == bindparam("b_room_id"))
+            .where(or_(
+                sessions.c.checkpoint_version.is_(None),
+                sessions.c.checkpoint_version < bindparam("b_version")
+            ))
+            .values(
+                checkpoint=bindparam("b_checkpoint"),
+                checkpoint_version=bindparam("b_version"),
+                current_round=bindparam("b_round")
+            )
+        )
+        async with self.store.session_factory() as db:
+            await db.execute(statement, rows)
+            await db.commit()
+
+        room_checkpoints.inc(len(rows))
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis hiccup: keep the loop alive and retry next interval
+                print(f"Room state checkpointer error: {e}")
+
+
+room_state_store = RoomStateStore()
+
+room_checkpointer = RoomCheckpointer(
+    room_state_store,
+    interval=settings.ROOM_CHECKPOINT_INTERVAL_SECONDS,
+    batch_size=settings.ROOM_CHECKPOINT_BATCH_SIZE
+)
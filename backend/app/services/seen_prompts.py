@@ -0,0 +1,121 @@
+import time
+from typing import Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+class SeenPromptSet:
+    """Membership test over prompt id bitmaps (bit n set = prompt n seen)"""
+
+    __slots__ = ("_bitmap", "_extra", "count")
+
+    def __init__(self, bitmap: bytes = b"", extra: Iterable[int] = ()):
+        self._bitmap = bitmap
+        self._extra = set(extra)
+        # Upper bound on the number of distinct ids excluded
+        self.count = int.from_bytes(bitmap, "big").bit_count() + len(self._extra)
+
+    def __contains__(self, prompt_id: int) -> bool:
+        byte = prompt_id >> 3
+        if byte < len(self._bitmap) and self._bitmap[byte] & (0x80 >> (prompt_id & 7)):
+            return True
+        return prompt_id in self._extra
+
+    def __len__(self) -> int:
+        return self.count
+
+    def ids(self) -> List[int]:
+        """All ids in the set, ascending"""
+        found = set(self._extra)
+        for byte, value in enumerate(self._bitmap):
+            if value:
+                found.update((byte << 3) + bit for bit in range(8) if value & (0x80 >> bit))
+        return sorted(found)
+
+
+class SeenPrompts:
+    """Prompts a host (across all their rooms) and a room have been shown.
+
+    Each owner has one Redis bitmap per generation of
+    SEEN_PROMPTS_WINDOW_DAYS / SEEN_PROMPTS_GENERATIONS, with the prompt id
+    as the bit offset, so 100k prompts take 12.5 KB. Reads OR the live
+    generations together; old generations expire, so a prompt becomes
+    eligible again between one generation short of the window and the full
+    window after it was shown.
+    """
+
+    def __init__(self, window_days: float, generations: int):
+        self.generations = generations
+        self.generation_seconds = window_days * 86400 / generations
+
+    def _generation(self) -> int:
+        return int(time.time() // self.generation_seconds)
+
+    def _keys(self, scope: str, owner_id) -> List[str]:
+        current = self._generation()
+        return [
+            f"seen_prompts:{scope}:{owner_id}:{generation}"
+            for generation in range(current - self.generations + 1, current + 1)
+        ]
+
+    def _owners(self, host_id, room_id):
+        if host_id is not None:
+            yield "host", host_id
+        if room_id is not None:
+            yield "room", room_id
+
+    async def mark(self, prompt_ids: Iterable[int], host_id=None, room_id=None):
+        """Record prompts as shown in the current generation"""
+        bits = [arg for prompt_id in prompt_ids for arg in ("SET", "u1", int(prompt_id), 1)]
+        if not bits:
+            return
+
+        ttl = int(self.generation_seconds * self.generations)
+        async with redis_client.pipeline() as pipe:
+            for scope, owner_id in self._owners(host_id, room_id):
+                key = self._keys(scope, owner_id)[-1]
+                pipe.execute_command("BITFIELD", key, *bits)
+                pipe.expire(key, ttl)
+
+    async def load(self, host_id=None, room_id=None, extra: Iterable[int] = ()) -> SeenPromptSet:
+        """Everything the host or room has seen within the window"""
+        keys = [
+            key for scope, owner_id in self._owners(host_id, room_id)
+            for key in self._keys(scope, owner_id)
+        ]
+        if not keys:
+            return SeenPromptSet(extra=extra)
+
+        async with redis_client.pipeline(raw=True) as pipe:
+            for key in keys:
+                pipe.get(key)
+        return SeenPromptSet(_bitmap_or(pipe.results), extra)
+
+    async def room_ids(self, room_id) -> List[int]:
+        return (await self.load(room_id=room_id)).ids()
+
+    async def forget(self, host_id=None, room_id=None):
+        async with redis_client.pipeline() as pipe:
+            for scope, owner_id in self._owners(host_id, room_id):
+                pipe.delete(*self._keys(scope, owner_id))
+
+
+def _bitmap_or(bitmaps: List[Optional[bytes]]) -> bytes:
+    bitmaps = [bitmap for bitmap in bitmaps if bitmap]
+    if not bitmaps:
+        return b""
+    if len(bitmaps) == 1:
+        return bitmaps[0]
+
+    width = max(len(bitmap) for bitmap in bitmaps)
+    combined = 0
+    for bitmap in bitmaps:
+        combined |= int.from_bytes(bitmap.ljust(width, b"\0"), "big")
+    return combined.to_bytes(width, "big")
+
+
+seen_prompts = SeenPrompts(
+    window_days=settings.SEEN_PROMPTS_WINDOW_DAYS,
+    generations=settings.SEEN_PROMPTS_GENERATIONS
+)
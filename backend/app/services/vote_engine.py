@@ -0,0 +1,72 @@
+from typing import Dict, Tuple
+
+from app.core import redis_keys
+from app.core.redis_client import redis_client
+
+VOTE_OPTIONS = ("a", "b")
+
+# Record a vote and keep per-option counters in step with the voter hash.
+# A changed vote moves one count from the old option to the new one, and a
+# repeated vote is a no-op. Returns the counter hash as a flat list.
+CAST_VOTE_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous ~= ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    if previous then
+        redis.call('HINCRBY', KEYS[2], previous, -1)
+    end
+    redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return redis.call('HGETALL', KEYS[2])
+"""
+
+redis_client.register_script("cast_vote", CAST_VOTE_SCRIPT)
+
+
+class VoteEngine:
+    """Atomic vote tallying for Would You Rather.
+
+    Each prompt has a voter hash (user -> choice) and a counter hash
+    (choice -> count). Both are updated by one Lua script, so casting a vote
+    and reading the tallies is O(1) however many people have voted.
+    """
+
+    def _voters_key(self, room_id: int, prompt_id) -> str:
+        return redis_keys.room_votes(room_id, prompt_id)
+
+    def _counts_key(self, room_id: int, prompt_id) -> str:
+        return redis_keys.room_vote_counts(room_id, prompt_id)
+
+    async def cast_vote(
+        self,
+        room_id: int,
+        prompt_id,
+        user_id,
+        choice: str
+    ) -> Tuple[Dict[str, int], int]:
+        """Record a vote and return (vote_counts, total_votes)"""
+        flat = await redis_client.run_script(
+            "cast_vote",
+            keys=[
+                self._voters_key(room_id, prompt_id),
+                self._counts_key(room_id, prompt_id)
+            ],
+            args=[str(user_id), choice, redis_keys.VOTE_TTL_SECONDS]
+        )
+        return self._tally(flat)
+
+    async def get_counts(self, room_id: int, prompt_id) -> Tuple[Dict[str, int], int]:
+        counts = await redis_client.hgetall(self._counts_key(room_id, prompt_id))
+        return self._tally([item for pair in counts.items() for item in pair])
+
+    def _tally(self, flat: list) -> Tuple[Dict[str, int], int]:
+        vote_counts = {option: 0 for option in VOTE_OPTIONS}
+        for option, count in zip(flat[::2], flat[1::2]):
+            if option in vote_counts:
+                vote_counts[option] = int(count)
+        return vote_counts, sum(vote_counts.values())
+
+
+vote_engine = VoteEngine()
@@ -0,0 +1,189 @@
+import asyncio
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+from app.core import redis_keys
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.websocket.strokes import (
+    decode_stroke,
+    encode_frame,
+    encode_quantised,
+    iter_frame
+)
+
+# Simplification tolerances (in quantised canvas units) tried in turn until
+# the snapshot fits its byte budget
+SIMPLIFY_TOLERANCES = (1, 3, 8, 20)
+
+# Store a compacted snapshot and drop the frames it covers. Frames appended
+# during compaction sit after the ones that were read and are kept. If the
+# log no longer starts with the first frame read, the canvas was cleared
+# meanwhile and the snapshot is discarded.
+COMMIT_SNAPSHOT_SCRIPT = """
+if redis.call('LINDEX', KEYS[1], 0) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+redis.call('LTRIM', KEYS[1], ARGV[2], -1)
+return 1
+"""
+
+# Release the compaction lock only if this worker still holds it; after
+# it expires another worker may own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+redis_client.register_script("canvas_commit_snapshot", COMMIT_SNAPSHOT_SCRIPT)
+redis_client.register_script("canvas_release_lock", RELEASE_LOCK_SCRIPT)
+
+
+def simplify_points(points: Sequence[Tuple[int, int]], tolerance: float) -> List[Tuple[int, int]]:
+    """Ramer-Douglas-Peucker line simplification"""
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    tolerance_sq = tolerance * tolerance
+
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+
+        farthest, farthest_dist = 0, -1.0
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length_sq == 0:
+                dist = (px - x1) ** 2 + (py - y1) ** 2
+            else:
+                cross = dx * (py - y1) - dy * (px - x1)
+                dist = cross * cross / length_sq
+            if dist > farthest_dist:
+                farthest, farthest_dist = i, dist
+
+        if farthest_dist > tolerance_sq:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+class CanvasStore:
+    """Append-only stroke log plus compacted snapshot per Draw & Guess room.
+
+    Frames are appended to ``room:{id}:strokes``. Once the log grows past a
+    threshold it is folded into ``room:{id}:canvas``, a single frame of
+    simplified strokes capped at a byte budget, so a late joiner receives
+    one snapshot and a short tail instead of every stroke ever drawn.
+    """
+
+    def __init__(self, compact_after_frames: int, snapshot_max_bytes: int, ttl_seconds: int):
+        self.compact_after_frames = compact_after_frames
+        self.snapshot_max_bytes = snapshot_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._compacting = set()
+
+    def _log_key(self, room_id) -> str:
+        return redis_keys.room_strokes(room_id)
+
+    def _snapshot_key(self, room_id) -> str:
+        return redis_keys.room_canvas(room_id)
+
+    def _lock_key(self, room_id) -> str:
+        return redis_keys.room_canvas_lock(room_id)
+
+    async def append(self, room_id, frame: bytes):
+        async with redis_client.pipeline(raw=True) as pipe:
+            pipe.rpush(self._log_key(room_id), frame)
+            pipe.expire(self._log_key(room_id), self.ttl_seconds)
+            pipe.expire(self._snapshot_key(room_id), self.ttl_seconds)
+
+        log_length = pipe.results[0]
+        if log_length > self.compact_after_frames and room_id not in self._compacting:
+            self._compacting.add(room_id)
+            asyncio.create_task(self._compact_in_background(room_id))
+
+    async def replay(self, room_id) -> Tuple[Optional[bytes], List[bytes]]:
+        """Return (snapshot frame or None, frames appended since) in one round trip"""
+        async with redis_client.pipeline(raw=True) as pipe:
+            pipe.get(self._snapshot_key(room_id))
+            pipe.lrange(self._log_key(room_id), 0, -1)
+        snapshot, tail = pipe.results
+        return snapshot, tail
+
+    async def clear(self, room_id):
+        async with redis_client.pipeline() as pipe:
+            pipe.delete(self._log_key(room_id), self._snapshot_key(room_id))
+
+    async def compact(self, room_id):
+        """Fold the current log into the snapshot"""
+        # Only one worker compacts a room at a time
+        token = uuid.uuid4().hex
+        if not await redis_client.set(self._lock_key(room_id), token, ex=30, nx=True):
+            return
+
+        try:
+            snapshot, frames = await self.replay(room_id)
+            if not frames:
+                return
+
+            strokes = []
+            for frame in ([snapshot] if snapshot else []) + frames:
+                for user_id, data in iter_frame(frame):
+                    strokes.append((user_id, decode_stroke(data)))
+
+            merged = self._build_snapshot(strokes)
+
+            await redis_client.run_script(
+                "canvas_commit_snapshot",
+                keys=[self._log_key(room_id), self._snapshot_key(room_id)],
+                args=[frames[0], len(frames), merged, self.ttl_seconds]
+            )
+        finally:
+            await redis_client.run_script(
+                "canvas_release_lock", keys=[self._lock_key(room_id)], args=[token]
+            )
+
+    def _build_snapshot(self, strokes) -> bytes:
+        for tolerance in SIMPLIFY_TOLERANCES:
+            entries = [
+                (user_id, encode_quantised(
+                    simplify_points(stroke.points, tolerance),
+                    stroke.width, stroke.color, stroke.flags
+                ))
+                for user_id, stroke in strokes
+            ]
+            size = sum(len(data) + 6 for _, data in entries)
+            if size <= self.snapshot_max_bytes:
+                return encode_frame(entries)
+
+        # Still too large: keep the most recent strokes that fit
+        kept, size = [], 0
+        for user_id, data in reversed(entries):
+            size += len(data) + 6
+            if size > self.snapshot_max_bytes:
+                break
+            kept.append((user_id, data))
+        return encode_frame(kept[::-1])
+
+    async def _compact_in_background(self, room_id):
+        try:
+            await self.compact(room_id)
+        finally:
+            self._compacting.discard(room_id)
+
+
+canvas_store = CanvasStore(
+    compact_after_frames=settings.CANVAS_COMPACT_AFTER_FRAMES,
+    snapshot_max_bytes=settings.CANVAS_SNAPSHOT_MAX_BYTES,
+    ttl_seconds=redis_keys.CANVAS_TTL_SECONDS
+)
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class BroadcastCoalescer:
+    """Limit a per-room broadcast to at most ``max_rate_hz`` emits per second.
+
+    Payloads published while a room is throttled replace each other, and the
+    latest one is delivered when the room's interval elapses. This suits
+    state-like updates (e.g. running vote counts) where only the newest value
+    matters.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Hashable, Any], Awaitable[None]],
+        max_rate_hz: float
+    ):
+        self._emit = emit
+        self.interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self._last_sent: Dict[Hashable, float] = {}
+        self._pending: Dict[Hashable, Any] = {}
+        self._flushes: Dict[Hashable, asyncio.Task] = {}
+
+    async def publish(self, room_id: Hashable, payload: Any):
+        if room_id in self._flushes:
+            # A delayed emit is already scheduled; just update what it sends
+            self._pending[room_id] = payload
+            return
+
+        now = asyncio.get_running_loop().time()
+        wait = self._last_sent.get(room_id, float("-inf")) + self.interval - now
+        if wait <= 0:
+            self._last_sent[room_id] = now
+            await self._emit(room_id, payload)
+            return
+
+        self._pending[room_id] = payload
+        self._flushes[room_id] = asyncio.create_task(self._flush_later(room_id, wait))
+
+    def forget(self, room_id: Hashable):
+        """Drop throttling state for a room that has ended"""
+        task = self._flushes.pop(room_id, None)
+        if task:
+            task.cancel()
+        self._pending.pop(room_id, None)
+        self._last_sent.pop(room_id, None)
+
+    async def _flush_later(self, room_id: Hashable, delay: float):
+        await asyncio.sleep(delay)
+        payload = self._pending.pop(room_id)
+        del self._flushes[room_id]
+        self._last_sent[room_id] = asyncio.get_running_loop().time()
+        await self._emit(room_id, payload)
@@ -0,0 +1,106 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from app.core import redis_keys
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+journal_entries = Counter(
+    "action_journal_entries_total",
+    "Game actions written to the room action journal"
+)
+journal_dropped = Counter(
+    "action_journal_dropped_total",
+    "Game actions dropped because a journal flush failed"
+)
+
+
+class ActionJournal:
+    """Write-behind journal of game actions, one Redis Stream per room.
+
+    ``append`` only buffers the already-encoded action in memory; a
+    background task flushes the buffer in one pipeline once it holds
+    ``batch_size`` entries or ``flush_interval`` has passed. Streams live at
+    ``room:{id}:journal``, are capped at roughly ``maxlen`` entries and
+    expire with the room.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, maxlen: int, ttl_seconds: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self._buffer: List[Tuple[str, str]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _stream_key(self, room_id) -> str:
+        return redis_keys.room_journal(room_id)
+
+    def append(self, room_id, entry: str):
+        self._buffer.append((str(room_id), entry))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def discard(self, room_id):
+        """Drop a room's unflushed entries, e.g. once its keys are removed"""
+        room_id = str(room_id)
+        self._buffer = [item for item in self._buffer if item[0] != room_id]
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        self._wakeup.clear()
+        try:
+            async with redis_client.pipeline() as pipe:
+                for room_id, entry in batch:
+                    pipe.xadd(
+                        self._stream_key(room_id),
+                        {"action": entry},
+                        maxlen=self.maxlen,
+                        approximate=True
+                    )
+                for room_id in {room_id for room_id, _ in batch}:
+                    pipe.expire(self._stream_key(room_id), self.ttl_seconds)
+        except Exception as e:
+            # The journal is best effort: never let it hold up gameplay
+            journal_dropped.inc(len(batch))
+            print(f"Action journal flush failed: {e}")
+            return
+
+        journal_entries.inc(len(batch))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+
+action_journal = ActionJournal(
+    batch_size=settings.ACTION_JOURNAL_BATCH_SIZE,
+    flush_interval=settings.ACTION_JOURNAL_FLUSH_MS / 1000,
+    maxlen=settings.ACTION_JOURNAL_MAXLEN,
+    ttl_seconds=redis_keys.JOURNAL_TTL_SECONDS
+)
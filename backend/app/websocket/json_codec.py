@@ -0,0 +1,26 @@
+"""JSON module for the Socket.IO server that can emit pre-encoded payloads.
+
+A payload wrapped in ``RawJSON`` is spliced into the packet verbatim, so a
+document serialised once (e.g. for the action journal) is not encoded again
+for the broadcast.
+"""
+import json
+
+
+class RawJSON(str):
+    """A JSON document that has already been encoded"""
+
+
+def dumps(obj, **kwargs) -> str:
+    if isinstance(obj, RawJSON):
+        return str(obj)
+    if isinstance(obj, list) and any(isinstance(item, RawJSON) for item in obj):
+        # Socket.IO packets encode [event, *args]
+        return "[" + ",".join(
+            str(item) if isinstance(item, RawJSON) else json.dumps(item, **kwargs)
+            for item in obj
+        ) + "]"
+    return json.dumps(obj, **kwargs)
+
+
+loads = json.loads
@@ -0,0 +1,221 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from prometheus_client import Counter
+
+outbound_updates = Counter(
+    "outbound_updates_total",
+    "Game updates sent in outbound frames"
+)
+outbound_frames = Counter(
+    "outbound_frames_total",
+    "Outbound frames emitted to rooms"
+)
+outbound_coalesced = Counter(
+    "outbound_coalesced_total",
+    "Low-priority updates replaced by a newer update of the same kind"
+)
+outbound_dropped = Counter(
+    "outbound_dropped_total",
+    "Updates dropped because the room's outbound queue was full",
+    ["priority"]
+)
+
+
+class TokenBucket:
+    """Allow ``rate`` events per second on average, up to ``burst`` at once"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def take(self, now: float, count: int = 1) -> bool:
+        if self.refill(now) < count:
+            return False
+        self.tokens -= count
+        return True
+
+
+class RateLimiter:
+    """One token bucket per key (e.g. per Socket.IO sid)"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def allow(self, key: Hashable) -> bool:
+        now = asyncio.get_running_loop().time()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+        return bucket.take(now)
+
+    def forget(self, key: Hashable):
+        self._buckets.pop(key, None)
+
+
+class _RoomQueue:
+    __slots__ = ("bucket", "normal", "low", "last_sent", "flush", "evict")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.normal: Deque[str] = deque()
+        # Insertion-ordered; a newer update of the same kind takes the old one's place
+        self.low: Dict[Hashable, str] = {}
+        self.last_sent = float("-inf")
+        self.flush: Optional[asyncio.Task] = None
+        self.evict: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self):
+        return len(self.normal) + len(self.low)
+
+
+class OutboundScheduler:
+    """Per-room outbound queue for pre-encoded game updates.
+
+    An update published to an idle room is emitted straight away; updates
+    arriving within the next tick wait and go out together as one frame.
+    Each room spends tokens from its own bucket (``room_rate`` updates per
+    second, ``room_burst`` at once), so a room producing more than that is
+    flushed at the bucket's pace and its backlog stays queued.
+
+    Low-priority updates carry a coalescing key (e.g. type and sender): a
+    newer one replaces a pending one with the same key instead of queuing
+    behind it. Once a room holds ``max_pending`` updates, new low-priority
+    updates are dropped and a normal update evicts the oldest low-priority
+    one; with none left to evict it is refused.
+
+    A room with nothing queued is dropped once its bucket is full again,
+    since a fresh one would behave the same.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Hashable, List[str]], Awaitable[None]],
+        tick_hz: float,
+        room_rate: float,
+        room_burst: float,
+        max_pending: int,
+        max_batch: int
+    ):
+        self._emit = emit
+        self.interval = 1.0 / tick_hz
+        self.room_rate = room_rate
+        self.room_burst = room_burst
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self._rooms: Dict[Hashable, _RoomQueue] = {}
+
+    async def publish(self, room_id: Hashable, update: str, coalesce_key: Hashable = None) -> bool:
+        """Queue an encoded update; False if it was refused.
+
+        Updates with a ``coalesce_key`` are low priority.
+        """
+        room_id = str(room_id)
+        now = asyncio.get_running_loop().time()
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = _RoomQueue(TokenBucket(self.room_rate, self.room_burst, now))
+
+        if room.flush is None and not room and now - room.last_sent >= self.interval:
+            if room.bucket.take(now):
+                room.last_sent = now
+                outbound_updates.inc()
+                outbound_frames.inc()
+                self._evict_later(room_id, room)
+                await self._emit(room_id, [update])
+                return True
+
+        if coalesce_key is not None:
+            if coalesce_key in room.low:
+                room.low[coalesce_key] = update
+                outbound_coalesced.inc()
+            elif len(room) >= self.max_pending:
+                outbound_dropped.labels("low").inc()
+                return False
+            else:
+                room.low[coalesce_key] = update
+        else:
+            if len(room) >= self.max_pending:
+                if not room.low:
+                    outbound_dropped.labels("normal").inc()
+                    return False
+                del room.low[next(iter(room.low))]
+                outbound_dropped.labels("low").inc()
+            room.normal.append(update)
+
+        if room.flush is None:
+            room.flush = asyncio.create_task(self._flush_later(room_id, room))
+        return True
+
+    def forget(self, room_id: Hashable):
+        """Drop queued updates and rate state for a room that has ended"""
+        room = self._rooms.pop(str(room_id), None)
+        if room and room.flush:
+            room.flush.cancel()
+        if room and room.evict:
+            room.evict.cancel()
+
+    def _evict_later(self, room_id: Hashable, room: _RoomQueue):
+        """Drop the room once it is idle and its bucket has refilled"""
+        if room.evict is None:
+            wait = max((self.room_burst - room.bucket.tokens) / self.room_rate, self.interval)
+            room.evict = asyncio.get_running_loop().call_later(wait, self._evict_idle, room_id, room)
+
+    def _evict_idle(self, room_id: Hashable, room: _RoomQueue):
+        room.evict = None
+        if self._rooms.get(room_id) is not room or room.flush is not None or room:
+            # Forgotten, or busy again; the flush task calls back when done
+            return
+        now = asyncio.get_running_loop().time()
+        if room.bucket.refill(now) < self.room_burst or now - room.last_sent < self.interval:
+            self._evict_later(room_id, room)
+            return
+        del self._rooms[room_id]
+
+    def _take_batch(self, room: _RoomQueue, now: float) -> List[str]:
+        budget = min(self.max_batch, int(room.bucket.refill(now)), len(room))
+        batch = []
+        while room.normal and len(batch) < budget:
+            batch.append(room.normal.popleft())
+        while room.low and len(batch) < budget:
+            key = next(iter(room.low))
+            batch.append(room.low.pop(key))
+        room.bucket.tokens -= len(batch)
+        return batch
+
+    async def _flush_later(self, room_id: Hashable, room: _RoomQueue):
+        loop = asyncio.get_running_loop()
+        delay = room.last_sent + self.interval - loop.time()
+        try:
+            while room:
+                await asyncio.sleep(max(delay, 0))
+                now = loop.time()
+                batch = self._take_batch(room, now)
+                if not batch:
+                    # Out of tokens: wait until the next one is due
+                    delay = (1 - room.bucket.tokens) / self.room_rate
+                    continue
+                room.last_sent = now
+                outbound_updates.inc(len(batch))
+                outbound_frames.inc()
+                try:
+                    await self._emit(room_id, batch)
+                except Exception as e:
+                    print(f"Outbound frame for room {room_id} failed: {e}")
+                delay = room.last_sent + self.interval - loop.time()
+        finally:
+            room.flush = None
+            if self._rooms.get(room_id) is room:
+                self._evict_later(room_id, room)
@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from app.core import redis_keys
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+class SocketSession:
+    """State kept for each connected socket"""
+
+    __slots__ = ("sid", "user_id", "room_id", "is_guest", "connected_at")
+
+    def __init__(
+        self,
+        sid: str,
+        user_id: Optional[str] = None,
+        room_id: Optional[str] = None,
+        is_guest: bool = False,
+        connected_at: Optional[datetime] = None
+    ):
+        self.sid = sid
+        self.user_id = user_id
+        self.room_id = room_id
+        self.is_guest = is_guest
+        self.connected_at = connected_at or datetime.utcnow()
+
+    def to_mapping(self) -> Dict[str, str]:
+        return {
+            "user_id": self.user_id or "",
+            "room_id": str(self.room_id) if self.room_id else "",
+            "is_guest": "1" if self.is_guest else "0",
+            "connected_at": self.connected_at.isoformat()
+        }
+
+    @classmethod
+    def from_mapping(cls, sid: str, mapping: Dict[str, str]) -> "SocketSession":
+        return cls(
+            sid,
+            user_id=mapping.get("user_id") or None,
+            room_id=mapping.get("room_id") or None,
+            is_guest=mapping.get("is_guest") == "1",
+            connected_at=datetime.fromisoformat(mapping["connected_at"])
+        )
+
+
+class SessionStore:
+    """Socket sessions shared between workers.
+
+    Sessions live in a local dict (hot tier) for the sockets this process
+    serves, and in Redis (``ws:session:{sid}`` hashes plus a
+    ``room:{room_id}:sids`` set per room) so any worker can look them up.
+    Lookups for local sockets never leave the process.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._local: Dict[str, SocketSession] = {}
+
+    def _session_key(self, sid: str) -> str:
+        return f"ws:session:{sid}"
+
+    def _room_key(self, room_id) -> str:
+        return redis_keys.room_sids(room_id)
+
+    def _user_key(self, user_id: str) -> str:
+        return f"ws:user:{user_id}"
+
+    async def create(
+        self,
+        sid: str,
+        user_id: Optional[str] = None,
+        is_guest: bool = False
+    ) -> SocketSession:
+        session = SocketSession(sid, user_id=user_id, is_guest=is_guest)
+        self._local[sid] = session
+        async with redis_client.pipeline() as pipe:
+            pipe.hset(self._session_key(sid), mapping=session.to_mapping())
+            pipe.expire(self._session_key(sid), self.ttl_seconds)
+        return session
+
+    def get_local(self, sid: str) -> Optional[SocketSession]:
+        return self._local.get(sid)
+
+    async def get(self, sid: str) -> Optional[SocketSession]:
+        """Look up a session, falling back to Redis for remote sockets"""
+        session = self._local.get(sid)
+        if session is not None:
+            return session
+
+        mapping = await redis_client.hgetall(self._session_key(sid))
+        if not mapping:
+            return None
+        return SocketSession.from_mapping(sid, mapping)
+
+    async def set_room(self, sid: str, room_id) -> Optional[SocketSession]:
+        """Move a session into a room (or out of any room with None)"""
+        session = await self.get(sid)
+        if session is None:
+            return None
+
+        previous_room = session.room_id
+        session.room_id = room_id
+        async with redis_client.pipeline() as pipe:
+            pipe.hset(self._session_key(sid), "room_id", str(room_id) if room_id else "")
+            pipe.expire(self._session_key(sid), self.ttl_seconds)
+            if previous_room:
+                pipe.srem(self._room_key(previous_room), sid)
+            if room_id:
+                pipe.sadd(self._room_key(room_id), sid)
+                pipe.expire(self._room_key(room_id), self.ttl_seconds)
+            if room_id and session.user_id:
+                # Remember the user's room so a reconnecting client can rejoin
+                pipe.set(self._user_key(session.user_id), str(room_id), ex=self.ttl_seconds)
+        return session
+
+    async def remove(self, sid: str):
+        session = self._local.pop(sid, None)
+        if session is not None:
+            room_id = session.room_id
+        else:
+            # Served by another (possibly dead) worker
+            room_id = await redis_client.hget(self._session_key(sid), "room_id")
+        async with redis_client.pipeline() as pipe:
+            pipe.delete(self._session_key(sid))
+            if room_id:
+                pipe.srem(self._room_key(room_id), sid)
+
+    async def room_sids(self, room_id) -> Set[str]:
+        """All socket ids in a room, across every worker.
+
+        Sids whose session expired (e.g. their worker died without
+        removing them) are dropped from the room's set.
+        """
+        sids = await redis_client.smembers(self._room_key(room_id))
+        if not sids:
+            return sids
+
+        sids = list(sids)
+        async with redis_client.pipeline() as pipe:
+            for sid in sids:
+                pipe.exists(self._session_key(sid))
+        stale = [sid for sid, alive in zip(sids, pipe.results) if not alive]
+        if stale:
+            await redis_client.srem(self._room_key(room_id), *stale)
+        return set(sids).difference(stale)
+
+    async def last_room(self, user_id: str) -> Optional[str]:
+        """The room a user was in on their previous connection, if any"""
+        return await redis_client.get(self._user_key(user_id))
+
+    async def forget_last_room(self, user_id: str):
+        await redis_client.delete(self._user_key(user_id))
+
+
+session_store = SessionStore(settings.SOCKET_SESSION_TTL_SECONDS)
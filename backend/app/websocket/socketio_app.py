@@ -1,21 +1,136 @@
 import socketio
 import json
-from typing import Dict, Optional
+import time
+from typing import Optional
 from datetime import datetime
 
+from app.core import redis_keys
+from app.core.config import settings
 from app.core.redis_client import redis_client
 from app.core.security import decode_token
+from app.websocket.coalescer import BroadcastCoalescer
+from app.websocket.sessions import session_store
+from app.websocket.strokes import StrokeBatcher, StrokeFormatError, decode_stroke
+from app.websocket.canvas import canvas_store
+from app.websocket import json_codec
+from app.websocket.journal import action_journal
+from app.websocket.outbound import OutboundScheduler, RateLimiter
+from app.websocket.timers import TimerScheduler
+from app.services.game_logic import game_logic_service
+from app.services.room_state import room_state_store
+
+def _scale_out_options() -> dict:
+    """Server options for running several workers/nodes behind a balancer"""
+    if not settings.SOCKETIO_MULTI_NODE:
+        return {}
+    
+    options = {
+        'client_manager': socketio.AsyncRedisManager(
+            settings.SOCKETIO_MESSAGE_QUEUE or settings.REDIS_URL,
+            channel=settings.SOCKETIO_CHANNEL
+        )
+    }
+    if not settings.SOCKETIO_STICKY_SESSIONS:
+        # Long-polling requests must reach the worker owning the session
+        options['transports'] = ['websocket']
+    return options
+
 
 # Create Socket.IO server
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins="*",  # Configure based on your needs
     logger=True,
-    engineio_logger=True
+    engineio_logger=True,
+    json=json_codec,
+    **_scale_out_options()
+)
+
+async def _emit_vote_update(room_id, payload):
+    await sio.emit(
+        'game_update',
+        {'type': 'vote_update', 'data': payload},
+        room=f"room:{room_id}"
+    )
+
+
+# Running vote counts, throttled per room
+vote_broadcaster = BroadcastCoalescer(
+    _emit_vote_update,
+    settings.VOTE_BROADCAST_MAX_HZ
+)
+
+
+async def _emit_stroke_frame(room_id, frame, skip_sid):
+    await sio.emit('stroke_frame', frame, room=f"room:{room_id}", skip_sid=skip_sid)
+
+
+# Binary Draw & Guess strokes, batched into one frame per room per tick
+stroke_batcher = StrokeBatcher(
+    _emit_stroke_frame,
+    settings.STROKE_TICK_HZ,
+    canvas_store.append
+)
+
+
+async def _emit_game_updates(room_id, updates):
+    room_key = f"room:{room_id}"
+    if len(updates) == 1:
+        await sio.emit('game_update', json_codec.RawJSON(updates[0]), room=room_key)
+    else:
+        await sio.emit('game_updates', json_codec.RawJSON("[" + ",".join(updates) + "]"), room=room_key)
+
+
+# Game actions, batched and rate limited per room
+outbound_scheduler = OutboundScheduler(
+    _emit_game_updates,
+    settings.OUTBOUND_TICK_HZ,
+    settings.OUTBOUND_ROOM_RATE,
+    settings.OUTBOUND_ROOM_BURST,
+    settings.OUTBOUND_MAX_PENDING,
+    settings.OUTBOUND_MAX_BATCH
 )
 
-# Store user sessions
-user_sessions: Dict[str, dict] = {}
+# game_action calls per socket
+socket_rate_limiter = RateLimiter(settings.SOCKET_EVENT_RATE, settings.SOCKET_EVENT_BURST)
+
+LOW_PRIORITY_TYPES = frozenset(
+    name.strip() for name in settings.OUTBOUND_LOW_PRIORITY_TYPES.split(",") if name.strip()
+)
+
+
+async def _on_timer_expired(room_id, deadline):
+    room_key = f"room:{room_id}"
+    room_state = await redis_client.hgetall(redis_keys.room_state(room_id))
+    
+    await sio.emit(
+        'timer_expired',
+        {
+            't0': float(room_state['timer_start']) if 'timer_start' in room_state else None,
+            'duration': room_state.get('timer_duration'),
+            'deadline': deadline
+        },
+        room=room_key
+    )
+    
+    # Server-authoritative round end (e.g. Sixty Seconds scoring)
+    game_slug = room_state.get('game_slug')
+    if game_slug:
+        result = await game_logic_service.end_round(int(room_id), game_slug, room_state)
+        if result is not None:
+            await sio.emit(
+                'game_update',
+                {'type': 'round_end', 'data': result},
+                room=room_key
+            )
+
+
+# Room timers, fired by whichever worker holds the leader lease
+timer_scheduler = TimerScheduler(
+    _on_timer_expired,
+    settings.TIMER_SWEEP_MS / 1000,
+    settings.TIMER_LEADER_LEASE_SECONDS
+)
 
 
 @sio.event
@@ -28,34 +143,40 @@ async def connect(sid, environ, auth):
         payload = decode_token(auth['token'])
         if payload:
             user_id = payload.get('sub')
-            user_sessions[sid] = {
-                'user_id': user_id,
-                'room_id': None,
-                'connected_at': datetime.utcnow()
-            }
-            await sio.emit('connected', {'message': 'Connected successfully'}, to=sid)
+            await session_store.create(sid, user_id=user_id)
+            await sio.emit(
+                'connected',
+                {
+                    'message': 'Connected successfully',
+                    'last_room_id': await session_store.last_room(user_id)
+                },
+                to=sid
+            )
         else:
             await sio.disconnect(sid)
     else:
         # Allow guest connections but mark them
-        user_sessions[sid] = {
-            'user_id': None,
-            'room_id': None,
-            'is_guest': True,
-            'connected_at': datetime.utcnow()
-        }
+        await session_store.create(sid, is_guest=True)
 
 
 @sio.event
 async def disconnect(sid):
     """Handle client disconnection"""
     print(f"Client {sid} disconnected")
+    socket_rate_limiter.forget(sid)
     
-    if sid in user_sessions:
-        session = user_sessions[sid]
-        if session.get('room_id'):
-            await leave_room(sid, {'room_id': session['room_id']})
-        del user_sessions[sid]
+    session = session_store.get_local(sid)
+    if session:
+        if session.room_id:
+            # Keep the user's last room so they can rejoin after reconnecting
+            await _leave_room(sid, session.room_id)
+        await session_store.remove(sid)
+
+
+def _is_db_id(value) -> bool:
+    """Whether a client-sent id can name a row (a Postgres integer id)"""
+    value = str(value)
+    return value.isascii() and value.isdigit() and value[0] != '0' and int(value) < 2**31
 
 
 @sio.event
@@ -64,32 +185,49 @@ async def join_room(sid, data):
     room_id = data.get('room_id')
     if not room_id:
         return {'error': 'Room ID required'}
+    if not _is_db_id(room_id):
+        return {'error': 'Room not found'}
     
     room_key = f"room:{room_id}"
     
-    # Check if room exists
-    exists = await redis_client.exists(room_key)
-    if not exists:
+    # Check if room exists (restoring its state if Redis lost it)
+    room_state = await room_state_store.get(room_id)
+    if room_state is None:
         return {'error': 'Room not found'}
     
     # Join Socket.IO room
     await sio.enter_room(sid, room_key)
     
     # Update session
-    if sid in user_sessions:
-        user_sessions[sid]['room_id'] = room_id
+    session = await session_store.set_room(sid, room_id)
     
     # Notify others
     await sio.emit(
         'user_joined',
         {
-            'user_id': user_sessions[sid].get('user_id'),
+            'user_id': session.user_id if session else None,
             'timestamp': datetime.utcnow().isoformat()
         },
         room=room_key,
         skip_sid=sid
     )
     
+    # Reconnecting clients resume from one snapshot instead of many reads
+    await sio.emit(
+        'room_state',
+        room_state.to_snapshot(session.user_id if session else None),
+        to=sid
+    )
+    
+    # Late joiners get the current drawing: one snapshot plus a short tail
+    snapshot, frames = await canvas_store.replay(room_id)
+    if snapshot or frames:
+        await sio.emit(
+            'canvas_replay',
+            {'snapshot': snapshot, 'frames': frames},
+            to=sid
+        )
+    
     return {'success': True, 'room_id': room_id}
 
 
@@ -100,67 +238,74 @@ async def leave_room(sid, data):
     if not room_id:
         return {'error': 'Room ID required'}
     
+    session = await _leave_room(sid, room_id)
+    if session and session.user_id:
+        await session_store.forget_last_room(session.user_id)
+    
+    return {'success': True}
+
+
+async def _leave_room(sid, room_id):
     room_key = f"room:{room_id}"
     
     # Leave Socket.IO room
     await sio.leave_room(sid, room_key)
     
     # Update session
-    if sid in user_sessions:
-        user_sessions[sid]['room_id'] = None
+    session = await session_store.set_room(sid, None)
     
     # Notify others
     await sio.emit(
         'user_left',
         {
-            'user_id': user_sessions[sid].get('user_id'),
+            'user_id': session.user_id if session else None,
             'timestamp': datetime.utcnow().isoformat()
         },
         room=room_key,
         skip_sid=sid
     )
     
-    return {'success': True}
+    return session
 
 
 @sio.event
 async def game_action(sid, data):
     """Handle game actions"""
-    if sid not in user_sessions:
+    # One client flooding events must not starve the rest of the worker
+    if not socket_rate_limiter.allow(sid):
+        return {'error': 'Rate limited'}
+    
+    session = await session_store.get(sid)
+    if not session:
         return {'error': 'Not authenticated'}
     
-    session = user_sessions[sid]
-    room_id = session.get('room_id')
+    room_id = session.room_id
     
     if not room_id:
         return {'error': 'Not in a room'}
     
-    room_key = f"room:{room_id}"
     action_type = data.get('type')
     action_data = data.get('data', {})
     
-    # Broadcast to all users in room
-    await sio.emit(
-        'game_update',
-        {
-            'type': action_type,
-            'data': action_data,
-            'user_id': session.get('user_id'),
-            'timestamp': datetime.utcnow().isoformat()
-        },
-        room=room_key
-    )
+    # Serialise once: the same document is broadcast and journaled
+    update = json_codec.RawJSON(json.dumps({
+        'type': action_type,
+        'data': action_data,
+        'user_id': session.user_id,
+        'timestamp': time.time()
+    }, separators=(',', ':')))
     
-    # Store in Redis for persistence
-    await redis_client.lpush(
-        f"room:{room_id}:actions",
-        json.dumps({
-            'type': action_type,
-            'data': action_data,
-            'user_id': session.get('user_id'),
-            'timestamp': datetime.utcnow().isoformat()
-        })
-    )
+    # Broadcast to all users in room, batched per tick; only the latest
+    # low-priority update of each sender is kept
+    coalesce_key = None
+    if isinstance(action_type, str) and action_type in LOW_PRIORITY_TYPES:
+        coalesce_key = (action_type, session.user_id)
+    if not await outbound_scheduler.publish(room_id, update, coalesce_key):
+        return {'error': 'Room is busy'}
+    
+    # Persisted in batches off the critical path
+    if settings.ACTION_JOURNAL_ENABLED:
+        action_journal.append(room_id, update)
     
     return {'success': True}
 
@@ -168,30 +313,39 @@ async def game_action(sid, data):
 @sio.event
 async def start_timer(sid, data):
     """Start a synchronized timer"""
-    if sid not in user_sessions:
+    session = await session_store.get(sid)
+    if not session:
         return {'error': 'Not authenticated'}
     
-    session = user_sessions[sid]
-    room_id = session.get('room_id')
+    room_id = session.room_id
     
     if not room_id:
         return {'error': 'Not in a room'}
     
     duration = data.get('duration', 60)  # Default 60 seconds
-    t0 = datetime.utcnow().timestamp()
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+        return {'error': 'Invalid duration'}
     
-    # Store timer info in Redis
-    await redis_client.hset(
-        f"room:{room_id}",
-        "timer_start",
-        str(t0)
-    )
-    await redis_client.hset(
-        f"room:{room_id}",
-        "timer_duration",
-        str(duration)
+    # Scored when the timer expires, so it must name a prompt
+    prompt_id = data.get('prompt_id')
+    if prompt_id is not None and not _is_db_id(prompt_id):
+        return {'error': 'Invalid prompt_id'}
+    
+    t0 = time.time()
+    
+    # Store timer info in Redis; the prompt tells round-end logic what to score
+    await room_state_store.update(
+        room_id,
+        {
+            "timer_start": t0,
+            "timer_duration": duration,
+            "timer_prompt_id": data.get('prompt_id')
+        }
     )
     
+    # The server decides when the timer is over and emits timer_expired
+    await timer_scheduler.schedule(room_id, t0 + duration)
+    
     # Broadcast timer sync
     await sio.emit(
         'timer_sync',
@@ -208,21 +362,37 @@ async def start_timer(sid, data):
 @sio.event
 async def drawing_stroke(sid, data):
     """Handle drawing strokes for Draw & Guess game"""
-    if sid not in user_sessions:
+    # Shares the socket's budget with game_action
+    if not socket_rate_limiter.allow(sid):
+        return {'error': 'Rate limited'}
+    
+    session = await session_store.get(sid)
+    if not session:
         return {'error': 'Not authenticated'}
     
-    session = user_sessions[sid]
-    room_id = session.get('room_id')
+    room_id = session.room_id
     
     if not room_id:
         return {'error': 'Not in a room'}
     
-    # Broadcast stroke to all other users in room
+    stroke = data.get('stroke')
+    if isinstance(stroke, (bytes, bytearray)):
+        # Binary strokes are validated, then batched into per-tick frames
+        try:
+            decode_stroke(bytes(stroke))
+        except StrokeFormatError as e:
+            return {'error': str(e)}
+        
+        user_id = int(session.user_id) if session.user_id and session.user_id.isdigit() else 0
+        stroke_batcher.add(room_id, sid, user_id, bytes(stroke))
+        return {'success': True}
+    
+    # Legacy JSON strokes: broadcast to all other users in room
     await sio.emit(
         'stroke_update',
         {
             'stroke': data.get('stroke'),
-            'user_id': session.get('user_id')
+            'user_id': session.user_id
         },
         room=f"room:{room_id}",
         skip_sid=sid
@@ -0,0 +1,221 @@
+"""Compact binary stroke transport for Draw & Guess.
+
+Stroke layout (little-endian):
+    u8  version
+    u8  flags (bit 0: eraser)
+    u8  width in pixels
+    u32 colour as 0xRRGGBBAA
+    u16 point count
+    u16 x0, u16 y0               first point, quantised to 0..COORD_MAX
+    varint dx, varint dy, ...    zigzag-encoded deltas for every other point
+
+Frame layout (one per room per tick):
+    u8  version
+    u16 entry count
+    per entry: u32 user id, u16 stroke length, stroke bytes
+"""
+import asyncio
+import struct
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+STROKE_VERSION = 1
+COORD_MAX = 4095  # Canvas coordinates are normalised to [0, 1] then quantised
+MAX_POINTS = 1024
+MAX_WIDTH = 64
+FLAG_ERASER = 0x01
+
+_HEADER = struct.Struct("<BBBIH")
+_ORIGIN = struct.Struct("<HH")
+_FRAME_HEADER = struct.Struct("<BH")
+_ENTRY = struct.Struct("<IH")
+
+
+class StrokeFormatError(ValueError):
+    pass
+
+
+class Stroke:
+    __slots__ = ("flags", "width", "color", "points")
+
+    def __init__(self, flags: int, width: int, color: int, points: List[Tuple[int, int]]):
+        self.flags = flags
+        self.width = width
+        self.color = color
+        self.points = points
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data) or shift > 14:
+            raise StrokeFormatError("Truncated or oversized delta")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def quantise(value: float) -> int:
+    return int(round(min(max(value, 0.0), 1.0) * COORD_MAX))
+
+
+def encode_quantised(
+    points: Sequence[Tuple[int, int]],
+    width: int = 4,
+    color: int = 0x000000FF,
+    flags: int = 0
+) -> bytes:
+    """Encode already-quantised points"""
+    if not 1 <= len(points) <= MAX_POINTS:
+        raise StrokeFormatError("Invalid point count")
+
+    out = bytearray(_HEADER.pack(STROKE_VERSION, flags, width, color, len(points)))
+    x, y = points[0]
+    out += _ORIGIN.pack(x, y)
+    for next_x, next_y in points[1:]:
+        _write_varint(out, _zigzag(next_x - x))
+        _write_varint(out, _zigzag(next_y - y))
+        x, y = next_x, next_y
+    return bytes(out)
+
+
+def encode_stroke(
+    points: Sequence[Tuple[float, float]],
+    width: int = 4,
+    color: int = 0x000000FF,
+    flags: int = 0
+) -> bytes:
+    """Encode a stroke given as normalised (x, y) canvas coordinates"""
+    return encode_quantised(
+        [(quantise(x), quantise(y)) for x, y in points], width, color, flags
+    )
+
+
+def decode_stroke(data: bytes) -> Stroke:
+    """Decode and validate a stroke, raising StrokeFormatError if malformed"""
+    if len(data) < _HEADER.size + _ORIGIN.size:
+        raise StrokeFormatError("Stroke too short")
+
+    version, flags, width, color, count = _HEADER.unpack_from(data)
+    if version != STROKE_VERSION:
+        raise StrokeFormatError("Unsupported stroke version")
+    if not 1 <= width <= MAX_WIDTH:
+        raise StrokeFormatError("Invalid stroke width")
+    if not 1 <= count <= MAX_POINTS:
+        raise StrokeFormatError("Invalid point count")
+
+    x, y = _ORIGIN.unpack_from(data, _HEADER.size)
+    if x > COORD_MAX or y > COORD_MAX:
+        raise StrokeFormatError("Point outside canvas")
+    pos = _HEADER.size + _ORIGIN.size
+    points = [(x, y)]
+    for _ in range(count - 1):
+        dx, pos = _read_varint(data, pos)
+        dy, pos = _read_varint(data, pos)
+        x += _unzigzag(dx)
+        y += _unzigzag(dy)
+        if not (0 <= x <= COORD_MAX and 0 <= y <= COORD_MAX):
+            raise StrokeFormatError("Point outside canvas")
+        points.append((x, y))
+
+    if pos != len(data):
+        raise StrokeFormatError("Trailing bytes after stroke")
+
+    return Stroke(flags, width, color, points)
+
+
+def encode_frame(entries: Sequence[Tuple[int, bytes]]) -> bytes:
+    """Pack (user_id, stroke) entries into a single frame"""
+    out = bytearray(_FRAME_HEADER.pack(STROKE_VERSION, len(entries)))
+    for user_id, stroke in entries:
+        out += _ENTRY.pack(user_id, len(stroke))
+        out += stroke
+    return bytes(out)
+
+
+def iter_frame(frame: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Yield the (user_id, stroke) entries of a frame"""
+    version, count = _FRAME_HEADER.unpack_from(frame)
+    if version != STROKE_VERSION:
+        raise StrokeFormatError("Unsupported frame version")
+    pos = _FRAME_HEADER.size
+    for _ in range(count):
+        user_id, length = _ENTRY.unpack_from(frame, pos)
+        pos += _ENTRY.size
+        yield user_id, frame[pos:pos + length]
+        pos += length
+
+
+class StrokeBatcher:
+    """Micro-batch validated strokes into one frame per room per tick.
+
+    The first stroke in an idle room schedules a flush one tick later; every
+    stroke arriving before then rides in the same frame. Each flushed frame
+    is broadcast once and handed to ``persist`` for the room's stroke log.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, bytes, Optional[str]], Awaitable[None]],
+        tick_hz: float,
+        persist: Callable[[str, bytes], Awaitable[None]]
+    ):
+        self._emit = emit
+        self.interval = 1.0 / tick_hz
+        self._persist = persist
+        self._pending: Dict[str, List[Tuple[str, int, bytes]]] = {}
+        self._flushes: Dict[str, asyncio.Task] = {}
+
+    def add(self, room_id, sid: str, user_id: int, stroke: bytes):
+        room_id = str(room_id)
+        self._pending.setdefault(room_id, []).append((sid, user_id, stroke))
+        if room_id not in self._flushes:
+            self._flushes[room_id] = asyncio.create_task(self._flush_later(room_id))
+
+    def discard(self, room_id):
+        """Drop strokes not yet flushed, e.g. when the canvas is cleared"""
+        room_id = str(room_id)
+        task = self._flushes.pop(room_id, None)
+        if task:
+            task.cancel()
+        self._pending.pop(room_id, None)
+
+    async def _flush_later(self, room_id):
+        await asyncio.sleep(self.interval)
+        entries = self._pending.pop(room_id, [])
+        del self._flushes[room_id]
+        if not entries:
+            return
+
+        frame = encode_frame([(user_id, stroke) for _, user_id, stroke in entries])
+
+        # Usually one drawer per room: don't echo their own strokes back
+        senders = {sid for sid, _, _ in entries}
+        skip_sid = senders.pop() if len(senders) == 1 else None
+        try:
+            await self._emit(room_id, frame, skip_sid)
+        except Exception as e:
+            print(f"Stroke frame for room {room_id} failed: {e}")
+        # Persist even if the broadcast failed, so replays still have it
+        try:
+            await self._persist(room_id, frame)
+        except Exception as e:
+            print(f"Storing stroke frame for room {room_id} failed: {e}")
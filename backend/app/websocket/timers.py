@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.core.redis_client import redis_client
+
+timers_fired = Counter(
+    "room_timers_fired_total",
+    "Room timers that expired and were handled"
+)
+timer_lateness = Histogram(
+    "room_timer_lateness_seconds",
+    "Delay between a room timer's deadline and its expiry handler starting",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+# Deadlines (epoch seconds) by room id, shared by all workers
+TIMERS_KEY = "room_timers"
+LEADER_KEY = "room_timers:leader"
+
+# Remove the given (room, deadline) pairs whose deadline is still current and
+# return the rooms removed. A restarted timer has a new deadline and stays.
+TIMER_CLAIM_SCRIPT = """
+local claimed = {}
+for i = 1, #ARGV, 2 do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) == tonumber(ARGV[i + 1]) then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        claimed[#claimed + 1] = ARGV[i]
+    end
+end
+return claimed
+"""
+
+# Extend the leader lease only if this node still holds it
+LEADER_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Give up the leader lease only if this node still holds it
+LEADER_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+redis_client.register_script("timer_claim", TIMER_CLAIM_SCRIPT)
+redis_client.register_script("timer_leader_renew", LEADER_RENEW_SCRIPT)
+redis_client.register_script("timer_leader_release", LEADER_RELEASE_SCRIPT)
+
+
+class TimerScheduler:
+    """Server-side room timers, fired by one elected worker.
+
+    Any worker can ``schedule`` a timer: the deadline goes into a Redis
+    sorted set, so timers survive restarts. The worker holding the leader
+    lease sweeps timers due soon from the set into an in-memory heap
+    (O(log n) per timer) and sleeps until the earliest deadline. Due timers
+    are claimed from the set in one script call, so a timer fires once even
+    across a leader change, and ``on_expire(room_id, deadline)`` runs for
+    each. Timers scheduled on the leader go straight into its heap; others
+    are picked up within one sweep interval.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[str, float], Awaitable[None]],
+        sweep_interval: float,
+        lease_seconds: float
+    ):
+        self._on_expire = on_expire
+        self.sweep_interval = sweep_interval
+        self.lease_seconds = lease_seconds
+        self.node_id = uuid.uuid4().hex
+        self.is_leader = False
+        self._heap: List[Tuple[float, str]] = []
+        # Current deadline per room; heap entries that differ are stale
+        self._deadlines: Dict[str, float] = {}
+        self._next_campaign = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def schedule(self, room_id, deadline: float):
+        """Fire the room's timer at ``deadline``, replacing any running one"""
+        room_id = str(room_id)
+        await redis_client.redis.zadd(TIMERS_KEY, {room_id: deadline})
+        if self.is_leader:
+            self._push(room_id, deadline)
+
+    async def cancel(self, room_id):
+        room_id = str(room_id)
+        await redis_client.redis.zrem(TIMERS_KEY, room_id)
+        self._deadlines.pop(room_id, None)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self.is_leader:
+            # Let another worker take over without waiting for the lease
+            await redis_client.run_script("timer_leader_release", keys=[LEADER_KEY], args=[self.node_id])
+            self._step_down()
+
+    def _push(self, room_id: str, deadline: float):
+        if self._deadlines.get(room_id) == deadline:
+            return
+        self._deadlines[room_id] = deadline
+        heapq.heappush(self._heap, (deadline, room_id))
+        if self._heap[0][1] == room_id:
+            # New earliest deadline: cut the current sleep short
+            self._wakeup.set()
+
+    def _step_down(self):
+        self.is_leader = False
+        self._heap.clear()
+        self._deadlines.clear()
+
+    async def _campaign(self):
+        """Take or renew the leader lease"""
+        now = time.monotonic()
+        if now < self._next_campaign:
+            return
+        self._next_campaign = now + self.lease_seconds / 3
+
+        lease_ms = int(self.lease_seconds * 1000)
+        if self.is_leader:
+            renewed = await redis_client.run_script(
+                "timer_leader_renew", keys=[LEADER_KEY], args=[self.node_id, lease_ms]
+            )
+            if not renewed:
+                self._step_down()
+        else:
+            self.is_leader = bool(
+                await redis_client.redis.set(LEADER_KEY, self.node_id, px=lease_ms, nx=True)
+            )
+
+    async def _sweep(self):
+        """Load timers due before the next sweep (and any overdue ones)"""
+        horizon = time.time() + self.sweep_interval * 2
+        due = await redis_client.redis.zrangebyscore(TIMERS_KEY, "-inf", horizon, withscores=True)
+        for room_id, deadline in due:
+            self._push(room_id, deadline)
+
+    async def _fire_due(self):
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, room_id = heapq.heappop(self._heap)
+            if self._deadlines.get(room_id) == deadline:
+                del self._deadlines[room_id]
+                due.append((room_id, deadline))
+        if not due:
+            return
+
+        claimed = set(await redis_client.run_script(
+            "timer_claim",
+            keys=[TIMERS_KEY],
+            args=[value for room_id, deadline in due for value in (room_id, repr(deadline))]
+        ))
+        for room_id, deadline in due:
+            if room_id in claimed:
+                task = asyncio.create_task(self._expire(room_id, deadline))
+                self._handlers.add(task)
+                task.add_done_callback(self._handlers.discard)
+
+    async def _expire(self, room_id: str, deadline: float):
+        timer_lateness.observe(max(time.time() - deadline, 0.0))
+        timers_fired.inc()
+        try:
+            await self._on_expire(room_id, deadline)
+        except Exception as e:
+            print(f"Timer expiry for room {room_id} failed: {e}")
+
+    async def _run(self):
+        next_sweep = 0.0
+        while True:
+            try:
+                await self._campaign()
+                if self.is_leader:
+                    if time.monotonic() >= next_sweep:
+                        next_sweep = time.monotonic() + self.sweep_interval
+                        await self._sweep()
+                    await self._fire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis hiccup: keep the loop alive and retry next tick
+                print(f"Timer scheduler error: {e}")
+
+            timeout = self.sweep_interval
+            if self.is_leader and self._heap:
+                timeout = min(timeout, max(self._heap[0][0] - time.time(), 0.0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,101 @@
+"""Benchmark game_action throughput per worker with the action journal on and off.
+
+Drives the game_action Socket.IO handler directly from many concurrent
+simulated clients in one process against a real redis-server (REDIS_URL,
+default redis://localhost:6379). The room has no connected sockets, so the
+broadcast itself is nearly free and the numbers isolate the persistence
+cost. The previous behaviour (one LPUSH per action, awaited inline) is
+included for comparison.
+
+Usage:
+    python scripts/bench_action_journal.py [--events 50000] [--clients 100]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.websocket import socketio_app
+from app.websocket.journal import action_journal
+from app.websocket.sessions import session_store
+
+ROOM_ID = 999_996
+
+
+async def legacy_game_action(sid, data):
+    """game_action as it was before the journal: inline LPUSH per event"""
+    session = await session_store.get(sid)
+    update = {
+        "type": data.get("type"),
+        "data": data.get("data", {}),
+        "user_id": session.user_id,
+        "timestamp": time.time()
+    }
+    await socketio_app.sio.emit("game_update", update, room=f"room:{session.room_id}")
+    await redis_client.lpush(f"room:{session.room_id}:actions", json.dumps(update))
+    return {"success": True}
+
+
+async def run(handler, sids, events):
+    per_client = events // len(sids)
+
+    async def client(sid):
+        for i in range(per_client):
+            await handler(sid, {"type": "bench", "data": {"seq": i}})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(sid) for sid in sids))
+    # Count the time to get everything into Redis
+    await action_journal.flush()
+    return per_client * len(sids) / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args()
+
+    # Per-emit logging would dominate the measurement
+    socketio_app.sio.logger.setLevel(logging.WARNING)
+    
+    await redis_client.connect()
+    sids = [f"bench-{i}" for i in range(args.clients)]
+    for i, sid in enumerate(sids):
+        await session_store.create(sid, user_id=str(i + 1))
+        await session_store.set_room(sid, ROOM_ID)
+
+    action_journal.start()
+    print(f"{'mode':>10}{'events/s':>14}")
+    for label, handler, journal_enabled in (
+        ("lpush", legacy_game_action, False),
+        ("off", socketio_app.game_action, False),
+        ("journal", socketio_app.game_action, True),
+    ):
+        settings.ACTION_JOURNAL_ENABLED = journal_enabled
+        rate = await run(handler, sids, args.events)
+        print(f"{label:>10}{rate:>14,.0f}")
+    await action_journal.stop()
+
+    for sid in sids:
+        await session_store.remove(sid)
+    for key in (f"room:{ROOM_ID}:actions", f"room:{ROOM_ID}:journal", f"room:{ROOM_ID}:sids"):
+        await redis_client.delete(key)
+    await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Benchmark Sixty Seconds round scoring for growing player counts.
+
+Generates rounds of 10 / 100 / 1,000 players with 30 answers each, drawn
+from a shared vocabulary with case, accent, punctuation and plural noise,
+and times score_answers over them. First checks that known singular/plural
+pairs normalise to the same key and exits with status 1 if any does not.
+
+Usage:
+    python scripts/bench_answer_scoring.py
+"""
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.answer_scoring import score_answers, normalize_answer
+
+PLAYER_COUNTS = [10, 100, 1_000]
+ANSWERS_PER_PLAYER = 30
+VOCABULARY_SIZE = 5_000
+RUNS = 20
+
+# Each pair must score as the same answer
+SAME_ANSWER = [
+    ("movie", "movies"),
+    ("cookie", "cookies"),
+    ("pie", "pies"),
+    ("city", "cities"),
+    ("toy", "toys"),
+    ("glass", "glasses"),
+    ("cake", "cakes"),
+    ("Crème Brûlée!", "creme brulees"),
+]
+
+
+def noisy(word: str) -> str:
+    variant = random.choice((str.lower, str.upper, str.title))(word)
+    if random.random() < 0.3:
+        variant += "s"
+    if random.random() < 0.2:
+        variant += random.choice("!?.")
+    if random.random() < 0.1:
+        variant = f"  {variant} "
+    return variant
+
+
+def make_round(players: int) -> dict:
+    vocabulary = [f"answer {i} crème" if i % 10 == 0 else f"answer{i}" for i in range(VOCABULARY_SIZE)]
+    return {
+        str(player): [noisy(random.choice(vocabulary)) for _ in range(ANSWERS_PER_PLAYER)]
+        for player in range(players)
+    }
+
+
+def main():
+    mismatched = [pair for pair in SAME_ANSWER if normalize_answer(pair[0]) != normalize_answer(pair[1])]
+    for first, second in mismatched:
+        print(f"FAIL: {first!r} -> {normalize_answer(first)!r} but {second!r} -> {normalize_answer(second)!r}")
+    if mismatched:
+        sys.exit(1)
+
+    for players in PLAYER_COUNTS:
+        timings = []
+        for _ in range(RUNS):
+            answers = make_round(players)
+            normalize_answer.cache_clear()
+            start = time.perf_counter()
+            scores, total_unique = score_answers(answers)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(
+            f"{players:>5} players x {ANSWERS_PER_PLAYER} answers: "
+            f"p50={statistics.median(timings) * 1000:8.3f}ms  "
+            f"max={timings[-1] * 1000:8.3f}ms  "
+            f"distinct={total_unique}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark requests/s of the game action endpoint with and without the principal cache.
+
+Sends Would You Rather votes to POST /api/games/rooms/{id}/action through
+the ASGI app in-process (no network), against the real Postgres and Redis
+from the environment (DATABASE_URL, REDIS_URL). A throwaway user and room
+are created and removed afterwards. Modes: every request loads the user
+from Postgres ("db"), the two-tier principal cache ("cache"), and
+authorisation from access token claims ("claims").
+
+Usage:
+    python scripts/bench_auth_cache.py [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+import httpx
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.core.security import access_token_claims, create_access_token
+from app.db.base import AsyncSessionLocal
+from app.main import app
+from app.models import Room, User
+from app.services.principal_cache import principal_cache
+
+
+async def create_fixtures():
+    async with AsyncSessionLocal() as session:
+        user = User(
+            email=f"bench-{secrets.token_hex(4)}@example.com",
+            hashed_password="!",
+            is_active=True
+        )
+        session.add(user)
+        await session.flush()
+        room = Room(host_id=user.id, game_slug="would_you_rather")
+        session.add(room)
+        await session.commit()
+        return user, room
+
+
+async def delete_fixtures(user, room):
+    async with AsyncSessionLocal() as session:
+        await session.delete(await session.get(Room, room.id))
+        await session.delete(await session.get(User, user.id))
+        await session.commit()
+    await principal_cache.invalidate(user.id)
+
+
+async def run(client, room_id, token, requests, concurrency):
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"action": "vote", "data": {"prompt_id": 1, "choice": "a"}}
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            response = await client.post(f"/api/games/rooms/{room_id}/action", json=body, headers=headers)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    await redis_client.connect()
+    user, room = await create_fixtures()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'mode':>8}{'req/s':>12}")
+            for label, cache_enabled, token_claims in (
+                ("db", False, False),
+                ("cache", True, False),
+                ("claims", True, True),
+            ):
+                settings.PRINCIPAL_CACHE_ENABLED = cache_enabled
+                settings.AUTH_TOKEN_CLAIMS = token_claims
+                token = create_access_token(access_token_claims(user))
+                rate = await run(client, room.id, token, args.requests, args.concurrency)
+                print(f"{label:>8}{rate:>12,.0f}")
+    finally:
+        await delete_fixtures(user, room)
+        for key in (f"room:{room.id}:votes:1", f"room:{room.id}:vote_counts:1"):
+            await redis_client.delete(key)
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
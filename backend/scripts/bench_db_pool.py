@@ -0,0 +1,97 @@
+"""Saturate the API and report database pool wait time percentiles.
+
+Sends GET /api/rooms/{id} (one primary-key lookup per request) through the
+ASGI app in-process with more concurrent requests than the pool has
+connections, then reads the db_pool_wait_seconds histogram exported on
+/metrics. Percentiles are interpolated within histogram buckets. Needs the
+real Postgres from the environment (DATABASE_URL); pool settings come
+from the usual DB_POOL_* variables.
+
+Usage:
+    python scripts/bench_db_pool.py [--requests 5000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+import httpx
+
+from app.core.config import settings
+from app.db.base import db_pool_wait_seconds, db_pool_timeouts, engine
+from app.main import app
+
+
+def bucket_counts():
+    """Cumulative (upper bound, count) pairs of the wait histogram"""
+    return [
+        (float(sample.labels["le"]), sample.value)
+        for sample in db_pool_wait_seconds.collect()[0].samples
+        if sample.name.endswith("_bucket")
+    ]
+
+
+def percentile(buckets, baseline, q):
+    total = buckets[-1][1] - baseline[-1][1]
+    target = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for (bound, count), (_, base) in zip(buckets, baseline):
+        count -= base
+        if count >= target:
+            if bound == float("inf"):
+                return lower_bound
+            share = (target - lower_count) / (count - lower_count) if count > lower_count else 1.0
+            return lower_bound + (bound - lower_bound) * share
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the pool so connection setup isn't counted as waiting
+        await client.get("/api/rooms/0")
+
+        baseline = bucket_counts()
+        timeouts_before = db_pool_timeouts._value.get()
+        queue = iter(range(args.requests))
+        statuses = {}
+
+        async def worker():
+            for _ in queue:
+                response = await client.get("/api/rooms/0")
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        buckets = bucket_counts()
+
+    print(
+        f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW} "
+        f"concurrency={args.concurrency}"
+    )
+    print(f"requests/s: {args.requests / elapsed:,.0f}  statuses: {statuses}")
+    print(f"pool timeouts: {db_pool_timeouts._value.get() - timeouts_before:.0f}")
+    for q in (0.5, 0.9, 0.99):
+        print(f"pool wait p{int(q * 100)}: {percentile(buckets, baseline, q) * 1000:.2f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
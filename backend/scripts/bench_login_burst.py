@@ -0,0 +1,121 @@
+"""Load test Socket.IO event latency during a burst of concurrent logins.
+
+Fires a burst of POST /api/auth/login requests through the ASGI app
+in-process while a probe keeps dispatching game_action events to the
+Socket.IO handler and records how long each takes. Runs once with bcrypt
+inline on the event loop (the old behaviour) and once through the hashing
+pool. Needs the real Postgres and Redis from the environment
+(DATABASE_URL, REDIS_URL); a throwaway user is created and removed.
+
+Usage:
+    python scripts/bench_login_burst.py [--logins 500]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import secrets
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+import httpx
+
+from app.core.redis_client import redis_client
+from app.core.security import password_hasher
+from app.db.base import AsyncSessionLocal
+from app.main import app
+from app.models import User
+from app.websocket import socketio_app
+from app.websocket.sessions import session_store
+
+ROOM_ID = 999_995
+PROBE_SID = "bench-probe"
+PASSWORD = "correct horse battery staple"
+
+
+async def inline_run(func, *args):
+    """The old behaviour: bcrypt on the event loop thread"""
+    return func(*args)
+
+
+async def probe(stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await socketio_app.game_action(PROBE_SID, {"type": "probe", "data": {}})
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+
+async def burst(client, email, logins):
+    async def login():
+        response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        return response.status_code
+
+    latencies = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, latencies))
+    await asyncio.sleep(0.1)
+
+    start = time.perf_counter()
+    statuses = Counter(await asyncio.gather(*(login() for _ in range(logins))))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    latencies.sort()
+    return statuses, elapsed, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=500)
+    args = parser.parse_args()
+
+    socketio_app.sio.logger.setLevel(logging.WARNING)
+    await redis_client.connect()
+    await session_store.create(PROBE_SID, user_id="0")
+    await session_store.set_room(PROBE_SID, ROOM_ID)
+
+    email = f"bench-{secrets.token_hex(4)}@example.com"
+    async with AsyncSessionLocal() as session:
+        user = User(email=email, hashed_password=await password_hasher.hash(PASSWORD))
+        session.add(user)
+        await session.commit()
+
+    pooled_run = password_hasher._run
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'mode':>8}{'logins/s':>10}{'ok':>6}{'429':>6}{'probe p50 ms':>14}{'probe p99 ms':>14}{'probe max ms':>14}")
+            for label, run in (("inline", inline_run), ("pool", pooled_run)):
+                password_hasher._run = run
+                statuses, elapsed, latencies = await burst(client, email, args.logins)
+                print(
+                    f"{label:>8}{args.logins / elapsed:>10,.0f}{statuses[200]:>6}{statuses[429]:>6}"
+                    f"{statistics.median(latencies) * 1000:>14.2f}"
+                    f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>14.2f}"
+                    f"{latencies[-1] * 1000:>14.2f}"
+                )
+    finally:
+        password_hasher._run = pooled_run
+        async with AsyncSessionLocal() as session:
+            await session.delete(await session.get(User, user.id))
+            await session.commit()
+        await session_store.remove(PROBE_SID)
+        for key in (f"room:{ROOM_ID}:journal", f"room:{ROOM_ID}:sids"):
+            await redis_client.delete(key)
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
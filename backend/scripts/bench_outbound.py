@@ -0,0 +1,189 @@
+"""Benchmark game_action fan-out under a flood: direct emit vs outbound scheduler.
+
+Runs the game_action path in one event loop for --rooms rooms of --viewers
+viewers. In every room --players well-behaved players send an action every
+--player-interval seconds; in the first room one extra client floods
+actions as fast as the loop lets it, --flood-burst per wakeup. "direct" is the old path (encode and
+emit every action at once); "scheduled" adds the per-socket rate limit and
+the per-room outbound scheduler (settings OUTBOUND_* and SOCKET_EVENT_*).
+
+Fan-out is simulated by encoding the Socket.IO packet once per emit and
+queueing it for each viewer, which is what the server does per connected
+socket; network I/O is not included. Reports process CPU time per 1,000
+actions handled and the delivery latency of the well-behaved players'
+actions, in the flooded room and in the others.
+
+Usage:
+    python scripts/bench_outbound.py [--duration 5] [--rooms 20] [--viewers 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("DATABASE_URL", "REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from socketio import packet
+
+from app.core.config import settings
+from app.websocket import json_codec
+from app.websocket.outbound import OutboundScheduler, RateLimiter
+
+# As configured by the server
+packet.Packet.json = json_codec
+
+FLOOD_ROOM = 0
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+class Room:
+    def __init__(self, viewers):
+        self.queues = [[] for _ in range(viewers)]
+
+    def fan_out(self, event, payload):
+        encoded = packet.Packet(packet.EVENT, data=[event, payload], namespace="/").encode()
+        for queue in self.queues:
+            queue.append(encoded)
+        if len(self.queues[0]) > 1000:
+            # Stand-in for the sockets draining their queues
+            for queue in self.queues:
+                queue.clear()
+
+
+class Run:
+    def __init__(self, mode, rooms, viewers):
+        self.mode = mode
+        self.rooms = [Room(viewers) for _ in range(rooms)]
+        self.sent_at = {}
+        self.latencies = {True: [], False: []}
+        self.handled = 0
+        self.refused = 0
+        self.scheduler = OutboundScheduler(
+            self.emit_frame,
+            settings.OUTBOUND_TICK_HZ,
+            settings.OUTBOUND_ROOM_RATE,
+            settings.OUTBOUND_ROOM_BURST,
+            settings.OUTBOUND_MAX_PENDING,
+            settings.OUTBOUND_MAX_BATCH
+        )
+        self.limiter = RateLimiter(settings.SOCKET_EVENT_RATE, settings.SOCKET_EVENT_BURST)
+
+    def delivered(self, room_id, updates):
+        now = time.perf_counter()
+        for update in updates:
+            sent = self.sent_at.pop(update, None)
+            if sent is not None:
+                self.latencies[room_id == FLOOD_ROOM].append(now - sent)
+
+    async def emit_frame(self, room_id, updates):
+        room_id = int(room_id)
+        if len(updates) == 1:
+            self.rooms[room_id].fan_out("game_update", json_codec.RawJSON(updates[0]))
+        else:
+            self.rooms[room_id].fan_out("game_updates", json_codec.RawJSON("[" + ",".join(updates) + "]"))
+        self.delivered(room_id, updates)
+
+    async def game_action(self, sid, room_id, user_id, action_type, data, sent_at=None):
+        """What the game_action handler does once the session is known"""
+        self.handled += 1
+        if self.mode == "scheduled" and not self.limiter.allow(sid):
+            self.refused += 1
+            return
+        update = json_codec.RawJSON(json.dumps({
+            "type": action_type,
+            "data": data,
+            "user_id": user_id,
+            "timestamp": time.time()
+        }, separators=(",", ":")))
+        if sent_at is not None:
+            self.sent_at[update] = sent_at
+
+        if self.mode == "direct":
+            self.rooms[room_id].fan_out("game_update", update)
+            self.delivered(room_id, [update])
+        elif not await self.scheduler.publish(room_id, update):
+            self.sent_at.pop(update, None)
+            self.refused += 1
+
+
+async def player(run, sid, room_id, interval, deadline):
+    # Latency counts from when the action was due, so event loop lag shows
+    due = time.perf_counter() + random.uniform(0, interval)
+    seq = 0
+    while time.monotonic() < deadline:
+        due += interval
+        await asyncio.sleep(max(due - time.perf_counter(), 0))
+        seq += 1
+        await run.game_action(sid, room_id, sid, "answer", {"seq": seq}, sent_at=due)
+
+
+async def flooder(run, burst, deadline):
+    # Each wakeup handles a socket read's worth of queued events
+    seq = 0
+    while time.monotonic() < deadline:
+        for _ in range(burst):
+            seq += 1
+            await run.game_action("flooder", FLOOD_ROOM, "flooder", "answer", {"seq": seq})
+        await asyncio.sleep(0)
+
+
+async def bench(mode, args):
+    run = Run(mode, args.rooms, args.viewers)
+    deadline = time.monotonic() + args.duration
+    cpu_start = time.process_time()
+    await asyncio.gather(
+        flooder(run, args.flood_burst, deadline),
+        *(
+            player(run, f"{room_id}-{i}", room_id, args.player_interval, deadline)
+            for room_id in range(args.rooms)
+            for i in range(args.players)
+        )
+    )
+    # Let queued frames go out
+    await asyncio.sleep(1)
+    cpu = time.process_time() - cpu_start
+    return run, cpu
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--viewers", type=int, default=8)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--player-interval", type=float, default=0.1)
+    parser.add_argument("--flood-burst", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>10}{'actions':>10}{'refused':>10}{'cpu ms/1k':>11}"
+        f"{'flooded p50/p99 ms':>21}{'others p50/p99 ms':>20}{'lost':>6}"
+    )
+    for mode in ("direct", "scheduled"):
+        run, cpu = await bench(mode, args)
+        columns = []
+        for flooded in (True, False):
+            latencies = sorted(run.latencies[flooded]) or [float("nan")]
+            columns.append(
+                f"{statistics.median(latencies) * 1000:.2f}/{percentile(latencies, 0.99) * 1000:.2f}"
+            )
+        print(
+            f"{mode:>10}{run.handled:>10,}{run.refused:>10,}{cpu / run.handled * 1_000_000:>11.2f}"
+            f"{columns[0]:>21}{columns[1]:>20}{len(run.sent_at):>6}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
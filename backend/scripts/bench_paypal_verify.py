@@ -0,0 +1,106 @@
+"""Measure event-loop blocking while verifying PayPal orders.
+
+Runs the PayPal step of /api/payments/verify against the local stub
+(scripts/paypal_stub.py) with artificial latency, while a ticker task
+records how long the event loop was unable to run it. "blocking" repeats
+what the old SDK client did (a synchronous token fetch and order lookup
+per verification, on the event loop); "async" is PayPalService with fresh
+order IDs; "cached" verifies the same orders again. Needs Redis
+(REDIS_URL, default redis://localhost:6379) for the order cache.
+
+Usage:
+    python scripts/bench_paypal_verify.py [--orders 50] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+STUB_PORT = 8300
+
+os.environ["PAYPAL_API_BASE"] = f"http://127.0.0.1:{STUB_PORT}"
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+import httpx
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.paypal import paypal_service
+from scripts.paypal_stub import start_stub
+
+TICK = 0.001
+
+
+async def blocking_verify(order_id):
+    """The old behaviour: synchronous HTTP with a fresh token every call"""
+    with httpx.Client(base_url=settings.PAYPAL_API_BASE) as client:
+        token = client.post(
+            "/v1/oauth2/token",
+            data={"grant_type": "client_credentials"},
+            auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_CLIENT_SECRET)
+        ).json()["access_token"]
+        return client.get(
+            f"/v2/checkout/orders/{order_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        ).json()
+
+
+async def ticker(stop, lags):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(max(loop.time() - start - TICK, 0.0))
+
+
+async def measure(verify, order_ids):
+    lags = []
+    stop = asyncio.Event()
+    ticker_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(verify(order_id) for order_id in order_ids))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker_task
+    return elapsed, sum(lags), max(lags)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    stub = start_stub(STUB_PORT, args.latency)
+    await redis_client.connect()
+    order_ids = [f"BENCH-{uuid.uuid4().hex[:12]}" for _ in range(args.orders)]
+
+    print(f"{'mode':>10}{'wall s':>10}{'loop blocked s':>16}{'longest stall ms':>18}")
+    for label, verify, ids in (
+        ("blocking", blocking_verify, [f"OLD-{order_id}" for order_id in order_ids]),
+        ("async", paypal_service.verify_order, order_ids),
+        ("cached", paypal_service.verify_order, order_ids),
+    ):
+        elapsed, blocked, longest = await measure(verify, ids)
+        print(f"{label:>10}{elapsed:>10.2f}{blocked:>16.2f}{longest * 1000:>18.1f}")
+
+    for order_id in order_ids:
+        await redis_client.delete(f"paypal:order:{order_id}")
+    await paypal_service.close()
+    await redis_client.disconnect()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
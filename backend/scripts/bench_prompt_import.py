@@ -0,0 +1,138 @@
+"""Benchmark the bulk prompt import against the ORM seeding path.
+
+Generates a JSONL file of --prompts prompts spread over the five games
+(two of --themes themes each), imports it with scripts/import_prompts.py
+into a scratch schema, then imports it again to time the idempotent
+re-run (no new rows). For comparison, the first --orm-sample records are
+added one ORM object at a time the way scripts/seed_data.py does. Needs
+a real Postgres (DATABASE_URL); the scratch schema is dropped afterwards.
+
+Usage:
+    python scripts/bench_prompt_import.py [--prompts 1000000] [--batch-size 5000] [--orm-sample 10000]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "redis://localhost:6379" if name == "REDIS_URL" else "bench")
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models import Theme, Prompt
+from app.models.prompts import prompt_themes
+from import_prompts import PromptImporter, read_records, stage_row
+
+SCHEMA = "prompt_import_bench"
+
+SAMPLE_PAYLOADS = {
+    "would_you_rather": lambda i: {"option_a": f"option a {i}", "option_b": f"option b {i}"},
+    "truth_or_dare": lambda i: {"type": random.choice(["truth", "dare"]), "text": f"prompt text {i}"},
+    "sixty_seconds": lambda i: {"category": f"category {i}"},
+    "hot_seat": lambda i: {"question": f"question {i}?"},
+    "draw_guess": lambda i: {"word": f"word {i}", "difficulty": random.choice(["easy", "medium", "hard"])},
+}
+
+
+def generate(path: Path, prompts: int, themes: int):
+    games = list(SAMPLE_PAYLOADS)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(prompts):
+            game_slug = games[i % len(games)]
+            record = {
+                "game_slug": game_slug,
+                **SAMPLE_PAYLOADS[game_slug](i),
+                "themes": random.sample([f"theme {t}" for t in range(themes)], 2)
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+async def orm_import(engine, path: Path, count: int) -> float:
+    """Seed-style import: one ORM object and relationship append per prompt"""
+    start = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        theme_map = {theme.label: theme for theme in (await session.execute(select(Theme))).scalars()}
+        for record in itertools.islice(read_records(path), count):
+            game_slug, import_key, payload, difficulty, is_safe, labels = stage_row(record, None)
+            prompt = Prompt(
+                game_slug=game_slug,
+                payload=json.loads(payload),
+                difficulty=difficulty,
+                is_safe=is_safe,
+                import_key=f"orm-{import_key}"
+            )
+            for label in labels:
+                prompt.themes.append(theme_map[label])
+            session.add(prompt)
+        await session.commit()
+    return count / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=1_000_000)
+    parser.add_argument("--themes", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--orm-sample", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    tables = [Theme.__table__, Prompt.__table__, prompt_themes]
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "prompts.jsonl"
+            start = time.perf_counter()
+            generate(path, args.prompts, args.themes)
+            print(
+                f"Generated {args.prompts:,} prompts ({path.stat().st_size / 2**20:,.0f} MiB) "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+            for label in ("bulk import", "re-run (idempotent)"):
+                importer = PromptImporter(engine, args.batch_size)
+                start = time.perf_counter()
+                await importer.import_file(path)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{label:<22}{importer.records / elapsed:>12,.0f} rows/s  "
+                    f"{importer.inserted:,} new prompts"
+                )
+
+            async with engine.connect() as conn:
+                prompts = await conn.scalar(select(func.count()).select_from(Prompt.__table__))
+                links = await conn.scalar(select(func.count()).select_from(prompt_themes))
+            print(f"prompts: {prompts:,}  theme links: {links:,}")
+
+            if args.orm_sample:
+                rate = await orm_import(engine, path, args.orm_sample)
+                print(f"{'ORM (seed_data style)':<22}{rate:>12,.0f} rows/s  ({args.orm_sample:,} records)")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
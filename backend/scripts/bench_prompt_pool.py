@@ -0,0 +1,109 @@
+"""Benchmark session prompt selection: prompt pool sampling vs ORDER BY random().
+
+Usage:
+    python scripts/bench_prompt_pool.py            # in-memory pool only
+    python scripts/bench_prompt_pool.py --db       # also time the SQL query
+
+The --db mode builds temporary tables of the same sizes in the configured
+database, so it needs DATABASE_URL to point at a PostgreSQL instance.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("DATABASE_URL", "REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.services.prompt_pool import PromptPoolIndex, ALL_THEMES, ID_TYPECODE
+
+SIZES = [1_000, 100_000, 1_000_000]
+THEME_COUNT = 6
+SELECTED_THEMES = [1, 3]
+SAMPLE_SIZE = 50
+RUNS = 200
+
+
+def build_index(size: int) -> PromptPoolIndex:
+    index = PromptPoolIndex()
+    pools = {ALL_THEMES: array(ID_TYPECODE, range(1, size + 1))}
+    for theme_id in range(1, THEME_COUNT + 1):
+        pools[theme_id] = array(
+            ID_TYPECODE,
+            (i for i in range(1, size + 1) if i % THEME_COUNT == theme_id - 1)
+        )
+    index._replace_pools("would_you_rather", pools)
+    return index
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"  {label:<24} p50={p50:9.3f}ms  p99={p99:9.3f}ms")
+
+
+def bench_pool(size: int):
+    index = build_index(size)
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        index.sample("would_you_rather", SELECTED_THEMES, SAMPLE_SIZE)
+        timings.append(time.perf_counter() - start)
+    report("prompt pool sample", timings)
+
+
+async def bench_db(size: int):
+    from sqlalchemy import text
+    from app.db.base import engine
+
+    async with engine.connect() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_prompts, bench_prompt_themes"))
+        await conn.execute(text(
+            "CREATE TEMP TABLE bench_prompts AS "
+            "SELECT g AS id, true AS is_safe FROM generate_series(1, :n) g"
+        ), {"n": size})
+        await conn.execute(text(
+            "CREATE TEMP TABLE bench_prompt_themes AS "
+            "SELECT g AS prompt_id, (g % :t) + 1 AS theme_id FROM generate_series(1, :n) g"
+        ), {"n": size, "t": THEME_COUNT})
+        await conn.execute(text("ANALYZE bench_prompts"))
+        await conn.execute(text("ANALYZE bench_prompt_themes"))
+
+        query = text(
+            "SELECT p.id FROM bench_prompts p "
+            "JOIN bench_prompt_themes pt ON pt.prompt_id = p.id "
+            "WHERE p.is_safe AND pt.theme_id = ANY(:themes) "
+            "ORDER BY random() LIMIT :k"
+        )
+        timings = []
+        for _ in range(max(5, RUNS // 20)):
+            start = time.perf_counter()
+            await conn.execute(query, {"themes": SELECTED_THEMES, "k": SAMPLE_SIZE})
+            timings.append(time.perf_counter() - start)
+        report("ORDER BY random()", timings)
+
+    await engine.dispose()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", action="store_true", help="also benchmark the SQL query")
+    args = parser.parse_args()
+
+    for size in SIZES:
+        print(f"{size:,} prompts:")
+        bench_pool(size)
+        if args.db:
+            await bench_db(size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+"""Benchmark prompt loading and sampling: unified prompts table vs per-game tables.
+
+Builds a scratch schema holding both layouts with the same prompts
+(--prompts per game, two themes each) and times, for each layout:
+
+  * pool build: every safe prompt id and theme link for all five games
+    (two queries per game before, two queries in total now)
+  * session load: sample 50 ids and fetch + format them, the work done at
+    game start (old: ORM objects and the per-game formatter)
+  * mixed session: 50 prompts drawn across all five games, which the old
+    layout can only serve with one query per game
+
+Needs a real Postgres (DATABASE_URL); the scratch schema is dropped
+afterwards.
+
+Usage:
+    python scripts/bench_prompt_repository.py [--prompts 100000] [--sessions 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "redis://localhost:6379" if name == "REDIS_URL" else "bench")
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base, engine
+from app.models import (
+    Theme,
+    Prompt,
+    WouldYouRatherPrompt,
+    TruthOrDarePrompt,
+    SixtySecondsPrompt,
+    HotSeatPrompt,
+    DrawGuessPrompt
+)
+from app.models.prompts import prompt_themes
+from app.services.prompt_repository import GAME_SLUGS, prompt_repository
+
+SCHEMA = "prompt_repository_bench"
+THEMES = 20
+SAMPLE_SIZE = 50
+
+LEGACY_MODELS = {
+    "would_you_rather": WouldYouRatherPrompt,
+    "truth_or_dare": TruthOrDarePrompt,
+    "sixty_seconds": SixtySecondsPrompt,
+    "hot_seat": HotSeatPrompt,
+    "draw_guess": DrawGuessPrompt,
+}
+
+# Legacy column values and the matching unified payload, per game
+FILL = {
+    "would_you_rather": (
+        "option_a, option_b", "'a ' || i, 'b ' || i",
+        "jsonb_build_object('option_a', 'a ' || i, 'option_b', 'b ' || i)"
+    ),
+    "truth_or_dare": (
+        "prompt_type, text", "'truth', 'text ' || i",
+        "jsonb_build_object('type', 'truth', 'text', 'text ' || i)"
+    ),
+    "sixty_seconds": (
+        "category", "'category ' || i",
+        "jsonb_build_object('category', 'category ' || i)"
+    ),
+    "hot_seat": (
+        "question", "'question ' || i",
+        "jsonb_build_object('question', 'question ' || i)"
+    ),
+    "draw_guess": (
+        "word, difficulty", "'word ' || i, 'easy'",
+        "jsonb_build_object('word', 'word ' || i, 'difficulty', 'easy')"
+    ),
+}
+
+
+def legacy_format(game_slug, prompt):
+    """The per-game formatter the unified payload replaces"""
+    if game_slug == "would_you_rather":
+        return {"id": prompt.id, "option_a": prompt.option_a, "option_b": prompt.option_b}
+    elif game_slug == "truth_or_dare":
+        return {"id": prompt.id, "type": prompt.prompt_type, "text": prompt.text}
+    elif game_slug == "sixty_seconds":
+        return {"id": prompt.id, "category": prompt.category}
+    elif game_slug == "hot_seat":
+        return {"id": prompt.id, "question": prompt.question}
+    elif game_slug == "draw_guess":
+        return {"id": prompt.id, "word": prompt.word, "difficulty": prompt.difficulty}
+    return {}
+
+
+async def legacy_pools(db, game_slugs):
+    pools = {}
+    for game_slug in game_slugs:
+        model = LEGACY_MODELS[game_slug]
+        association = model.themes.property.secondary
+        result = await db.execute(select(model.id).where(model.is_safe == True))
+        pools[(game_slug, 0)] = [row[0] for row in result]
+        result = await db.execute(
+            select(association.c.theme_id, association.c.prompt_id)
+            .join(model, model.id == association.c.prompt_id)
+            .where(model.is_safe == True)
+        )
+        for theme_id, prompt_id in result:
+            pools.setdefault((game_slug, theme_id), []).append(prompt_id)
+    return pools
+
+
+async def unified_pools(db, game_slugs):
+    pools = {(game_slug, 0): [] for game_slug in game_slugs}
+    for game_slug, prompt_id in await prompt_repository.safe_ids(db, game_slugs):
+        pools[(game_slug, 0)].append(prompt_id)
+    for game_slug, theme_id, prompt_id in await prompt_repository.safe_theme_links(db, game_slugs):
+        pools.setdefault((game_slug, theme_id), []).append(prompt_id)
+    return pools
+
+
+async def legacy_load(db, pools, game_slugs):
+    per_game = {game_slug: [] for game_slug in game_slugs}
+    for _ in range(SAMPLE_SIZE):
+        game_slug = random.choice(game_slugs)
+        per_game[game_slug].append(random.choice(pools[(game_slug, 0)]))
+    formatted = []
+    for game_slug, ids in per_game.items():
+        if not ids:
+            continue
+        model = LEGACY_MODELS[game_slug]
+        result = await db.execute(select(model).where(model.id.in_(ids)))
+        formatted += [legacy_format(game_slug, prompt) for prompt in result.scalars()]
+    return formatted
+
+
+async def unified_load(db, pools, game_slugs):
+    ids = [
+        random.choice(pools[(random.choice(game_slugs), 0)])
+        for _ in range(SAMPLE_SIZE)
+    ]
+    return list((await prompt_repository.fetch(db, ids)).values())
+
+
+async def fill(conn, prompts):
+    await conn.execute(text(
+        f"INSERT INTO {SCHEMA}.themes (id, label, is_safe) "
+        "SELECT i, 'theme ' || i, true FROM generate_series(1, :themes) AS i"
+    ), {"themes": THEMES})
+    links = (
+        "SELECT i, 1 + (i % :themes) FROM generate_series(1, :prompts) AS i "
+        "UNION SELECT i, 1 + ((i * 7) % :themes) FROM generate_series(1, :prompts) AS i"
+    )
+    for offset, game_slug in enumerate(GAME_SLUGS):
+        model = LEGACY_MODELS[game_slug]
+        association = model.themes.property.secondary
+        columns, values, payload = FILL[game_slug]
+        await conn.execute(text(
+            f"INSERT INTO {SCHEMA}.{model.__tablename__} (id, {columns}, is_safe) "
+            f"SELECT i, {values}, random() < 0.9 FROM generate_series(1, :prompts) AS i"
+        ), {"prompts": prompts})
+        await conn.execute(text(
+            f"INSERT INTO {SCHEMA}.{association.name} (prompt_id, theme_id) {links}"
+        ), {"prompts": prompts, "themes": THEMES})
+
+        # Same prompts in the unified table, ids offset per game
+        base = offset * prompts
+        await conn.execute(text(
+            f"INSERT INTO {SCHEMA}.prompts (id, game_slug, payload, is_safe) "
+            f"SELECT :base + i, :slug, {payload}, random() < 0.9 FROM generate_series(1, :prompts) AS i"
+        ), {"prompts": prompts, "base": base, "slug": game_slug})
+        await conn.execute(text(
+            f"INSERT INTO {SCHEMA}.prompt_themes (prompt_id, theme_id) "
+            f"SELECT :base + l.i, l.t FROM ({links}) AS l (i, t)"
+        ), {"prompts": prompts, "themes": THEMES, "base": base})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=100_000, help="prompts per game")
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    tables = [Theme.__table__, Prompt.__table__, prompt_themes]
+    for model in LEGACY_MODELS.values():
+        tables += [model.__table__, model.themes.property.secondary]
+    scratch = engine.execution_options(schema_translate_map={None: SCHEMA})
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    async with scratch.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+        print(f"Generating {args.prompts:,} prompts per game...")
+        await fill(conn, args.prompts)
+        for table in tables:
+            await conn.execute(text(f"ANALYZE {SCHEMA}.{table.name}"))
+
+    try:
+        print(f"{'operation':<28}{'per-game':>12}{'unified':>12}")
+        async with AsyncSession(scratch) as db:
+            timings = []
+            for build in (legacy_pools, unified_pools):
+                start = time.perf_counter()
+                pools = await build(db, list(GAME_SLUGS))
+                timings.append(time.perf_counter() - start)
+            print(f"{'pool build (5 games)':<28}{timings[0] * 1000:>10.0f}ms{timings[1] * 1000:>10.0f}ms")
+
+            legacy = await legacy_pools(db, list(GAME_SLUGS))
+            for label, game_slugs in (
+                ("session load (1 game)", ["would_you_rather"]),
+                ("mixed session (5 games)", list(GAME_SLUGS)),
+            ):
+                rates = []
+                for load, source in ((legacy_load, legacy), (unified_load, pools)):
+                    start = time.perf_counter()
+                    for _ in range(args.sessions):
+                        await load(db, source, game_slugs)
+                        db.expunge_all()
+                    rates.append(args.sessions / (time.perf_counter() - start))
+                print(f"{label:<28}{rates[0]:>8,.0f}/s  {rates[1]:>8,.0f}/s")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
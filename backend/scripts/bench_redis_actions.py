@@ -0,0 +1,138 @@
+"""Microbenchmark Redis round trips and latency per game action.
+
+Runs each action against a real redis-server (REDIS_URL, default
+redis://localhost:6379) twice: once with the old one-command-per-await
+sequence and once through the pipelined / Lua-scripted handlers.
+
+Usage:
+    python scripts/bench_redis_actions.py [--iterations 2000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from redis.asyncio.connection import Connection
+
+from app.core.redis_client import redis_client
+from app.services.game_logic import game_logic_service
+
+ROOM_ID = 999_999
+round_trips = 0
+_send_packed_command = Connection.send_packed_command
+
+
+async def _counting_send(self, *args, **kwargs):
+    global round_trips
+    round_trips += 1
+    return await _send_packed_command(self, *args, **kwargs)
+
+
+Connection.send_packed_command = _counting_send
+
+
+async def vote_before(i):
+    vote_key = f"room:{ROOM_ID}:votes:1"
+    await redis_client.hset(vote_key, str(i), "a" if i % 2 else "b")
+    await redis_client.expire(vote_key, 300)
+    await redis_client.hgetall(vote_key)
+
+
+async def vote_after(i):
+    await game_logic_service.process_game_action(
+        ROOM_ID, "would_you_rather", "vote",
+        {"user_id": i, "choice": "a" if i % 2 else "b", "prompt_id": 1}
+    )
+
+
+async def timer_before(i):
+    await redis_client.hset(f"room:{ROOM_ID}", "timer_start", str(time.time()))
+    await redis_client.hset(f"room:{ROOM_ID}", "timer_duration", "60")
+
+
+async def timer_after(i):
+    await redis_client.hset_many(
+        f"room:{ROOM_ID}",
+        {"timer_start": str(time.time()), "timer_duration": "60"}
+    )
+
+
+async def drawer_before(i):
+    await redis_client.hset(f"room:{ROOM_ID}", "drawer_id", str(i))
+    await redis_client.hset(f"room:{ROOM_ID}", "current_word", "cat")
+
+
+async def drawer_after(i):
+    await game_logic_service.process_game_action(
+        ROOM_ID, "draw_guess", "set_drawer", {"drawer_id": i, "word": "cat"}
+    )
+
+
+async def guess_before(i):
+    word = await redis_client.hget(f"room:{ROOM_ID}", "current_word")
+    if word == "cat":
+        await redis_client.hset(f"room:{ROOM_ID}", "round_winner", str(i))
+
+
+async def guess_after(i):
+    await game_logic_service.process_game_action(
+        ROOM_ID, "draw_guess", "submit_guess", {"user_id": i, "guess": "cat"}
+    )
+
+
+ACTIONS = [
+    ("would_you_rather vote", vote_before, vote_after),
+    ("start_timer", timer_before, timer_after),
+    ("draw_guess set_drawer", drawer_before, drawer_after),
+    ("draw_guess submit_guess", guess_before, guess_after),
+]
+
+
+async def measure(action, iterations):
+    global round_trips
+    round_trips = 0
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await action(i)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return (
+        round_trips / iterations,
+        statistics.median(timings) * 1000,
+        timings[int(iterations * 0.99) - 1] * 1000
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    await redis_client.connect()
+    # Warm up the connection pool and script cache
+    await guess_after(0)
+
+    print(f"{'action':<26}{'':>8}{'RTT/op':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, before, after in ACTIONS:
+        for variant, action in (("before", before), ("after", after)):
+            rtt, p50, p99 = await measure(action, args.iterations)
+            print(f"{label:<26}{variant:>8}{rtt:>8.1f}{p50:>10.3f}{p99:>10.3f}")
+
+    for key in (f"room:{ROOM_ID}", f"room:{ROOM_ID}:votes:1"):
+        await redis_client.delete(key)
+    await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""Benchmark room lookups and membership checks as rooms grow.
+
+For rooms with 10, 1,000 and 10,000 participants, compares the old
+queries (selectinload of every participant, then len() or a Python scan)
+with the denormalised participant_count column, the indexed
+(room_id, user_id) lookup and the cached invite lookup. Needs the real
+Postgres and Redis from the environment (DATABASE_URL, REDIS_URL);
+the rooms are created and deleted by the script.
+
+Usage:
+    python scripts/bench_room_participants.py [--iterations 200]
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.api.endpoints import rooms
+from app.core.redis_client import redis_client
+from app.db.base import AsyncSessionLocal, Base, engine
+from app.models import Room, RoomParticipant, User
+
+ROOM_SIZES = [10, 1_000, 10_000]
+
+
+async def old_get_room(db, room, user):
+    result = await db.execute(
+        select(Room).where(Room.id == room.id).options(selectinload(Room.participants))
+    )
+    return len(result.scalar_one().participants)
+
+
+async def new_get_room(db, room, user):
+    return (await rooms.get_room(room.id, db)).participant_count
+
+
+async def old_membership(db, room, user):
+    result = await db.execute(
+        select(Room).where(Room.id == room.id).options(selectinload(Room.participants))
+    )
+    return next((p for p in result.scalar_one().participants if p.user_id == user.id), None)
+
+
+async def new_membership(db, room, user):
+    return await rooms._find_participant(db, room.id, user.id)
+
+
+async def invite_uncached(db, room, user):
+    await rooms.invite_cache.invalidate(room.invite_code)
+    return await rooms.get_room_by_invite(room.invite_code, db)
+
+
+async def invite_cached(db, room, user):
+    return await rooms.get_room_by_invite(room.invite_code, db)
+
+
+async def create_room(host, size):
+    async with AsyncSessionLocal() as db:
+        room = Room(host_id=host.id, game_slug="would_you_rather", participant_count=size)
+        db.add(room)
+        await db.flush()
+        # The host plus guests fill the room
+        rows = [{"room_id": room.id, "user_id": host.id, "is_approved": True}]
+        rows += [
+            {"room_id": room.id, "guest_name": f"guest-{i}", "is_guest": True}
+            for i in range(size - 1)
+        ]
+        await db.execute(insert(RoomParticipant), rows)
+        await db.commit()
+        return room
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    await redis_client.connect()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        host = User(email=f"bench-{secrets.token_hex(4)}@example.com", hashed_password="!")
+        db.add(host)
+        await db.commit()
+
+    created = []
+    try:
+        print(f"{'participants':>13}{'operation':>22}{'old ms':>10}{'new ms':>10}")
+        for size in ROOM_SIZES:
+            room = await create_room(host, size)
+            created.append(room)
+            for label, old, new in (
+                ("get_room", old_get_room, new_get_room),
+                ("membership check", old_membership, new_membership),
+                ("invite lookup (cache)", invite_uncached, invite_cached),
+            ):
+                timings = []
+                for run in (old, new):
+                    async with AsyncSessionLocal() as db:
+                        await run(db, room, host)
+                        start = time.perf_counter()
+                        for _ in range(args.iterations):
+                            await run(db, room, host)
+                            db.expunge_all()
+                        timings.append((time.perf_counter() - start) / args.iterations * 1000)
+                print(f"{size:>13,}{label:>22}{timings[0]:>10.2f}{timings[1]:>10.2f}")
+    finally:
+        async with AsyncSessionLocal() as db:
+            for room in created:
+                await db.execute(delete(RoomParticipant).where(RoomParticipant.room_id == room.id))
+                await db.execute(delete(Room).where(Room.id == room.id))
+                await rooms.invite_cache.invalidate(room.invite_code)
+            await db.execute(delete(User).where(User.id == host.id))
+            await db.commit()
+        await redis_client.disconnect()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""Benchmark room state snapshots and checkpointing at 5,000 active rooms.
+
+Seeds --rooms rooms in Redis (state hash, 50 queued prompts and vote
+counts each) and in a scratch Postgres schema, then measures:
+
+* reconnect: the one-call snapshot a rejoining client gets, against the
+  previous pattern of reading the room hash, prompt queue and vote counts
+  separately, with --concurrency clients reconnecting at once;
+* DB writes: --actions-per-second state updates over random rooms for
+  --duration seconds, checkpointed every ROOM_CHECKPOINT_INTERVAL_SECONDS,
+  against one UPDATE per action as the same stream would need without it.
+
+Needs a real redis-server and Postgres (REDIS_URL, DATABASE_URL); use a
+Redis database no app worker is using, e.g. redis://localhost:6379/15.
+
+Usage:
+    python scripts/bench_room_state.py [--rooms 5000] [--actions-per-second 2000] [--duration 15]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+from sqlalchemy import insert, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.db.base import Base
+from app.models import GameSession, Room, User
+from app.services.room_state import DIRTY_KEY, RoomCheckpointer, RoomStateStore
+
+SCHEMA = "room_state_bench"
+ROOM_OFFSET = 900_000
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def summary(timings) -> str:
+    timings = sorted(timings)
+    return (
+        f"p50={statistics.median(timings) * 1000:.2f}ms "
+        f"p99={percentile(timings, 0.99) * 1000:.2f}ms"
+    )
+
+
+async def seed(engine, room_ids):
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        tables = [User.__table__, Room.__table__, GameSession.__table__]
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+        host_id = (await conn.execute(
+            insert(User).values(email="bench@example.com", hashed_password="x").returning(User.id)
+        )).scalar_one()
+        await conn.execute(insert(Room), [
+            {"id": room_id, "host_id": host_id, "game_slug": "would_you_rather", "invite_code": str(room_id)}
+            for room_id in room_ids
+        ])
+        await conn.execute(insert(GameSession), [
+            {"room_id": room_id, "game_state": {}, "used_prompt_ids": []} for room_id in room_ids
+        ])
+
+    for start in range(0, len(room_ids), 500):
+        async with redis_client.pipeline() as pipe:
+            for room_id in room_ids[start:start + 500]:
+                pipe.hset(f"room:{room_id}", mapping={
+                    "status": "active",
+                    "game_slug": "would_you_rather",
+                    "current_round": "3",
+                    "current_prompt_id": "42",
+                    "state_version": "1"
+                })
+                pipe.rpush(f"room:{room_id}:prompts", *range(50))
+                pipe.hset(f"room:{room_id}:vote_counts:42", mapping={"a": 3, "b": 2})
+
+
+async def multi_read(room_id):
+    """Reconnect before snapshots: one read per key"""
+    state = await redis_client.hgetall(f"room:{room_id}")
+    queue = await redis_client.lrange(f"room:{room_id}:prompts", 0, -1)
+    votes = await redis_client.hgetall(f"room:{room_id}:vote_counts:{state.get('current_prompt_id')}")
+    return state, queue, votes
+
+
+async def reconnects(read, room_ids, concurrency):
+    timings = []
+
+    async def one(room_id):
+        start = time.perf_counter()
+        await read(room_id)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(room_ids), concurrency):
+        await asyncio.gather(*(one(room_id) for room_id in room_ids[i:i + concurrency]))
+    return timings, time.perf_counter() - start
+
+
+async def action_stream(store, room_ids, rate, duration):
+    """Random state updates at ``rate`` per second; returns the count"""
+    actions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        tick = time.perf_counter()
+        batch = [random.choice(room_ids) for _ in range(rate // 10)]
+        await asyncio.gather(*(
+            store.update(room_id, {"current_player": random.randint(1, 8)}) for room_id in batch
+        ))
+        actions += len(batch)
+        await asyncio.sleep(max(0.1 - (time.perf_counter() - tick), 0))
+    return actions
+
+
+async def per_action_writes(session_factory, room_ids, actions):
+    """The same stream written through as one UPDATE per action"""
+    sessions = GameSession.__table__
+    start = time.perf_counter()
+    async with session_factory() as db:
+        for i in range(actions):
+            await db.execute(
+                update(sessions)
+                .where(sessions.c.room_id == random.choice(room_ids))
+                .values(game_state={"current_player": i})
+            )
+            await db.commit()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--actions-per-second", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    room_ids = list(range(ROOM_OFFSET, ROOM_OFFSET + args.rooms))
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    store = RoomStateStore(session_factory)
+
+    await redis_client.connect()
+    try:
+        await seed(engine, room_ids)
+        print(f"seeded {args.rooms:,} rooms")
+
+        shuffled = random.sample(room_ids, len(room_ids))
+        for label, read in (("multi-read", multi_read), ("snapshot", store.snapshot)):
+            timings, elapsed = await reconnects(read, shuffled, args.concurrency)
+            print(f"reconnect {label:<11} {summary(timings)}  ({len(timings) / elapsed:,.0f}/s)")
+
+        await redis_client.delete(DIRTY_KEY)
+        checkpointer = RoomCheckpointer(
+            store, settings.ROOM_CHECKPOINT_INTERVAL_SECONDS, settings.ROOM_CHECKPOINT_BATCH_SIZE
+        )
+        statements = 0
+        write_batch = checkpointer._write_batch
+
+        async def counted_write_batch(batch):
+            nonlocal statements
+            statements += 1
+            return await write_batch(batch)
+
+        checkpointer._write_batch = counted_write_batch
+        checkpointer.start()
+        actions = await action_stream(store, room_ids, args.actions_per_second, args.duration)
+        # stop() writes out whatever is still dirty
+        await checkpointer.stop()
+        async with engine.connect() as conn:
+            rows = await conn.scalar(text(f"SELECT count(*) FROM {SCHEMA}.sessions WHERE checkpoint IS NOT NULL"))
+        print(
+            f"checkpointer: {actions:,} actions in {args.duration:.0f}s -> "
+            f"{statements / args.duration:.1f} UPDATE statements/s, {rows:,} rooms checkpointed"
+        )
+
+        sample = min(actions, 5000)
+        elapsed = await per_action_writes(session_factory, room_ids, sample)
+        print(
+            f"per-action:   {actions / args.duration:,.0f} UPDATE statements/s needed; "
+            f"one connection sustains {sample / elapsed:,.0f}/s"
+        )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+        async with redis_client.pipeline() as pipe:
+            for room_id in room_ids:
+                pipe.delete(f"room:{room_id}", f"room:{room_id}:prompts", f"room:{room_id}:vote_counts:42")
+        await redis_client.delete(DIRTY_KEY)
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Benchmark the room timer scheduler: 10,000 concurrent timers and firing jitter.
+
+Schedules --timers room timers with deadlines spread over --spread seconds
+(0 = all at the same instant) starting --delay seconds from now, runs the
+scheduler as leader until every timer has fired, and reports how late the
+expiry handlers started relative to their deadlines. Half the timers are
+scheduled as if from another worker (straight into the Redis sorted set),
+so they reach the leader through its sweep. Needs a real redis-server
+(REDIS_URL, default redis://localhost:6379); use a database no app worker
+is using, e.g. redis://localhost:6379/15, since the timer keys are shared.
+
+Usage:
+    python scripts/bench_room_timers.py [--timers 10000] [--spread 2.0] [--delay 1.0]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.websocket.timers import LEADER_KEY, TIMERS_KEY, TimerScheduler
+
+ROOM_OFFSET = 900_000
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=10_000)
+    parser.add_argument("--spread", type=float, default=2.0)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    await redis_client.connect()
+    await redis_client.delete(TIMERS_KEY)
+    await redis_client.delete(LEADER_KEY)
+
+    lateness = []
+    done = asyncio.Event()
+
+    async def on_expire(room_id, deadline):
+        lateness.append(time.time() - deadline)
+        if len(lateness) == args.timers:
+            done.set()
+
+    scheduler = TimerScheduler(
+        on_expire,
+        settings.TIMER_SWEEP_MS / 1000,
+        settings.TIMER_LEADER_LEASE_SECONDS
+    )
+    scheduler.start()
+    while not scheduler.is_leader:
+        await asyncio.sleep(0.01)
+
+    base = time.time() + args.delay
+    start = time.perf_counter()
+    remote = {}
+    for i in range(args.timers):
+        deadline = base + random.uniform(0, args.spread)
+        if i % 2:
+            remote[str(ROOM_OFFSET + i)] = deadline
+        else:
+            await scheduler.schedule(ROOM_OFFSET + i, deadline)
+    await redis_client.redis.zadd(TIMERS_KEY, remote)
+    elapsed = time.perf_counter() - start
+    print(f"scheduled {args.timers:,} timers in {elapsed * 1000:.0f} ms")
+
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.delay + args.spread + 30)
+    except asyncio.TimeoutError:
+        print(f"only {len(lateness):,} of {args.timers:,} timers fired")
+    finally:
+        await scheduler.stop()
+        await redis_client.delete(TIMERS_KEY)
+        await redis_client.disconnect()
+
+    if lateness:
+        lateness.sort()
+        print(
+            f"fired {len(lateness):,}  lateness p50={statistics.median(lateness) * 1000:.1f}ms "
+            f"p99={percentile(lateness, 0.99) * 1000:.1f}ms max={lateness[-1] * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Benchmark prompt sampling when a host has seen most of the pool.
+
+Builds an in-memory pool of --pool prompt ids, marks --seen of them as
+seen by a host (Redis bitmaps, as SeenPrompts stores them), then times
+loading the host's bitmaps and sampling a 50-prompt session that skips
+them, against sampling with no exclusion and against excluding a Python
+set built from a stored id list (the used_prompt_ids approach). Needs a
+real redis-server (REDIS_URL, default redis://localhost:6379).
+
+Usage:
+    python scripts/bench_seen_prompts.py [--pool 100000] [--seen 0.9] [--runs 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core.redis_client import redis_client
+from app.services.game_logic import SESSION_PROMPT_COUNT
+from app.services.prompt_pool import ALL_THEMES, ID_TYPECODE, PromptPoolIndex
+from app.services.seen_prompts import seen_prompts
+
+GAME_SLUG = "would_you_rather"
+HOST_ID = "bench"
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def summary(timings) -> str:
+    timings = sorted(timings)
+    return (
+        f"p50={statistics.median(timings) * 1000:.3f}ms "
+        f"p99={percentile(timings, 0.99) * 1000:.3f}ms"
+    )
+
+
+async def timed(runs, fn):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            result = await result
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool", type=int, default=100_000)
+    parser.add_argument("--seen", type=float, default=0.9, help="fraction of the pool already seen")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    index = PromptPoolIndex()
+    index._replace_pools(GAME_SLUG, {ALL_THEMES: array(ID_TYPECODE, range(1, args.pool + 1))})
+    seen_ids = random.sample(range(1, args.pool + 1), int(args.pool * args.seen))
+
+    await redis_client.connect()
+    try:
+        await seen_prompts.forget(host_id=HOST_ID)
+        for start in range(0, len(seen_ids), 10_000):
+            await seen_prompts.mark(seen_ids[start:start + 10_000], host_id=HOST_ID)
+        bitmap_bytes = await redis_client.redis.strlen(seen_prompts._keys("host", HOST_ID)[-1])
+        print(
+            f"pool {args.pool:,}, seen {len(seen_ids):,} ({args.seen:.0%}); "
+            f"bitmap {bitmap_bytes / 1024:.1f} KiB vs {len(json.dumps(seen_ids)) / 1024:.0f} KiB as a JSON list"
+        )
+
+        timings, seen = await timed(args.runs, lambda: seen_prompts.load(host_id=HOST_ID))
+        print(f"load seen bitmaps      {summary(timings)}")
+
+        sample = lambda exclude: index.sample(GAME_SLUG, [], SESSION_PROMPT_COUNT, exclude=exclude)
+        timings, _ = await timed(args.runs, lambda: sample(None))
+        print(f"sample, no exclusion   {summary(timings)}")
+
+        timings, chosen = await timed(args.runs, lambda: sample(seen))
+        repeats = sum(prompt_id in seen for prompt_id in chosen)
+        print(f"sample, bitmap exclude {summary(timings)}  repeats={repeats}")
+
+        stored = json.dumps(seen_ids)
+        timings, _ = await timed(args.runs, lambda: sample(set(json.loads(stored))))
+        print(f"sample, id list + set  {summary(timings)}")
+    finally:
+        await seen_prompts.forget(host_id=HOST_ID)
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
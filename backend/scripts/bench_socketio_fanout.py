@@ -0,0 +1,173 @@
+"""Benchmark Socket.IO broadcast fan-out across N local workers.
+
+Starts N uvicorn workers in multi-node mode (Redis pub/sub manager), puts a
+round-robin TCP load balancer in front of them, connects clients to one
+room through the balancer (so they land on different workers) and has one
+client fire game actions. Reports broadcast delivery latency and delivered
+messages/second for each worker count.
+
+Needs the normal backend environment (DATABASE_URL, REDIS_URL, SECRET_KEY,
+...) plus the Socket.IO client extras: pip install "python-socketio[asyncio_client]"
+
+Usage:
+    python scripts/bench_socketio_fanout.py [--workers 1 2 4] [--clients 100] [--messages 200]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Add parent directory to path
+sys.path.append(str(BACKEND_DIR))
+
+import socketio
+
+from app.core.redis_client import redis_client
+from app.core.security import create_access_token
+
+BASE_PORT = 8200
+BALANCER_PORT = 8199
+ROOM_ID = 999_997
+
+
+async def run_balancer(ports):
+    """Round-robin each incoming TCP connection to the next worker"""
+    targets = itertools.cycle(ports)
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", next(targets))
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer),
+            pipe(upstream_reader, client_writer)
+        )
+
+    return await asyncio.start_server(handle, "127.0.0.1", BALANCER_PORT)
+
+
+def start_workers(count):
+    env = dict(os.environ, SOCKETIO_MULTI_NODE="true", SOCKETIO_STICKY_SESSIONS="false")
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "run:combined_app",
+             "--port", str(BASE_PORT + i), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL
+        )
+        for i in range(count)
+    ]
+
+
+async def wait_for_workers(count):
+    import httpx
+    async with httpx.AsyncClient() as client:
+        for i in range(count):
+            for _ in range(100):
+                try:
+                    await client.get(f"http://127.0.0.1:{BASE_PORT + i}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.2)
+
+
+async def run_round(workers, clients, messages):
+    processes = start_workers(workers)
+    balancer = await run_balancer([BASE_PORT + i for i in range(workers)])
+    try:
+        await wait_for_workers(workers)
+
+        latencies = []
+        received = 0
+        done = asyncio.Event()
+        expected = clients * messages
+
+        def on_update(update):
+            nonlocal received
+            latencies.append(time.time() - update["data"]["sent_at"])
+            received += 1
+            if received >= expected:
+                done.set()
+
+        sockets = []
+        for i in range(clients):
+            client = socketio.AsyncClient()
+            client.on("game_update", on_update)
+            await client.connect(
+                f"http://127.0.0.1:{BALANCER_PORT}",
+                transports=["websocket"],
+                auth={"token": create_access_token({"sub": str(i + 1)})}
+            )
+            await client.call("join_room", {"room_id": ROOM_ID})
+            sockets.append(client)
+
+        start = time.perf_counter()
+        for _ in range(messages):
+            await sockets[0].emit("game_action", {"type": "bench", "data": {"sent_at": time.time()}})
+        try:
+            await asyncio.wait_for(done.wait(), timeout=60)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - start
+
+        for client in sockets:
+            await client.disconnect()
+
+        latencies.sort()
+        return {
+            "delivered": received,
+            "expected": expected,
+            "msgs_per_sec": received / elapsed,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+            "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        }
+    finally:
+        balancer.close()
+        await balancer.wait_closed()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    # join_room only accepts rooms that exist in Redis
+    await redis_client.connect()
+    await redis_client.hset(f"room:{ROOM_ID}", "status", "waiting")
+
+    print(f"{'workers':>8}{'delivered':>12}{'msgs/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for workers in args.workers:
+        result = await run_round(workers, args.clients, args.messages)
+        print(
+            f"{workers:>8}{result['delivered']:>6}/{result['expected']:<5}"
+            f"{result['msgs_per_sec']:>12,.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+        )
+
+    await redis_client.delete(f"room:{ROOM_ID}")
+    await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
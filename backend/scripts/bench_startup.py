@@ -0,0 +1,129 @@
+"""Benchmark worker startup: import time and time to first request.
+
+Import time is measured in fresh interpreters (``import run``, i.e. the
+FastAPI app plus Socket.IO), and the slowest imports are listed from
+``python -X importtime``. Time to first request starts uvicorn with the
+given number of workers, once with FAST_BOOT=false (create_all on every
+worker) and once with FAST_BOOT=true (alembic revision check), and polls
+/health until it answers. The server runs need the real Postgres and
+Redis from the environment, and FAST_BOOT=true needs a migrated
+database; pass --imports-only to skip them.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--workers 4] [--imports-only] [--max-import-seconds 2.0]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+ENV = dict(os.environ)
+ENV.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/gamesnight")
+ENV.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    ENV.setdefault(name, "bench")
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import run; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=ENV, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int):
+    """(cumulative seconds, module) of the slowest packages and app modules"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run"],
+        cwd=BACKEND_DIR, env=ENV, capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if "." not in name or name.startswith("app."):
+            modules.append((int(cumulative) / 1e6, name))
+    return sorted(modules, reverse=True)[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_seconds(fast_boot: bool, workers: int, timeout: float = 60) -> float:
+    port = free_port()
+    env = dict(ENV, FAST_BOOT="true" if fast_boot else "false")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "run:combined_app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--imports-only", action="store_true")
+    parser.add_argument(
+        "--max-import-seconds", type=float,
+        help="exit with status 1 if the median import time exceeds this"
+    )
+    args = parser.parse_args()
+
+    timings = [import_seconds() for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"import time: median {median * 1000:.0f} ms, min {min(timings) * 1000:.0f} ms")
+    for seconds, name in slowest_imports(args.top):
+        print(f"  {seconds * 1000:7.0f} ms  {name}")
+
+    if not args.imports_only:
+        for fast_boot in (False, True):
+            timings = [first_request_seconds(fast_boot, args.workers) for _ in range(args.runs)]
+            print(
+                f"first request, FAST_BOOT={str(fast_boot).lower():<5} workers={args.workers}: "
+                f"median {statistics.median(timings) * 1000:.0f} ms"
+            )
+
+    if args.max_import_seconds is not None and median > args.max_import_seconds:
+        print(f"FAIL: import time above {args.max_import_seconds:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
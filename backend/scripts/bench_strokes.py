@@ -0,0 +1,101 @@
+"""Benchmark server-side Draw & Guess stroke throughput per room.
+
+Compares the legacy path (one JSON event per stroke, fanned out to every
+viewer) with the binary path (validate, batch into one frame per tick,
+fan out the frame). Fan-out is simulated by encoding the Socket.IO packet
+once per emit and queueing it for each viewer, which is what the server
+does per connected socket; network I/O is not included.
+
+Usage:
+    python scripts/bench_strokes.py [--strokes 20000] [--tick-hz 30]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("DATABASE_URL", "REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from socketio import packet
+
+from app.websocket.strokes import decode_stroke, encode_frame, encode_stroke
+
+VIEWER_COUNTS = [8, 50]
+POINTS_PER_STROKE = 16
+STROKE_RATE_HZ = 120  # One drawer sampling pointer moves at 120 Hz
+
+
+def make_points():
+    x, y = random.random(), random.random()
+    points = []
+    for _ in range(POINTS_PER_STROKE):
+        x = min(max(x + random.uniform(-0.01, 0.01), 0), 1)
+        y = min(max(y + random.uniform(-0.01, 0.01), 0), 1)
+        points.append((x, y))
+    return points
+
+
+def fan_out(event, payload, viewers):
+    encoded = packet.Packet(packet.EVENT, data=[event, payload], namespace="/").encode()
+    queues = [[] for _ in range(viewers)]
+    for queue in queues:
+        queue.append(encoded)
+    return encoded
+
+
+def bench_legacy(strokes, viewers):
+    start = time.perf_counter()
+    wire_bytes = 0
+    for points in strokes:
+        payload = {"stroke": {"points": points, "width": 4, "color": "#000000"}, "user_id": "1"}
+        encoded = fan_out("stroke_update", payload, viewers)
+        wire_bytes += len(encoded if isinstance(encoded, str) else encoded[0]) * viewers
+    return time.perf_counter() - start, wire_bytes
+
+
+def bench_binary(strokes, viewers, tick_hz):
+    encoded_strokes = [encode_stroke(points) for points in strokes]
+    per_tick = max(1, int(STROKE_RATE_HZ / tick_hz))
+
+    start = time.perf_counter()
+    wire_bytes = 0
+    batch = []
+    for stroke in encoded_strokes:
+        decode_stroke(stroke)
+        batch.append((1, stroke))
+        if len(batch) >= per_tick:
+            frame = encode_frame(batch)
+            fan_out("stroke_frame", frame, viewers)
+            wire_bytes += len(frame) * viewers
+            batch = []
+    return time.perf_counter() - start, wire_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strokes", type=int, default=20000)
+    parser.add_argument("--tick-hz", type=float, default=30.0)
+    args = parser.parse_args()
+
+    strokes = [make_points() for _ in range(args.strokes)]
+    print(f"{'viewers':>8}{'path':>8}{'strokes/s':>14}{'bytes/stroke/viewer':>22}")
+    for viewers in VIEWER_COUNTS:
+        for label, run in (
+            ("json", lambda: bench_legacy(strokes, viewers)),
+            ("binary", lambda: bench_binary(strokes, viewers, args.tick_hz)),
+        ):
+            elapsed, wire_bytes = run()
+            print(
+                f"{viewers:>8}{label:>8}{args.strokes / elapsed:>14,.0f}"
+                f"{wire_bytes / args.strokes / viewers:>22.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Load test Would You Rather voting with many simulated voters on one prompt.
+
+Every voter casts a vote and a share of them change their mind, all
+concurrently against a real redis-server (REDIS_URL, default
+redis://localhost:6379). Final tallies are checked against the expected
+counts, and vote_counts broadcasts are counted through the coalescer.
+
+Usage:
+    python scripts/bench_votes.py [--voters 5000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.game_logic import game_logic_service
+from app.websocket.coalescer import BroadcastCoalescer
+
+ROOM_ID = 999_998
+PROMPT_ID = 1
+CHANGE_RATIO = 0.2
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voters", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    await redis_client.connect()
+    for key in (f"room:{ROOM_ID}:votes:{PROMPT_ID}", f"room:{ROOM_ID}:vote_counts:{PROMPT_ID}"):
+        await redis_client.delete(key)
+
+    broadcasts = 0
+
+    async def count_broadcast(room_id, payload):
+        nonlocal broadcasts
+        broadcasts += 1
+
+    coalescer = BroadcastCoalescer(count_broadcast, settings.VOTE_BROADCAST_MAX_HZ)
+
+    # Each voter's sequence of choices; the last one is what should count
+    plans = {}
+    for user_id in range(1, args.voters + 1):
+        first = random.choice("ab")
+        plans[user_id] = [first, "b" if first == "a" else "a"] if random.random() < CHANGE_RATIO else [first]
+    expected = {"a": 0, "b": 0}
+    for choices in plans.values():
+        expected[choices[-1]] += 1
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def voter(user_id):
+        for choice in plans[user_id]:
+            async with semaphore:
+                start = time.perf_counter()
+                result = await game_logic_service.process_game_action(
+                    ROOM_ID, "would_you_rather", "vote",
+                    {"user_id": user_id, "choice": choice, "prompt_id": PROMPT_ID}
+                )
+                latencies.append(time.perf_counter() - start)
+            await coalescer.publish(ROOM_ID, result["vote_counts"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(voter(user_id) for user_id in plans))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(coalescer.interval)
+
+    result = await game_logic_service.process_game_action(
+        ROOM_ID, "would_you_rather", "vote",
+        {"user_id": 1, "choice": plans[1][-1], "prompt_id": PROMPT_ID}
+    )
+    latencies.sort()
+    print(f"voters: {args.voters}, votes cast: {len(latencies)}, elapsed: {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} votes/s")
+    print(f"latency p50={statistics.median(latencies) * 1000:.3f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.3f}ms")
+    print(f"broadcasts: {broadcasts} (max {settings.VOTE_BROADCAST_MAX_HZ}/s)")
+    print(f"final counts: {result['vote_counts']}, expected: {expected}")
+    if result["vote_counts"] != expected:
+        print("MISMATCH")
+        sys.exit(1)
+
+    for key in (f"room:{ROOM_ID}:votes:{PROMPT_ID}", f"room:{ROOM_ID}:vote_counts:{PROMPT_ID}"):
+        await redis_client.delete(key)
+    await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
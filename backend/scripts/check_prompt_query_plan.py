@@ -0,0 +1,118 @@
+"""Check that theme-filtered prompt selection uses the association indexes.
+
+Builds a scratch schema with the unified prompt tables and indexes (as
+defined on the models), fills it with 1,000,000 prompts spread over the
+five games and linked to two themes each, runs ANALYZE and EXPLAINs the prompt
+selection query for one theme. Fails (exit code 1) if the plan scans the
+association table sequentially or never touches its reverse
+(theme_id, prompt_id) index. Needs a real Postgres (DATABASE_URL); the
+scratch schema is dropped afterwards.
+
+Usage:
+    python scripts/check_prompt_query_plan.py [--prompts 1000000] [--themes 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+for name in ("REDIS_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "redis://localhost:6379" if name == "REDIS_URL" else "bench")
+
+from sqlalchemy import select, text
+
+from app.db.base import Base, engine
+from app.models import Theme, Prompt
+from app.models.prompts import prompt_themes
+from app.services.prompt_repository import GAME_SLUGS
+
+SCHEMA = "prompt_plan_check"
+
+
+def selection_query(theme_ids):
+    """Safe prompt ids for the given themes, as selected for a session"""
+    return (
+        select(Prompt.id)
+        .join(prompt_themes, prompt_themes.c.prompt_id == Prompt.id)
+        .where(prompt_themes.c.theme_id.in_(theme_ids))
+        .where(Prompt.game_slug == "would_you_rather")
+        .where(Prompt.is_safe == True)
+    )
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=1_000_000)
+    parser.add_argument("--themes", type=int, default=200)
+    args = parser.parse_args()
+
+    association = prompt_themes
+    tables = [Theme.__table__, Prompt.__table__, association]
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+
+        print(f"Generating {args.prompts:,} prompts...")
+        await conn.execute(text(
+            "INSERT INTO themes (id, label, is_safe) "
+            "SELECT i, 'theme ' || i, true FROM generate_series(1, :themes) AS i"
+        ), {"themes": args.themes})
+        await conn.execute(text(
+            "INSERT INTO prompts (id, game_slug, payload, is_safe) "
+            "SELECT i, (CAST(:slugs AS text[]))[1 + i % 5], jsonb_build_object('text', 'prompt ' || i), random() < 0.9 "
+            "FROM generate_series(1, :prompts) AS i"
+        ), {"prompts": args.prompts, "slugs": list(GAME_SLUGS)})
+        await conn.execute(text(
+            "INSERT INTO prompt_themes (prompt_id, theme_id) "
+            "SELECT i, 1 + (i % :themes) FROM generate_series(1, :prompts) AS i "
+            "UNION SELECT i, 1 + ((i * 7) % :themes) FROM generate_series(1, :prompts) AS i"
+        ), {"prompts": args.prompts, "themes": args.themes})
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+            for table in tables:
+                await conn.execute(text(f"ANALYZE {table.name}"))
+
+            query = selection_query([3]).compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = list(plan_nodes(plan[0]["Plan"]))
+
+        for node in nodes:
+            print(f"  {node['Node Type']:<20} {node.get('Relation Name', '')} {node.get('Index Name', '')}")
+
+        failures = []
+        if any(n["Node Type"] == "Seq Scan" and n.get("Relation Name") == association.name for n in nodes):
+            failures.append(f"sequential scan on {association.name}")
+        if not any(n.get("Index Name") == f"ix_{association.name}_theme_prompt" for n in nodes):
+            failures.append(f"ix_{association.name}_theme_prompt not used")
+
+        if failures:
+            print("FAIL: " + "; ".join(failures))
+            sys.exit(1)
+        print("OK: prompt selection uses the association indexes")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""Check that Redis memory returns to baseline after many room lifecycles.
+
+Runs --cycles create/start/play/end cycles against Redis: each room gets
+its state hash and prompt queue, serves a few prompts, takes votes,
+answers, a Truth or Dare result, a Hot Seat question, a Draw & Guess
+round with strokes, broadcasts and journal entries, and is then ended
+with end_room, the teardown end_game runs. Needs Redis (REDIS_URL; use a
+database no app worker is using) and a Postgres with the schema created
+(DATABASE_URL) for the final checkpoint; the test rooms have no session
+rows, so nothing is written there. Fails (exit status 1) if any key of a
+test room is left, any room is still held in this process's broadcast
+buffers, or used_memory ends more than --tolerance-kib above the baseline.
+
+Usage:
+    python scripts/check_room_memory.py [--cycles 10000] [--concurrency 50] [--tolerance-kib 512]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core import redis_keys
+from app.core.redis_client import redis_client
+from app.db.base import engine
+from app.services.game_logic import game_logic_service
+from app.services.prompt_cache import prompt_cache
+from app.services.room_cleanup import end_room
+from app.services.room_state import room_state_store
+from app.services.seen_prompts import seen_prompts
+from app.websocket.canvas import canvas_store
+from app.websocket.journal import action_journal
+from app.websocket.socketio_app import outbound_scheduler, stroke_batcher, vote_broadcaster
+from app.websocket.strokes import encode_frame, encode_quantised
+
+ROOM_OFFSET = 900_000
+PROMPT_IDS = list(range(1, 51))
+STROKE = encode_quantised([(0, 0), (10, 10), (20, 5)], 2, 0, 0)
+STROKE_FRAME = encode_frame([(1, STROKE)])
+
+
+async def used_memory() -> int:
+    # Let lazy frees (UNLINK, expired keys) settle before measuring
+    await asyncio.sleep(0.5)
+    return (await redis_client.redis.info("memory"))["used_memory"]
+
+
+async def play(room_id: int):
+    # create_room, then start_game
+    await room_state_store.update(room_id, {"status": "waiting"}, create=True)
+    await room_state_store.update(
+        room_id, {"status": "active", "game_slug": "would_you_rather", "current_round": 0}
+    )
+    async with redis_client.pipeline() as pipe:
+        pipe.rpush(redis_keys.room_prompts(room_id), *PROMPT_IDS)
+        pipe.expire(redis_keys.room_prompts(room_id), redis_keys.ROOM_TTL_SECONDS)
+
+    # A few rounds of each game
+    for user_id in range(1, 4):
+        prompt = await game_logic_service.get_next_prompt(None, room_id, "would_you_rather")
+        await game_logic_service.process_game_action(
+            room_id, "would_you_rather", "vote",
+            {"user_id": user_id, "choice": "a", "prompt_id": prompt["id"]}
+        )
+        await game_logic_service.process_game_action(
+            room_id, "sixty_seconds", "submit_answers",
+            {"user_id": user_id, "prompt_id": prompt["id"], "answers": ["one", "two"]}
+        )
+    await game_logic_service.process_game_action(
+        room_id, "truth_or_dare", "complete", {"user_id": 1, "prompt_id": 1, "result": "completed"}
+    )
+    await game_logic_service.process_game_action(
+        room_id, "hot_seat", "submit_question", {"user_id": 2, "question": "Why?"}
+    )
+    await game_logic_service.process_game_action(
+        room_id, "draw_guess", "set_drawer", {"drawer_id": 1, "word": "cat"}
+    )
+    await canvas_store.append(room_id, STROKE_FRAME)
+    await game_logic_service.process_game_action(
+        room_id, "draw_guess", "submit_guess", {"user_id": 2, "guess": "cat"}
+    )
+    action_journal.append(room_id, '{"action":"submit_guess"}')
+    await action_journal.flush()
+
+    # Broadcasts still buffered when the game ends
+    await vote_broadcaster.publish(room_id, {"a": 1})
+    await vote_broadcaster.publish(room_id, {"a": 2})
+    await outbound_scheduler.publish(room_id, '{"type":"answer"}')
+    await outbound_scheduler.publish(room_id, '{"type":"typing"}', ("typing", "1"))
+    stroke_batcher.add(room_id, "check-sid", 1, STROKE)
+    action_journal.append(room_id, '{"action":"typing"}')
+
+    # end_game
+    await end_room(room_id, await seen_prompts.room_ids(room_id))
+
+
+def buffered_rooms() -> int:
+    """Test rooms still held by this process's broadcast buffers"""
+    held = (
+        set(outbound_scheduler._rooms)
+        | set(vote_broadcaster._last_sent) | set(vote_broadcaster._pending)
+        | set(stroke_batcher._pending) | set(stroke_batcher._flushes)
+        | {room_id for room_id, _ in action_journal._buffer}
+    )
+    return sum(1 for room_id in held if int(room_id) >= ROOM_OFFSET)
+
+
+async def leftover_keys() -> int:
+    count = 0
+    async for key in redis_client.redis.scan_iter(match=f"{redis_keys.ROOM_PREFIX}*", count=1000):
+        parsed = redis_keys.parse_room_key(key)
+        if parsed and int(parsed[0]) >= ROOM_OFFSET:
+            count += 1
+    async for key in redis_client.redis.scan_iter(match="seen_prompts:room:*", count=1000):
+        if int(key.split(":")[2]) >= ROOM_OFFSET:
+            count += 1
+    return count
+
+
+async def run_cycles(first: int, count: int, concurrency: int):
+    for start in range(first, first + count, concurrency):
+        await asyncio.gather(*(
+            play(ROOM_OFFSET + i) for i in range(start, min(start + concurrency, first + count))
+        ))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tolerance-kib", type=int, default=512)
+    args = parser.parse_args()
+
+    for prompt_id in PROMPT_IDS:
+        prompt_cache.put("would_you_rather", prompt_id, {"id": prompt_id, "option_a": "a", "option_b": "b"})
+
+    await redis_client.connect()
+    try:
+        # Warm up script caches, connection pools and allocator arenas
+        await run_cycles(0, args.concurrency * 2, args.concurrency)
+        baseline = await used_memory()
+
+        await run_cycles(args.concurrency * 2, args.cycles, args.concurrency)
+        final = await used_memory()
+        leftovers = await leftover_keys()
+        buffered = buffered_rooms()
+    finally:
+        await redis_client.disconnect()
+        await engine.dispose()
+
+    growth = final - baseline
+    print(
+        f"{args.cycles:,} cycles: used_memory {baseline / 1024:,.0f} KiB -> {final / 1024:,.0f} KiB "
+        f"({growth / 1024:+,.0f} KiB), {leftovers} room keys left, {buffered} rooms still buffered"
+    )
+    if leftovers or buffered or growth > args.tolerance_kib * 1024:
+        print("FAIL: ended rooms are not being cleaned up")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
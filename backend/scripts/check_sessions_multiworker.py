@@ -0,0 +1,136 @@
+"""Check that Socket.IO sessions are shared between worker processes.
+
+Starts two worker processes against the same Redis. Each creates
+--sessions sessions in one room, waits for the other, then looks up every
+session of the other worker with get() and checks room_sids() lists the
+sockets of both. Worker "b" then removes its sessions the way disconnect
+does; worker "a" exits without removing its own, like a crashed worker.
+Finally this process, which serves none of them, removes a's sessions and
+checks the room's sid set is left empty. Needs a real redis-server
+(REDIS_URL); use a database no app worker is using. Fails (exit status 1)
+on any mismatch.
+
+Usage:
+    python scripts/check_sessions_multiworker.py [--sessions 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("DATABASE_URL", "SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "postgresql+asyncpg://localhost/gamesnight" if name == "DATABASE_URL" else "bench")
+
+from app.core import redis_keys
+from app.core.redis_client import redis_client
+from app.websocket.sessions import session_store
+
+ROOM_ID = 999_996
+READY_KEY = "check_sessions:ready"
+WORKERS = ("a", "b")
+
+
+def sids(worker: str, count: int):
+    return [f"check-{worker}-{i}" for i in range(count)]
+
+
+def user_id(sid: str) -> str:
+    return str(9_000_000 + int(sid.rsplit("-", 1)[1]))
+
+
+async def wait_for_workers(timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while int(await redis_client.get(READY_KEY) or 0) < len(WORKERS):
+        if time.monotonic() > deadline:
+            raise TimeoutError("the other worker never got ready")
+        await asyncio.sleep(0.05)
+
+
+async def run_worker(name: str, count: int) -> int:
+    """One worker process: create sessions, then check the other worker's"""
+    other = WORKERS[1 - WORKERS.index(name)]
+    errors = 0
+    await redis_client.connect()
+    try:
+        for sid in sids(name, count):
+            await session_store.create(sid, user_id=user_id(sid))
+            await session_store.set_room(sid, ROOM_ID)
+        await redis_client.incr(READY_KEY)
+        await wait_for_workers()
+
+        for sid in sids(other, count):
+            session = await session_store.get(sid)
+            if session is None or session.user_id != user_id(sid) or session.room_id != str(ROOM_ID):
+                errors += 1
+                print(f"worker {name}: wrong session for {sid}: {session and session.to_mapping()}")
+        expected = set(sids(name, count)) | set(sids(other, count))
+        in_room = await session_store.room_sids(ROOM_ID)
+        if in_room != expected:
+            errors += 1
+            print(
+                f"worker {name}: room_sids has {len(in_room)} sids, expected {len(expected)} "
+                f"({len(expected - in_room)} missing, {len(in_room - expected)} unexpected)"
+            )
+
+        # Wait until both have checked before anyone removes sessions
+        await redis_client.incr(READY_KEY)
+        while int(await redis_client.get(READY_KEY) or 0) < 2 * len(WORKERS):
+            await asyncio.sleep(0.05)
+        if name == "b":
+            for sid in sids(name, count):
+                await session_store.remove(sid)
+    finally:
+        await redis_client.disconnect()
+    return errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--worker", choices=WORKERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.exit(1 if await run_worker(args.worker, args.sessions) else 0)
+
+    await redis_client.connect()
+    await redis_client.delete(READY_KEY)
+    try:
+        processes = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "--worker", name, "--sessions", str(args.sessions)
+            )
+            for name in WORKERS
+        ]
+        failed = [
+            name for name, process in zip(WORKERS, processes) if await process.wait() != 0
+        ]
+
+        # Worker a is gone; its sessions are removed from a process that never served them
+        for sid in sids("a", args.sessions):
+            await session_store.remove(sid)
+        left = await redis_client.smembers(redis_keys.room_sids(ROOM_ID))
+    finally:
+        await redis_client.delete(READY_KEY)
+        for name in WORKERS:
+            for sid in sids(name, args.sessions):
+                await session_store.forget_last_room(user_id(sid))
+        await redis_client.disconnect()
+
+    print(
+        f"2 workers x {args.sessions} sessions: cross-worker lookups "
+        f"{'failed in ' + ', '.join(failed) if failed else 'ok'}, {len(left)} sids left in the room"
+    )
+    if failed or left:
+        print("FAIL: sessions are not shared correctly between workers")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
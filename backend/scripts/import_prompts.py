@@ -0,0 +1,322 @@
+"""Bulk import prompts from CSV or JSONL files.
+
+Every record needs a game_slug (or --game) and that game's payload fields
+(PAYLOAD_FIELDS in app/services/prompt_repository.py). It may also have
+themes (a list in JSONL, "|"-separated in CSV), is_safe and key; all
+other fields go into the payload. Records are read as a stream and
+COPYed into a staging table in batches, then merged with
+INSERT ... ON CONFLICT. A record is identified by its key, or by a hash
+of its game and payload when it has none, so re-running an import never
+duplicates prompts. Missing themes are created once and then cached.
+
+Progress is saved to <file>.import-state after every committed batch. An
+interrupted import picks up from there; pass --restart to ignore it.
+
+New safe prompts are added to the shared Redis prompt pools after each
+committed batch. After an interrupted run (resumed or --restart) the
+pools of every game are dropped once the import finishes, since that run
+may have committed prompts it never added; the next session start
+rebuilds them.
+
+Usage:
+    python scripts/import_prompts.py prompts.jsonl [more.csv ...] [--game hot_seat] [--batch-size 5000]
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.base import engine
+from app.models import Theme
+from app.core.redis_client import redis_client
+from app.services.prompt_pool import prompt_pool_index
+from app.services.prompt_repository import PAYLOAD_FIELDS
+
+# Record fields that are not part of the payload
+RESERVED_FIELDS = ("game_slug", "themes", "is_safe", "key")
+
+# Rejected records reported individually before only counting them
+MAX_REPORTED_ERRORS = 20
+
+STAGING_COLUMNS = ["game_slug", "import_key", "payload", "difficulty", "is_safe", "theme_labels"]
+
+CREATE_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS prompt_import (
+    game_slug text,
+    import_key text,
+    payload jsonb,
+    difficulty text,
+    is_safe boolean,
+    theme_labels text[]
+)
+"""
+
+MERGE_PROMPTS = """
+INSERT INTO prompts (game_slug, import_key, payload, difficulty, is_safe, created_at)
+SELECT game_slug, import_key, payload, difficulty, is_safe, timezone('utc', now())
+FROM prompt_import
+ON CONFLICT (game_slug, import_key) DO NOTHING
+RETURNING id, game_slug, is_safe
+"""
+
+# Links are merged for every staged record, not only new prompts, so a
+# re-run also adds themes that were missing the first time. Returns the
+# new links of safe prompts, which the prompt pools need to pick up.
+MERGE_THEMES = """
+WITH linked AS (
+    INSERT INTO prompt_themes (prompt_id, theme_id)
+    SELECT p.id, t.id
+    FROM prompt_import s
+    JOIN prompts p ON p.game_slug = s.game_slug AND p.import_key = s.import_key
+    CROSS JOIN LATERAL unnest(s.theme_labels) AS l (label)
+    JOIN themes t ON t.label = l.label
+    ON CONFLICT DO NOTHING
+    RETURNING prompt_id, theme_id
+)
+SELECT p.game_slug, l.prompt_id, l.theme_id
+FROM linked l
+JOIN prompts p ON p.id = l.prompt_id
+WHERE p.is_safe
+"""
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def read_records(path: Path) -> Iterator:
+    """Stream records from a CSV or JSONL file"""
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                row["themes"] = [
+                    label.strip() for label in (row.get("themes") or "").split("|")
+                    if label.strip()
+                ]
+                yield row
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        # Rejected by stage_row like any other bad record
+                        yield InvalidRecord(f"invalid JSON ({e})")
+
+
+def parse_bool(value) -> bool:
+    if value is None or value == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ("false", "f", "0", "no", "n")
+
+
+def stage_row(record: dict, default_game: Optional[str]) -> tuple:
+    """Validate a record and turn it into a staging table row"""
+    if isinstance(record, InvalidRecord):
+        raise record
+    if not isinstance(record, dict):
+        raise InvalidRecord("not an object")
+
+    game_slug = record.get("game_slug") or default_game
+    if game_slug not in PAYLOAD_FIELDS:
+        raise InvalidRecord(f"unknown game {game_slug!r}")
+
+    payload = {
+        field: value for field, value in record.items()
+        if field not in RESERVED_FIELDS and value is not None and value != ""
+    }
+    missing = [field for field in PAYLOAD_FIELDS[game_slug] if field not in payload]
+    if missing:
+        raise InvalidRecord(f"missing {', '.join(missing)} for {game_slug}")
+
+    themes = record.get("themes") or []
+    if isinstance(themes, str):
+        themes = [themes]
+
+    payload_json = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    key = record.get("key")
+    import_key = str(key) if key else hashlib.sha1(f"{game_slug}\n{payload_json}".encode()).hexdigest()
+    return (
+        game_slug,
+        import_key,
+        payload_json,
+        payload.get("difficulty"),
+        parse_bool(record.get("is_safe")),
+        [str(label) for label in themes]
+    )
+
+
+class PromptImporter:
+    """Streams prompt files into the prompts table in COPY batches"""
+
+    def __init__(self, engine: AsyncEngine, batch_size: int = 5000):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.theme_ids: Dict[str, int] = {}
+        # An earlier run over one of the files was interrupted
+        self.interrupted = False
+        self.records = 0
+        self.inserted = 0
+        self.rejected = 0
+
+    async def import_file(
+        self,
+        path: Path,
+        default_game: Optional[str] = None,
+        restart: bool = False
+    ):
+        state_path = path.with_name(path.name + ".import-state")
+        done = 0
+        if state_path.exists():
+            self.interrupted = True
+            if not restart:
+                done = json.loads(state_path.read_text())["records"]
+                print(f"{path}: resuming after {done:,} records")
+
+        records = read_records(path)
+        position = done
+        start = time.perf_counter()
+        last_report = start
+        file_records = file_inserted = 0
+
+        async with self.engine.connect() as conn:
+            await conn.execute(text(CREATE_STAGING))
+            await self._load_themes(conn)
+            await conn.commit()
+
+            for batch in iter(lambda: list(itertools.islice(records, self.batch_size)), []):
+                if position < done:
+                    # Already committed by an earlier run
+                    skip = min(done - position, len(batch))
+                    position += skip
+                    batch = batch[skip:]
+                    if not batch:
+                        continue
+
+                rows = []
+                for offset, record in enumerate(batch, start=position + 1):
+                    try:
+                        rows.append(stage_row(record, default_game))
+                    except InvalidRecord as e:
+                        self._reject(path, offset, e)
+                position += len(batch)
+
+                inserted = await self._write_batch(conn, rows)
+                state_path.write_text(json.dumps({"records": position}))
+
+                file_records += len(batch)
+                file_inserted += inserted
+                now = time.perf_counter()
+                if now - last_report >= 5:
+                    last_report = now
+                    print(f"{path}: {position:,} records, {file_records / (now - start):,.0f} rows/s")
+
+        elapsed = time.perf_counter() - start
+        state_path.unlink(missing_ok=True)
+        self.records += file_records
+        self.inserted += file_inserted
+        print(
+            f"{path}: {file_records:,} records, {file_inserted:,} new prompts "
+            f"in {elapsed:.1f}s ({file_records / max(elapsed, 1e-9):,.0f} rows/s)"
+        )
+
+    async def _write_batch(self, conn: AsyncConnection, rows: list) -> int:
+        """Merge one batch in its own transaction and return the new prompt count"""
+        if not rows:
+            return 0
+
+        # Also begins the transaction the COPY below runs in
+        await conn.execute(text("TRUNCATE prompt_import"))
+        await self._resolve_themes(conn, {label for row in rows for label in row[5]})
+
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "prompt_import", records=rows, columns=STAGING_COLUMNS
+        )
+
+        new_prompts = (await conn.execute(text(MERGE_PROMPTS))).all()
+        links = (await conn.execute(text(MERGE_THEMES))).all()
+        await conn.commit()
+
+        # Safe prompts and theme links added, by game: {prompt_id: [theme_id]}
+        added: Dict[str, Dict[int, list]] = {}
+        for prompt_id, game_slug, is_safe in new_prompts:
+            if is_safe:
+                added.setdefault(game_slug, {}).setdefault(prompt_id, [])
+        for game_slug, prompt_id, theme_id in links:
+            added.setdefault(game_slug, {}).setdefault(prompt_id, []).append(theme_id)
+        for game_slug, prompts in sorted(added.items()):
+            await prompt_pool_index.add_prompts(game_slug, prompts)
+        return len(new_prompts)
+
+    async def _load_themes(self, conn: AsyncConnection):
+        result = await conn.execute(select(Theme.label, Theme.id))
+        self.theme_ids = dict(result.all())
+
+    async def _resolve_themes(self, conn: AsyncConnection, labels: set):
+        """Create any theme labels not seen before"""
+        new = labels - self.theme_ids.keys()
+        if not new:
+            return
+
+        await conn.execute(
+            pg_insert(Theme)
+            .values([{"label": label, "is_safe": True} for label in sorted(new)])
+            .on_conflict_do_nothing(index_elements=["label"])
+        )
+        result = await conn.execute(select(Theme.label, Theme.id).where(Theme.label.in_(new)))
+        self.theme_ids.update(result.all())
+
+    def _reject(self, path: Path, record_number: int, error: Exception):
+        self.rejected += 1
+        if self.rejected <= MAX_REPORTED_ERRORS:
+            print(f"{path}: record {record_number}: {error}")
+        elif self.rejected == MAX_REPORTED_ERRORS + 1:
+            print("Further rejected records are only counted")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="CSV or JSONL files")
+    parser.add_argument("--game", choices=sorted(PAYLOAD_FIELDS), help="game for records without game_slug")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress")
+    args = parser.parse_args()
+
+    importer = PromptImporter(engine, args.batch_size)
+    await redis_client.connect()
+    try:
+        for path in args.paths:
+            await importer.import_file(path, args.game, args.restart)
+        if importer.interrupted:
+            # Prompts committed before the interruption may be missing from the pools
+            for game_slug in sorted(PAYLOAD_FIELDS):
+                await prompt_pool_index.invalidate(game_slug)
+    finally:
+        await redis_client.disconnect()
+        await engine.dispose()
+
+    print(
+        f"Imported {importer.inserted:,} new prompts from {importer.records:,} records "
+        f"({importer.rejected:,} rejected)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Minimal local stand-in for the PayPal REST API.
+
+Serves the two endpoints the backend uses (OAuth token and order lookup)
+with a configurable artificial latency. Point the backend at it with
+PAYPAL_API_BASE=http://127.0.0.1:8300. Order IDs starting with
+"PENDING" are reported as not completed; every other ID is COMPLETED.
+
+Usage:
+    python scripts/paypal_stub.py [--port 8300] [--latency 0.2]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    counts = {"token": 0, "order": 0}
+
+    def do_POST(self):
+        if self.path != "/v1/oauth2/token":
+            return self._reply(404, {"name": "RESOURCE_NOT_FOUND"})
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.counts["token"] += 1
+        time.sleep(self.latency)
+        self._reply(200, {"access_token": f"stub-token-{self.counts['token']}", "expires_in": 32400})
+
+    def do_GET(self):
+        prefix = "/v2/checkout/orders/"
+        if not self.path.startswith(prefix):
+            return self._reply(404, {"name": "RESOURCE_NOT_FOUND"})
+        if not self.headers.get("Authorization", "").startswith("Bearer stub-token-"):
+            return self._reply(401, {"error": "invalid_token"})
+        order_id = self.path[len(prefix):]
+        self.counts["order"] += 1
+        time.sleep(self.latency)
+        self._reply(200, {
+            "id": order_id,
+            "status": "APPROVED" if order_id.startswith("PENDING") else "COMPLETED",
+            "purchase_units": [{"amount": {"value": "9.99", "currency_code": "USD"}}],
+            "payer": {"email_address": "buyer@example.com"}
+        })
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port: int, latency: float) -> ThreadingHTTPServer:
+    """Run the stub in a background thread; call shutdown() to stop it"""
+    StubHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    print(f"PayPal stub listening on http://127.0.0.1:{args.port}")
+    ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler).serve_forever()
@@ -9,15 +9,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.base import engine, Base
 from app.models import (
     Theme,
-    WouldYouRatherPrompt,
-    TruthOrDarePrompt,
-    SixtySecondsPrompt,
-    HotSeatPrompt,
-    DrawGuessPrompt,
+    Prompt,
     User
 )
-from app.core.security import get_password_hash
+from app.core.security import password_hasher
 from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.prompt_pool import prompt_pool_index
+from app.services.prompt_repository import GAME_SLUGS
 
 
 async def seed_themes(session: AsyncSession):
@@ -41,6 +40,24 @@ async def seed_themes(session: AsyncSession):
     return themes
 
 
+def add_prompts(session: AsyncSession, game_slug: str, prompts_data, themes):
+    """Add prompts to the unified table; the remaining fields become the payload"""
+    theme_map = {t.label: t for t in themes}
+    
+    for prompt_data in prompts_data:
+        theme_labels = prompt_data.pop("themes")
+        prompt = Prompt(
+            game_slug=game_slug,
+            payload=prompt_data,
+            difficulty=prompt_data.get("difficulty"),
+            is_safe=True
+        )
+        for label in theme_labels:
+            if label in theme_map:
+                prompt.themes.append(theme_map[label])
+        session.add(prompt)
+
+
 async def seed_would_you_rather(session: AsyncSession, themes):
     """Seed Would You Rather prompts"""
     prompts_data = [
@@ -71,56 +88,40 @@ async def seed_would_you_rather(session: AsyncSession, themes):
         }
     ]
     
-    theme_map = {t.label: t for t in themes}
-    
-    for prompt_data in prompts_data:
-        theme_labels = prompt_data.pop("themes")
-        prompt = WouldYouRatherPrompt(**prompt_data, is_safe=True)
-        for label in theme_labels:
-            if label in theme_map:
-                prompt.themes.append(theme_map[label])
-        session.add(prompt)
+    add_prompts(session, "would_you_rather", prompts_data, themes)
 
 
 async def seed_truth_or_dare(session: AsyncSession, themes):
     """Seed Truth or Dare prompts"""
     prompts_data = [
         {
-            "prompt_type": "truth",
+            "type": "truth",
             "text": "What's the most embarrassing thing that's happened to you?",
             "themes": ["General", "Icebreaker"]
         },
         {
-            "prompt_type": "truth",
+            "type": "truth",
             "text": "What's your biggest fear?",
             "themes": ["Deep", "Icebreaker"]
         },
         {
-            "prompt_type": "dare",
+            "type": "dare",
             "text": "Do your best impression of another player",
             "themes": ["Funny", "Party"]
         },
         {
-            "prompt_type": "dare",
+            "type": "dare",
             "text": "Sing the chorus of your favorite song",
             "themes": ["Party", "Family Friendly"]
         },
         {
-            "prompt_type": "truth",
+            "type": "truth",
             "text": "What's the best compliment you've ever received?",
             "themes": ["Deep", "Family Friendly"]
         }
     ]
     
-    theme_map = {t.label: t for t in themes}
-    
-    for prompt_data in prompts_data:
-        theme_labels = prompt_data.pop("themes")
-        prompt = TruthOrDarePrompt(**prompt_data, is_safe=True)
-        for label in theme_labels:
-            if label in theme_map:
-                prompt.themes.append(theme_map[label])
-        session.add(prompt)
+    add_prompts(session, "truth_or_dare", prompts_data, themes)
 
 
 async def seed_sixty_seconds(session: AsyncSession, themes):
@@ -133,15 +134,7 @@ async def seed_sixty_seconds(session: AsyncSession, themes):
         {"category": "Animals that start with 'B'", "themes": ["Family Friendly", "Icebreaker"]}
     ]
     
-    theme_map = {t.label: t for t in themes}
-    
-    for prompt_data in prompts_data:
-        theme_labels = prompt_data.pop("themes")
-        prompt = SixtySecondsPrompt(**prompt_data, is_safe=True)
-        for label in theme_labels:
-            if label in theme_map:
-                prompt.themes.append(theme_map[label])
-        session.add(prompt)
+    add_prompts(session, "sixty_seconds", prompts_data, themes)
 
 
 async def seed_hot_seat(session: AsyncSession, themes):
@@ -154,15 +147,7 @@ async def seed_hot_seat(session: AsyncSession, themes):
         {"question": "What's your favorite childhood memory?", "themes": ["Family Friendly", "Icebreaker"]}
     ]
     
-    theme_map = {t.label: t for t in themes}
-    
-    for prompt_data in prompts_data:
-        theme_labels = prompt_data.pop("themes")
-        prompt = HotSeatPrompt(**prompt_data, is_safe=True)
-        for label in theme_labels:
-            if label in theme_map:
-                prompt.themes.append(theme_map[label])
-        session.add(prompt)
+    add_prompts(session, "hot_seat", prompts_data, themes)
 
 
 async def seed_draw_guess(session: AsyncSession, themes):
@@ -175,22 +160,14 @@ async def seed_draw_guess(session: AsyncSession, themes):
         {"word": "democracy", "difficulty": "hard", "themes": ["Deep"]}
     ]
     
-    theme_map = {t.label: t for t in themes}
-    
-    for prompt_data in prompts_data:
-        theme_labels = prompt_data.pop("themes")
-        prompt = DrawGuessPrompt(**prompt_data, is_safe=True)
-        for label in theme_labels:
-            if label in theme_map:
-                prompt.themes.append(theme_map[label])
-        session.add(prompt)
+    add_prompts(session, "draw_guess", prompts_data, themes)
 
 
 async def seed_admin_user(session: AsyncSession):
     """Create admin user"""
     admin = User(
         email=settings.ADMIN_EMAIL,
-        hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
+        hashed_password=await password_hasher.hash(settings.ADMIN_PASSWORD),
         role="admin",
         is_paid=True
     )
@@ -232,6 +209,12 @@ async def main():
         # Commit all changes
         await session.commit()
     
+    # Force prompt pools to be rebuilt with the new prompts
+    await redis_client.connect()
+    for game_slug in GAME_SLUGS:
+        await prompt_pool_index.invalidate(game_slug)
+    await redis_client.disconnect()
+    
     print("Seeding completed!")
 
 
@@ -0,0 +1,143 @@
+"""Soak test: 1,000 rooms cycling prompts for an hour with background refill.
+
+Starts --rooms rooms on --game (their queues loaded like start_game does),
+runs the prompt queue refiller, and has every room take a prompt (with
+--lookahead upcoming ones) every --min-interval to --max-interval seconds
+for --duration seconds. Every --report-every seconds it prints the prompts
+served, next-prompt latency, inline refills (queue found empty), background
+top-ups and Redis memory. At the end it fails (exit status 1) if any room
+was left without a prompt or was served a prompt twice, so the game
+needs more safe prompts than one room takes in --duration (about
+duration / mean interval). Needs a real Postgres with prompts seeded and
+a real redis-server (DATABASE_URL, REDIS_URL); use a Redis database no
+app worker is using.
+
+Usage:
+    python scripts/soak_prompt_queues.py [--rooms 1000] [--duration 3600] [--game would_you_rather]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+for name in ("SECRET_KEY", "PAYPAL_CLIENT_ID", "PAYPAL_CLIENT_SECRET"):
+    os.environ.setdefault(name, "bench")
+
+from prometheus_client import REGISTRY
+
+from app.core.redis_client import redis_client
+from app.db.base import AsyncSessionLocal, engine
+from app.services.game_logic import game_logic_service, LOW_QUEUES_KEY
+from app.services.prompt_refill import prompt_refiller
+from app.services.room_state import DIRTY_KEY, room_state_store
+from app.services.seen_prompts import seen_prompts
+
+ROOM_OFFSET = 900_000
+HOST_OFFSET = 900_000
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.served = 0
+        self.missing = 0
+        self.repeats = 0
+
+    def report(self, elapsed: float, used_memory: int):
+        latencies = sorted(self.latencies) or [0.0]
+        self.latencies = []
+        print(
+            f"[{elapsed:6.0f}s] served={self.served:,} "
+            f"p50={statistics.median(latencies) * 1000:.2f}ms p99={percentile(latencies, 0.99) * 1000:.2f}ms "
+            f"inline_refills={REGISTRY.get_sample_value('prompt_queue_empty_total'):.0f} "
+            f"background_refills={REGISTRY.get_sample_value('prompt_queue_refills_total'):.0f} "
+            f"missing={self.missing} repeats={self.repeats} redis={used_memory / 2**20:.1f}MiB",
+            flush=True
+        )
+
+
+async def play_room(room_id, host_id, args, stats, deadline):
+    served = set()
+    while time.monotonic() < deadline:
+        await asyncio.sleep(random.uniform(args.min_interval, args.max_interval))
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            prompt = await game_logic_service.get_next_prompt(db, room_id, args.game, host_id)
+            if prompt and args.lookahead:
+                await game_logic_service.peek_prompts(db, room_id, args.game, args.lookahead)
+        stats.latencies.append(time.perf_counter() - start)
+
+        if prompt is None:
+            stats.missing += 1
+            continue
+        stats.served += 1
+        if prompt["id"] in served:
+            stats.repeats += 1
+        served.add(prompt["id"])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=3600)
+    parser.add_argument("--game", default="would_you_rather")
+    parser.add_argument("--lookahead", type=int, default=3)
+    parser.add_argument("--min-interval", type=float, default=2.0)
+    parser.add_argument("--max-interval", type=float, default=10.0)
+    parser.add_argument("--report-every", type=float, default=60)
+    args = parser.parse_args()
+
+    rooms = [(ROOM_OFFSET + i, HOST_OFFSET + i % (args.rooms // 4 or 1)) for i in range(args.rooms)]
+    await redis_client.connect()
+    stats = Stats()
+    try:
+        async with AsyncSessionLocal() as db:
+            for room_id, host_id in rooms:
+                await room_state_store.update(
+                    room_id,
+                    {"status": "active", "game_slug": args.game, "host_id": host_id, "theme_ids": ""},
+                    create=True
+                )
+                await game_logic_service.load_prompts_for_session(db, args.game, [], room_id, host_id)
+        print(f"started {args.rooms:,} rooms ({len({host for _, host in rooms}):,} hosts)")
+
+        prompt_refiller.start()
+        start = time.monotonic()
+        deadline = start + args.duration
+        players = asyncio.gather(*(
+            play_room(room_id, host_id, args, stats, deadline) for room_id, host_id in rooms
+        ))
+        while not players.done():
+            await asyncio.wait([players], timeout=args.report_every)
+            info = await redis_client.redis.info("memory")
+            stats.report(time.monotonic() - start, info["used_memory"])
+        await players
+    finally:
+        await prompt_refiller.stop()
+        for room_id, host_id in rooms:
+            await seen_prompts.forget(host_id=host_id, room_id=room_id)
+            await redis_client.redis.delete(f"room:{room_id}", f"room:{room_id}:prompts")
+        await redis_client.redis.srem(DIRTY_KEY, *[room_id for room_id, _ in rooms])
+        await redis_client.redis.srem(LOW_QUEUES_KEY, *[room_id for room_id, _ in rooms])
+        await redis_client.disconnect()
+        await engine.dispose()
+
+    if stats.missing or stats.repeats:
+        print(f"FAIL: {stats.missing} requests without a prompt, {stats.repeats} repeated prompts")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
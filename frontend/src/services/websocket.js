@@ -17,6 +17,9 @@ class WebSocketService {
       auth: {
         token: authStore.token
       },
+      // Start on WebSocket, which works across backend nodes without sticky
+      // sessions; the polling fallback still needs them (SOCKETIO_STICKY_SESSIONS)
+      transports: ['websocket', 'polling'],
       reconnection: true,
       reconnectionAttempts: 5,
       reconnectionDelay: 1000,
@@ -56,6 +59,11 @@ class WebSocketService {
       this.emit('game:update', data)
     })
 
+    // Several updates sent within one server tick
+    this.socket.on('game_updates', (updates) => {
+      updates.forEach((data) => this.emit('game:update', data))
+    })
+
     this.socket.on('timer_sync', (data) => {
       this.emit('game:timerSync', data)
     })